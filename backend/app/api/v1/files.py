@@ -0,0 +1,180 @@
+import mimetypes
+import os
+import re
+import time
+
+from fastapi import APIRouter, HTTPException, Request
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.services.storage import LocalStorageBackend, get_storage_backend, upload_scope, verify_local_url
+
+router = APIRouter(prefix="/files", tags=["Files"])
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_READ_CHUNK = 256 * 1024
+
+
+class RangeFileResponse(Response):
+    """
+    Serves [offset, offset + count) of a file. When the ASGI server offers the
+    http.response.zerocopysend extension the kernel copies the bytes straight
+    from the page cache to the socket (sendfile); otherwise the range is
+    streamed with pread in a thread so the event loop is never blocked.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        offset: int,
+        count: int,
+        status_code: int,
+        headers: dict[str, str],
+        media_type: str,
+        send_body: bool = True,
+        background: BackgroundTask | None = None,
+    ):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type, background=background)
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.send_body = send_body
+        self.headers["content-length"] = str(count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+
+        if not self.send_body or self.count == 0:
+            await send({"type": "http.response.body", "body": b""})
+        else:
+            fd = await run_in_threadpool(os.open, self.path, os.O_RDONLY)
+            try:
+                if "http.response.zerocopysend" in scope.get("extensions", {}):
+                    with os.fdopen(fd, "rb", closefd=False) as file:
+                        await send({
+                            "type": "http.response.zerocopysend",
+                            "file": file,
+                            "offset": self.offset,
+                            "count": self.count,
+                        })
+                else:
+                    position, remaining = self.offset, self.count
+                    while remaining > 0:
+                        chunk = await run_in_threadpool(os.pread, fd, min(_READ_CHUNK, remaining), position)
+                        if not chunk:
+                            break
+                        position += len(chunk)
+                        remaining -= len(chunk)
+                        await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                    if remaining > 0:
+                        await send({"type": "http.response.body", "body": b""})
+            finally:
+                os.close(fd)
+
+        if self.background is not None:
+            await self.background()
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Return (start, end) inclusive for a single-range header, or None if unsatisfiable."""
+    match = _RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+    start_s, end_s = match.groups()
+    if start_s == "" and end_s == "":
+        return None
+    if start_s == "":
+        # Suffix range: the last N bytes
+        length = int(end_s)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(start_s)
+    end = int(end_s) if end_s else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+@router.api_route("/{storage_key:path}", methods=["GET", "HEAD"])
+async def get_file(request: Request, storage_key: str, expires: int = 0, signature: str = ""):
+    """
+    Serve a locally stored file (STORAGE_BACKEND=local).
+    Access is granted by the signed, expiring URL from presigned_url(),
+    so players and Deepgram can fetch it without a bearer token.
+    Supports single HTTP Range requests for seeking.
+    """
+    storage = get_storage_backend()
+    if not isinstance(storage, LocalStorageBackend):
+        raise HTTPException(status_code=404, detail="File not found.")
+
+    if not verify_local_url(storage_key, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired file URL.")
+
+    try:
+        path = storage.path_for(storage_key)
+        stat = await run_in_threadpool(os.stat, path)
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(status_code=404, detail="File not found.")
+
+    size = stat.st_size
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    headers = {
+        "accept-ranges": "bytes",
+        # Cacheable for as long as the signed URL itself stays valid
+        "cache-control": f"private, max-age={max(expires - int(time.time()), 0)}",
+        "etag": f'"{stat.st_mtime_ns:x}-{size:x}"',
+    }
+    send_body = request.method != "HEAD"
+
+    range_header = request.headers.get("range")
+    if range_header is None:
+        return RangeFileResponse(str(path), 0, size, 200, headers, media_type, send_body)
+
+    byte_range = _parse_range(range_header, size)
+    if byte_range is None:
+        return Response(status_code=416, headers={"content-range": f"bytes */{size}", "accept-ranges": "bytes"})
+
+    start, end = byte_range
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return RangeFileResponse(str(path), start, end - start + 1, 206, headers, media_type, send_body)
+
+
+@router.put("/{storage_key:path}", status_code=200)
+async def put_file(request: Request, storage_key: str, expires: int = 0, size: int = 0, signature: str = ""):
+    """
+    Direct browser upload for STORAGE_BACKEND=local — the counterpart of an
+    S3 presigned PUT. The signature binds the key, expiry, exact size and
+    content type, so the body must match all of them.
+    """
+    storage = get_storage_backend()
+    if not isinstance(storage, LocalStorageBackend):
+        raise HTTPException(status_code=404, detail="Not found.")
+
+    content_type = request.headers.get("content-type", "")
+    if not verify_local_url(storage_key, expires, signature, scope=upload_scope(size, content_type)):
+        raise HTTPException(status_code=403, detail="Invalid or expired upload URL.")
+
+    received = 0
+
+    async def body():
+        nonlocal received
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > size:
+                raise HTTPException(status_code=413, detail=f"Upload must be exactly {size} bytes.")
+            yield chunk
+        if received != size:
+            raise HTTPException(status_code=400, detail=f"Upload must be exactly {size} bytes.")
+
+    try:
+        await storage.write(storage_key, body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid storage key.")
+    return Response(status_code=200)
@@ -1,18 +1,30 @@
 import asyncio
+import hashlib
+import logging
 from datetime import datetime, timezone
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request, status
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, Request, Response, status
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
 
 from app.core.deps import CurrentUser, DBDep
 from app.core.config import settings
 from app.models.common import ok, paginate
-from app.models.interview import InterviewStatus, UpdateInterviewRequest
+from app.models.interview import InterviewStatus, UpdateInterviewRequest, new_interview_document
+from app.services.dedup import drop_storage_hold, find_existing_transcript, release_storage_object, reuse_existing_upload
 from app.services.storage import get_storage_backend
-from app.services.transcription import get_transcription_service
-from app.services.analysis import run_analysis
+from app.services.transcripts import copy_transcript, delete_transcript, load_transcript, load_window, search_transcripts
+from app.services.media import MediaTypeMismatchError
+from app.services.preprocessing import schedule_preprocessing
+from app.services.uploads import FileTooLargeError, UploadStream
+from app.services.url_cache import presigned_url_cache
+from app.services.waveform import COLLECTION as WAVEFORM_COLLECTION, pick_level
+from app.services.jobs import enqueue
 from app.core.limiter import limiter
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/interviews", tags=["Interviews"])
 
 
@@ -39,48 +51,48 @@ async def upload_interview(
             detail=f"File type '{file.content_type}' is not supported.",
         )
 
-    file_bytes = await file.read()
-    if len(file_bytes) > settings.MAX_FILE_SIZE_BYTES:
+    # Multipart bodies are spooled to disk by the form parser, so the size is
+    # usually known up front — reject before touching storage when it is.
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE_BYTES:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"File exceeds maximum size of {settings.MAX_FILE_SIZE_MB}MB.",
         )
 
     storage = get_storage_backend()
+    stream  = UploadStream(file, settings.MAX_FILE_SIZE_BYTES, content_type=file.content_type)
     try:
-        storage_key = await storage.upload(
-            file_bytes=file_bytes,
+        storage_key = await storage.upload_stream(
+            stream,
             filename=file.filename,
             content_type=file.content_type,
         )
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds maximum size of {settings.MAX_FILE_SIZE_MB}MB.",
+        )
+    except MediaTypeMismatchError as exc:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(exc))
     except Exception:
         raise HTTPException(status_code=500, detail="File upload failed. Please try again.")
 
-    now = datetime.now(timezone.utc)
-    document = {
-        "user_id":          user["id"],
-        "title":            title or file.filename,
-        "original_name":    file.filename,
-        "filename":         storage_key.split("/")[-1],
-        "file_size":        len(file_bytes),
-        "file_type":        file.content_type,
-        "storage_key":      storage_key,
-        "duration_seconds": None,
-        "status":           InterviewStatus.uploaded.value,
-        "error_message":    None,
-        "deepgram_job_id":  None,
-        "template_id":      None,
-        "transcript":       None,
-        "ai_analysis":      None,
-        "tags":             [],
-        "notifications":    [],
-        "created_at":       now,
-        "updated_at":       now,
-    }
+    document = new_interview_document(
+        user_id=user["id"],
+        title=title or file.filename,
+        original_name=file.filename,
+        storage_key=storage_key,
+        file_size=stream.size,
+        file_type=file.content_type,
+        content_hash=stream.sha256,
+        media=stream.media_info(),
+    )
+    document = await reuse_existing_upload(db, storage, document)
 
     result = await db["interviews"].insert_one(document)
     document["_id"]     = str(result.inserted_id)
     document["user_id"] = str(document["user_id"])
+    await schedule_preprocessing(db, document)
 
     return ok(document)
 
@@ -99,7 +111,11 @@ async def list_interviews(
     if interview_status:
         query["status"] = interview_status
     if search:
-        query["$text"] = {"$search": search}
+        # Transcript text is indexed in its own collection
+        query["$or"] = [
+            {"$text": {"$search": search}},
+            {"_id": {"$in": await search_transcripts(db, user["id"], search)}},
+        ]
 
     skip  = (page - 1) * limit
     total = await db["interviews"].count_documents(query)
@@ -142,7 +158,17 @@ async def get_metrics(request: Request, user: CurrentUser, db: DBDep):
 
 @router.get("/{interview_id}")
 @limiter.limit("60/minute")
-async def get_interview(request: Request, interview_id: str, user: CurrentUser, db: DBDep):
+async def get_interview(
+    request: Request,
+    interview_id: str,
+    user: CurrentUser,
+    db: DBDep,
+    include: str | None = Query(None, description="\"transcript\" also returns the full transcript."),
+):
+    """
+    The interview with its transcript_summary. The transcript itself is only
+    loaded with ?include=transcript; the player pages it through /transcript.
+    """
     try:
         oid = ObjectId(interview_id)
     except Exception:
@@ -152,9 +178,55 @@ async def get_interview(request: Request, interview_id: str, user: CurrentUser,
     if not doc:
         raise HTTPException(status_code=404, detail="Interview not found.")
 
+    if include == "transcript":
+        doc["transcript"] = await load_transcript(db, oid) if doc.get("transcript_summary") else None
     return ok(_serialize(doc))
 
 
+@router.get("/{interview_id}/transcript")
+@limiter.limit("120/minute")
+async def get_transcript_window(
+    request: Request,
+    interview_id: str,
+    user: CurrentUser,
+    db: DBDep,
+    offset: int = Query(0, ge=0, description="Index of the first utterance; ignored when from_ms is given."),
+    limit: int = Query(50, ge=1, le=500),
+    from_ms: int | None = Query(None, ge=0, description="Return the utterances overlapping [from_ms, to_ms)."),
+    to_ms: int | None = Query(None, gt=0),
+    include_words: bool = False,
+):
+    """
+    A window of the transcript's utterances, by index or by time, so the
+    player can page through a long interview instead of loading it whole.
+    """
+    try:
+        oid = ObjectId(interview_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid interview ID.")
+    if to_ms is not None:
+        from_ms = from_ms or 0
+        if to_ms <= from_ms:
+            raise HTTPException(status_code=400, detail="to_ms must be greater than from_ms.")
+
+    doc = await db["interviews"].find_one({"_id": oid, "user_id": user["id"]}, {"transcript_summary": 1})
+    if not doc:
+        raise HTTPException(status_code=404, detail="Interview not found.")
+    summary = doc.get("transcript_summary")
+    window = await load_window(db, oid, limit, offset, from_ms, to_ms, include_words) if summary else None
+    if window is None:
+        raise HTTPException(status_code=400, detail="Transcript not available. Run transcription first.")
+
+    total = summary["utterance_count"]
+    end = window["offset"] + len(window["utterances"])
+    return ok({
+        "interview_id": interview_id,
+        "total":        total,
+        **window,
+        "next_offset":  end if end < total and window["utterances"] else None,
+    })
+
+
 @router.get("/{interview_id}/audio-url")
 @limiter.limit("30/minute")
 async def get_audio_url(request: Request, interview_id: str, user: CurrentUser, db: DBDep):
@@ -163,6 +235,13 @@ async def get_audio_url(request: Request, interview_id: str, user: CurrentUser,
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid interview ID.")
 
+    # Only ever cached for the owner. A delete in another process leaves the URL
+    # here until it expires, but it then points at an object that is gone
+    cached = presigned_url_cache.lookup(user["id"], interview_id)
+    if cached:
+        url, expires_in = cached
+        return ok({"url": url, "expires_in": expires_in})
+
     doc = await db["interviews"].find_one(
         {"_id": oid, "user_id": user["id"]},
         {"storage_key": 1, "file_type": 1},
@@ -171,9 +250,55 @@ async def get_audio_url(request: Request, interview_id: str, user: CurrentUser,
         raise HTTPException(status_code=404, detail="Interview not found.")
 
     storage = get_storage_backend()
-    url = await storage.presigned_url(doc["storage_key"], expires_in=3600)
+    url, expires_in = await presigned_url_cache.get_or_sign(
+        doc["storage_key"],
+        storage.presigned_url,
+        owner=(user["id"], interview_id),
+    )
 
-    return ok({"url": url, "expires_in": 3600})
+    return ok({"url": url, "expires_in": expires_in})
+
+
+@router.get("/{interview_id}/waveform")
+@limiter.limit("120/minute")
+async def get_waveform(
+    request: Request,
+    interview_id: str,
+    user: CurrentUser,
+    db: DBDep,
+    resolution: int | None = Query(None, gt=0, description="Samples per peak at 16 kHz; the closest stored level is returned."),
+):
+    """
+    Precomputed waveform peaks as raw int8 min/max pairs. The storage object
+    behind an interview never changes, so the response is cached as immutable.
+    """
+    try:
+        oid = ObjectId(interview_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid interview ID.")
+
+    doc = await db["interviews"].find_one({"_id": oid, "user_id": user["id"]}, {"storage_key": 1})
+    if not doc:
+        raise HTTPException(status_code=404, detail="Interview not found.")
+
+    waveform = await db[WAVEFORM_COLLECTION].find_one({"_id": doc["storage_key"]})
+    if not waveform:
+        raise HTTPException(status_code=404, detail="Waveform not available yet.")
+
+    level = pick_level(waveform, resolution)
+    samples_per_peak = level["samples_per_peak"]
+    key_digest = hashlib.sha256(doc["storage_key"].encode()).hexdigest()[:16]
+    headers = {
+        "cache-control":               "private, max-age=31536000, immutable",
+        "etag":                        f'"{key_digest}-{samples_per_peak}"',
+        "x-waveform-samples-per-peak": str(samples_per_peak),
+        "x-waveform-sample-rate":      str(waveform["sample_rate"]),
+        "x-waveform-duration-ms":      str(waveform["duration_ms"]),
+        "x-waveform-levels":           ",".join(str(l["samples_per_peak"]) for l in waveform["levels"]),
+    }
+    if request.headers.get("if-none-match") == headers["etag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=bytes(level["data"]), media_type="application/octet-stream", headers=headers)
 
 
 @router.patch("/{interview_id}")
@@ -214,10 +339,25 @@ async def delete_interview(request: Request, interview_id: str, user: CurrentUse
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid interview ID.")
 
-    result = await db["interviews"].delete_one({"_id": oid, "user_id": user["id"]})
-    if result.deleted_count == 0:
+    doc = await db["interviews"].find_one_and_delete(
+        {"_id": oid, "user_id": user["id"]},
+        projection={"storage_key": 1, "audio_storage_key": 1, "audio_segments.storage_key": 1},
+    )
+    if not doc:
         raise HTTPException(status_code=404, detail="Interview not found.")
 
+    presigned_url_cache.invalidate_interview(user["id"], interview_id)
+    await delete_transcript(db, oid)
+    await drop_storage_hold(db, oid)
+
+    # Objects may be shared with deduplicated copies — only removed once unreferenced
+    segment_keys = [segment["storage_key"] for segment in doc.get("audio_segments") or []]
+    for key in filter(None, (doc["storage_key"], doc.get("audio_storage_key"), *segment_keys)):
+        try:
+            await release_storage_object(db, get_storage_backend(), key)
+        except Exception:
+            logger.warning("Could not release storage object %s for interview %s", key, interview_id)
+
 
 @router.get("/{interview_id}/status")
 @limiter.limit("60/minute")
@@ -250,29 +390,42 @@ async def transcribe_interview(request: Request, interview_id: str, user: Curren
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid interview ID.")
 
-    doc = await db["interviews"].find_one({"_id": oid, "user_id": user["id"]})
+    doc = await db["interviews"].find_one(
+        {"_id": oid, "user_id": user["id"]},
+        {"status": 1, "content_hash": 1, "transcript_summary": 1, "duration_seconds": 1},
+    )
     if not doc:
         raise HTTPException(status_code=404, detail="Interview not found.")
 
     if doc.get("status") in ("transcribing", "analysing", "completed"):
         return ok({"id": interview_id, "message": "Already transcribed or in progress."})
 
-    try:
-        job_id = await get_transcription_service().submit(
-            storage_key=doc["storage_key"],
-            interview_id=interview_id,
+    # Same recording already transcribed (here or in a duplicate upload) — skip Deepgram
+    existing = await find_existing_transcript(db, doc)
+    summary = None
+    if existing is doc:
+        summary = doc["transcript_summary"]
+    elif existing:
+        summary = await copy_transcript(db, existing["_id"], oid, user["id"])
+    if summary:
+        await db["interviews"].update_one(
+            {"_id": oid},
+            {"$set": {
+                "transcript_summary": summary,
+                "duration_seconds":   existing.get("duration_seconds"),
+                "status":             "analysing",
+                "updated_at":         datetime.now(timezone.utc),
+            }}
         )
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Transcription submission failed: {str(exc)}")
+        await enqueue(db, "analyse", {"interview_id": interview_id, "user_id": user["id"]}, key=f"analyse:{interview_id}")
+        return ok({"id": interview_id, "status": "analysing", "job_id": None})
 
+    # The worker submits to Deepgram (see pipeline.submit_transcription)
     await db["interviews"].update_one(
         {"_id": oid},
-        {"$set": {
-            "status":          "queued",
-            "deepgram_job_id": job_id,
-            "updated_at":      datetime.now(timezone.utc),
-        }}
+        {"$set": {"status": "queued", "updated_at": datetime.now(timezone.utc)}}
     )
+    job_id = await enqueue(db, "transcribe", {"interview_id": interview_id}, key=f"transcribe:{interview_id}")
 
     return ok({"id": interview_id, "status": "queued", "job_id": job_id})
 
@@ -285,14 +438,17 @@ async def analyse_interview(request: Request, interview_id: str, user: CurrentUs
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid interview ID.")
 
-    doc = await db["interviews"].find_one({"_id": oid, "user_id": user["id"]})
+    doc = await db["interviews"].find_one(
+        {"_id": oid, "user_id": user["id"]},
+        {"ai_analysis": 1, "transcript_summary": 1},
+    )
     if not doc:
         raise HTTPException(status_code=404, detail="Interview not found.")
 
     if doc.get("ai_analysis"):
         return ok({"id": interview_id, "message": "Already analysed."})
 
-    if not doc.get("transcript"):
+    if not doc.get("transcript_summary"):
         raise HTTPException(status_code=400, detail="Transcript not available. Run transcription first.")
 
     await db["interviews"].update_one(
@@ -300,7 +456,7 @@ async def analyse_interview(request: Request, interview_id: str, user: CurrentUs
         {"$set": {"status": "analysing", "updated_at": datetime.now(timezone.utc)}}
     )
 
-    asyncio.create_task(run_analysis(interview_id, user["id"]))
+    await enqueue(db, "analyse", {"interview_id": interview_id, "user_id": user["id"]}, key=f"analyse:{interview_id}")
 
     return ok({"id": interview_id, "message": "Analysis started."})
 
@@ -319,11 +475,11 @@ async def export_transcript(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid interview ID.")
 
-    doc = await db["interviews"].find_one({"_id": oid, "user_id": user["id"]})
+    doc = await db["interviews"].find_one({"_id": oid, "user_id": user["id"]}, {"title": 1})
     if not doc:
         raise HTTPException(status_code=404, detail="Interview not found.")
 
-    transcript = doc.get("transcript")
+    transcript = await load_transcript(db, oid, ["text", "utterances"])
     if not transcript or not transcript.get("text"):
         raise HTTPException(status_code=400, detail="No transcript available to export.")
 
@@ -332,10 +488,11 @@ async def export_transcript(
 
     if format == "txt":
         return _export_txt(title, utterances, transcript["text"])
+    # PDF/DOCX layout is CPU-bound and can take seconds for long interviews — keep it off the event loop
     elif format == "pdf":
-        return _export_pdf(title, utterances, transcript["text"])
+        return await run_in_threadpool(_export_pdf, title, utterances, transcript["text"])
     elif format == "docx":
-        return _export_docx(title, utterances, transcript["text"])
+        return await run_in_threadpool(_export_docx, title, utterances, transcript["text"])
     else:
         raise HTTPException(status_code=400, detail="Invalid format. Use txt, pdf, or docx.")
 
@@ -351,58 +508,82 @@ async def batch_upload(
     if len(files) > settings.MAX_BATCH_FILES:
         raise HTTPException(status_code=400, detail=f"Maximum {settings.MAX_BATCH_FILES} files per batch.")
 
-    storage = get_storage_backend()
-    created = []
-    failed  = []
-    now     = datetime.now(timezone.utc)
+    storage   = get_storage_backend()
+    semaphore = asyncio.Semaphore(settings.BATCH_UPLOAD_CONCURRENCY)
 
-    for file in files:
+    async def upload_one(file: UploadFile) -> dict:
+        """Upload a single file; any failure is returned, never raised, so it can't affect the others."""
         if file.content_type not in settings.ALLOWED_MIME_TYPES:
-            failed.append({"filename": file.filename, "error": f"Unsupported file type: {file.content_type}"})
-            continue
+            return {"filename": file.filename, "error": f"Unsupported file type: {file.content_type}"}
+
+        async with semaphore:
+            stream = UploadStream(file, settings.MAX_FILE_SIZE_BYTES, content_type=file.content_type)
+            try:
+                storage_key = await storage.upload_stream(
+                    stream,
+                    filename=file.filename,
+                    content_type=file.content_type,
+                )
+            except FileTooLargeError:
+                return {"filename": file.filename, "error": f"File exceeds {settings.MAX_FILE_SIZE_MB}MB limit."}
+            except MediaTypeMismatchError as exc:
+                return {"filename": file.filename, "error": str(exc)}
+            except Exception:
+                return {"filename": file.filename, "error": "Storage upload failed."}
+
+        document = new_interview_document(
+            user_id=user["id"],
+            title=file.filename,
+            original_name=file.filename,
+            storage_key=storage_key,
+            file_size=stream.size,
+            file_type=file.content_type,
+            content_hash=stream.sha256,
+            media=stream.media_info(),
+        )
+        return {
+            "filename": file.filename,
+            "document": await reuse_existing_upload(db, storage, document),
+        }
 
-        file_bytes = await file.read()
-        if len(file_bytes) > settings.MAX_FILE_SIZE_BYTES:
-            failed.append({"filename": file.filename, "error": f"File exceeds {settings.MAX_FILE_SIZE_MB}MB limit."})
-            continue
+    results = await asyncio.gather(*(upload_one(f) for f in files))
 
+    failed   = [r for r in results if "error" in r]
+    uploaded = [r for r in results if "document" in r]
+    created  = []
+
+    if uploaded:
+        documents = [r["document"] for r in uploaded]
+        not_saved: set[int] = set()
         try:
-            storage_key = await storage.upload(
-                file_bytes=file_bytes,
-                filename=file.filename,
-                content_type=file.content_type,
-            )
+            result       = await db["interviews"].insert_many(documents, ordered=False)
+            inserted_ids = result.inserted_ids
+        except BulkWriteError as exc:
+            # Unordered, so every document without a write error was inserted;
+            # insert_many sets _id on each document before sending it
+            not_saved    = {error["index"] for error in exc.details.get("writeErrors", [])}
+            inserted_ids = [document.get("_id") for document in documents]
         except Exception:
-            failed.append({"filename": file.filename, "error": "Storage upload failed."})
-            continue
-
-        document = {
-            "user_id":          user["id"],
-            "title":            file.filename,
-            "original_name":    file.filename,
-            "filename":         storage_key.split("/")[-1],
-            "file_size":        len(file_bytes),
-            "file_type":        file.content_type,
-            "storage_key":      storage_key,
-            "duration_seconds": None,
-            "status":           InterviewStatus.uploaded.value,
-            "error_message":    None,
-            "deepgram_job_id":  None,
-            "template_id":      None,
-            "transcript":       None,
-            "ai_analysis":      None,
-            "tags":             [],
-            "notifications":    [],
-            "created_at":       now,
-            "updated_at":       now,
-        }
-
-        result = await db["interviews"].insert_one(document)
-        created.append({
-            "id":       str(result.inserted_id),
-            "filename": file.filename,
-            "status":   InterviewStatus.uploaded.value,
-        })
+            not_saved    = set(range(len(uploaded)))
+            inserted_ids = [None] * len(uploaded)
+
+        for index, (r, inserted_id) in enumerate(zip(uploaded, inserted_ids)):
+            document = r["document"]
+            if index in not_saved:
+                failed.append({"filename": r["filename"], "error": "Failed to save interview."})
+                try:
+                    if "_id" in document:
+                        await drop_storage_hold(db, document["_id"])
+                    await release_storage_object(db, storage, document["storage_key"])
+                except Exception:
+                    logger.warning("Could not release %s after a failed save", document["storage_key"], exc_info=True)
+                continue
+            created.append({
+                "id":       str(inserted_id),
+                "filename": r["filename"],
+                "status":   InterviewStatus.uploaded.value,
+            })
+            await schedule_preprocessing(db, {**document, "_id": inserted_id})
 
     return ok({"created": created, "failed": failed, "total_created": len(created), "total_failed": len(failed)})
 
@@ -0,0 +1,308 @@
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.deps import CurrentUser, DBDep
+from app.core.limiter import limiter
+from app.models.common import ok
+from app.models.interview import new_interview_document
+from app.models.upload import CreateUploadSessionRequest
+from app.services import upload_sessions
+from app.services.media import HEAD_BYTES, TAIL_BYTES, MediaTypeMismatchError, check_content_type, probe
+from app.services.preprocessing import schedule_preprocessing
+from app.services.storage import get_storage_backend
+
+router = APIRouter(prefix="/interviews/uploads", tags=["Uploads"])
+
+
+async def _get_session(db, session_id: str, user_id: str) -> dict:
+    try:
+        oid = ObjectId(session_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid upload ID.")
+
+    session = await db[upload_sessions.COLLECTION].find_one({"_id": oid, "user_id": user_id})
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found.")
+    return session
+
+
+async def _reopen_session(db, session: dict, **fields) -> None:
+    """Hand a session claimed for completion back to the client after a failure."""
+    await db[upload_sessions.COLLECTION].update_one(
+        {"_id": session["_id"], "status": "completing"},
+        {"$set": {"status": "active", "updated_at": datetime.now(timezone.utc), **fields}},
+    )
+
+
+def _validate_upload(payload: CreateUploadSessionRequest) -> None:
+    if payload.content_type not in settings.ALLOWED_MIME_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"File type '{payload.content_type}' is not supported.",
+        )
+    if payload.total_size > settings.MAX_FILE_SIZE_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds maximum size of {settings.MAX_FILE_SIZE_MB}MB.",
+        )
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+@limiter.limit("10/minute")
+async def create_upload_session(
+    request: Request,
+    payload: CreateUploadSessionRequest,
+    user: CurrentUser,
+    db: DBDep,
+):
+    """
+    Start a resumable upload. The client then PUTs each chunk
+    (chunk_size bytes, the last one shorter) and finally calls /complete.
+    """
+    _validate_upload(payload)
+
+    try:
+        session = await upload_sessions.create_session(
+            db,
+            user_id=user["id"],
+            filename=payload.filename,
+            content_type=payload.content_type,
+            total_size=payload.total_size,
+            title=payload.title,
+        )
+    except Exception:
+        raise HTTPException(status_code=500, detail="Could not start upload. Please try again.")
+
+    return ok(upload_sessions.describe_session(session))
+
+
+@router.get("/{upload_id}")
+@limiter.limit("120/minute")
+async def get_upload_session(request: Request, upload_id: str, user: CurrentUser, db: DBDep):
+    """Which chunks (and byte offsets) have been received — used to resume."""
+    session = await _get_session(db, upload_id, user["id"])
+    return ok(upload_sessions.describe_session(session))
+
+
+@router.put("/{upload_id}/chunks/{index}")
+@limiter.limit("120/minute")
+async def upload_chunk(request: Request, upload_id: str, index: int, user: CurrentUser, db: DBDep):
+    session = await _get_session(db, upload_id, user["id"])
+    if session.get("kind") == "direct":
+        raise HTTPException(status_code=400, detail="Direct uploads go to storage, not through chunks.")
+    if session["status"] != "active":
+        raise HTTPException(status_code=409, detail="Upload is no longer accepting chunks.")
+    if not 0 <= index < session["total_chunks"]:
+        raise HTTPException(status_code=400, detail="Chunk index out of range.")
+
+    expected = upload_sessions.expected_chunk_size(session, index)
+    body = bytearray()
+    async for data in request.stream():
+        body += data
+        if len(body) > expected:
+            raise HTTPException(status_code=413, detail=f"Chunk {index} must be {expected} bytes.")
+    if len(body) != expected:
+        raise HTTPException(status_code=400, detail=f"Chunk {index} must be {expected} bytes.")
+
+    # The first chunk carries the magic bytes — refuse a mislabelled file before storing anything
+    if index == 0:
+        try:
+            check_content_type(body, session["content_type"])
+        except MediaTypeMismatchError as exc:
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(exc))
+
+    try:
+        etag = await get_storage_backend().upload_part(
+            session["storage_key"], session["upload_id"], index + 1, bytes(body)
+        )
+    except Exception:
+        raise HTTPException(status_code=500, detail="Chunk upload failed. Please retry this chunk.")
+
+    # Re-sending a chunk simply replaces the part, so retries are safe
+    await upload_sessions.record_chunk(db, session, index, etag, bytes(body))
+    return ok({"upload_id": upload_id, "index": index, "size": len(body)})
+
+
+@router.post("/{upload_id}/complete", status_code=status.HTTP_201_CREATED)
+@limiter.limit("10/minute")
+async def complete_upload_session(request: Request, upload_id: str, user: CurrentUser, db: DBDep):
+    session = await _get_session(db, upload_id, user["id"])
+    if session.get("kind") == "direct":
+        raise HTTPException(status_code=400, detail="Direct uploads are finished with /finalize.")
+    if session["status"] != "active":
+        raise HTTPException(status_code=409, detail="Upload is already completed.")
+
+    parts = upload_sessions.completed_parts(session)
+    if parts is None:
+        missing = upload_sessions.describe_session(session)["missing"]
+        raise HTTPException(status_code=400, detail=f"Upload incomplete — missing chunks {missing}.")
+
+    # Claim the session so a double submit can't assemble the object twice
+    claimed = await db[upload_sessions.COLLECTION].update_one(
+        {"_id": session["_id"], "status": "active"},
+        {"$set": {"status": "completing", "updated_at": datetime.now(timezone.utc)}},
+    )
+    if claimed.modified_count == 0:
+        raise HTTPException(status_code=409, detail="Upload is already completed.")
+
+    assembled = bool(session.get("assembled"))
+    try:
+        if not assembled:
+            try:
+                await get_storage_backend().complete_multipart(session["storage_key"], session["upload_id"], parts)
+            except Exception:
+                raise HTTPException(status_code=500, detail="Could not assemble upload. Please try again.")
+            assembled = True
+
+        document = new_interview_document(
+            user_id=user["id"],
+            title=session["title"] or session["filename"],
+            original_name=session["filename"],
+            storage_key=session["storage_key"],
+            file_size=session["total_size"],
+            file_type=session["content_type"],
+            media=upload_sessions.session_media_info(session),
+        )
+        result = await db["interviews"].insert_one(document)
+    except BaseException:
+        # A retry must not find the session stuck in "completing"; an object
+        # that was already assembled is not assembled again
+        await _reopen_session(db, session, assembled=assembled)
+        raise
+    document["_id"]     = str(result.inserted_id)
+    document["user_id"] = str(document["user_id"])
+
+    await db[upload_sessions.COLLECTION].update_one(
+        {"_id": session["_id"]},
+        {"$set": {
+            "status":       "completed",
+            "interview_id": document["_id"],
+            "updated_at":   datetime.now(timezone.utc),
+        }},
+    )
+    await schedule_preprocessing(db, document)
+
+    return ok(document)
+
+
+@router.post("/direct", status_code=status.HTTP_201_CREATED)
+@limiter.limit("10/minute")
+async def create_direct_upload(
+    request: Request,
+    payload: CreateUploadSessionRequest,
+    user: CurrentUser,
+    db: DBDep,
+):
+    """
+    Start a direct-to-bucket upload. The browser sends the file to the
+    returned URL (POST with the form fields first, or PUT with the headers),
+    then calls /finalize. No upload bytes pass through the API.
+    """
+    _validate_upload(payload)
+
+    try:
+        session, upload = await upload_sessions.create_direct_session(
+            db,
+            user_id=user["id"],
+            filename=payload.filename,
+            content_type=payload.content_type,
+            total_size=payload.total_size,
+            title=payload.title,
+        )
+    except Exception:
+        raise HTTPException(status_code=500, detail="Could not start upload. Please try again.")
+
+    return ok({
+        **upload_sessions.describe_session(session),
+        "method":     upload["method"],
+        "url":        upload["url"],
+        "fields":     upload["fields"],
+        "headers":    upload["headers"],
+        "expires_in": settings.DIRECT_UPLOAD_URL_TTL_SECONDS,
+    })
+
+
+@router.post("/{upload_id}/finalize", status_code=status.HTTP_201_CREATED)
+@limiter.limit("10/minute")
+async def finalize_direct_upload(request: Request, upload_id: str, user: CurrentUser, db: DBDep):
+    """
+    Verify the object the browser uploaded (HEAD for size, first bytes for
+    type) and create the interview. A rejected file is deleted so the client
+    can upload again with the same session.
+    """
+    session = await _get_session(db, upload_id, user["id"])
+    if session.get("kind") != "direct":
+        raise HTTPException(status_code=400, detail="Not a direct upload.")
+    if session["status"] != "active":
+        raise HTTPException(status_code=409, detail="Upload is already completed.")
+
+    claimed = await db[upload_sessions.COLLECTION].update_one(
+        {"_id": session["_id"], "status": "active"},
+        {"$set": {"status": "completing", "updated_at": datetime.now(timezone.utc)}},
+    )
+    if claimed.modified_count == 0:
+        raise HTTPException(status_code=409, detail="Upload is already completed.")
+
+    storage = get_storage_backend()
+    try:
+        media = await _verify_direct_object(storage, session)
+        document = new_interview_document(
+            user_id=user["id"],
+            title=session["title"] or session["filename"],
+            original_name=session["filename"],
+            storage_key=session["storage_key"],
+            file_size=session["total_size"],
+            file_type=session["content_type"],
+            media=media,
+        )
+        result = await db["interviews"].insert_one(document)
+    except BaseException:
+        await _reopen_session(db, session)
+        raise
+    document["_id"]     = str(result.inserted_id)
+    document["user_id"] = str(document["user_id"])
+
+    await db[upload_sessions.COLLECTION].update_one(
+        {"_id": session["_id"]},
+        {"$set": {
+            "status":       "completed",
+            "interview_id": document["_id"],
+            "updated_at":   datetime.now(timezone.utc),
+        }},
+    )
+    await schedule_preprocessing(db, document)
+
+    return ok(document)
+
+
+async def _verify_direct_object(storage, session: dict) -> dict | None:
+    """Check the uploaded object against the session; returns the media probe result."""
+    key = session["storage_key"]
+    try:
+        head = await storage.head(key)
+    except Exception:
+        raise HTTPException(status_code=500, detail="Could not verify upload. Please try again.")
+    if head is None:
+        raise HTTPException(status_code=400, detail="File has not been uploaded yet.")
+
+    size = head["size"]
+    if size != session["total_size"]:
+        await storage.delete(key)
+        raise HTTPException(status_code=400, detail=f"Uploaded file is {size} bytes, expected {session['total_size']}.")
+
+    try:
+        head_bytes = await storage.read_range(key, 0, HEAD_BYTES)
+        tail_bytes = await storage.read_range(key, max(size - TAIL_BYTES, 0), TAIL_BYTES)
+    except Exception:
+        raise HTTPException(status_code=500, detail="Could not verify upload. Please try again.")
+
+    try:
+        check_content_type(head_bytes, session["content_type"])
+    except MediaTypeMismatchError as exc:
+        await storage.delete(key)
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(exc))
+
+    return probe(head_bytes, tail_bytes, size)
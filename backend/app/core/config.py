@@ -31,12 +31,22 @@ class Settings(BaseSettings):
     MONGODB_URL: str = ""
     MONGODB_DB_NAME: str = "hr_interviews"
 
-    STORAGE_BACKEND: Literal["s3", "mock"] = "s3"
+    STORAGE_BACKEND: Literal["s3", "local", "mock"] = "s3"
+    LOCAL_STORAGE_PATH: str = "./data/storage"
+    LOCAL_STORAGE_SIGNING_SECRET: str = ""  # falls back to AUTH_SECRET
     S3_ENDPOINT_URL: str | None = None
     S3_ACCESS_KEY: str = ""
     S3_SECRET_KEY: str = ""
     S3_BUCKET_NAME: str = ""
     S3_REGION: str = "auto"
+    S3_MAX_POOL_CONNECTIONS: int = 16
+    STORAGE_MAX_WORKERS: int = 8
+    DIRECT_UPLOAD_METHOD: Literal["put", "post"] = "put"  # R2 only supports presigned PUT
+    DIRECT_UPLOAD_URL_TTL_SECONDS: int = 3600
+
+    AUDIO_URL_TTL_SECONDS: int = 3600
+    AUDIO_URL_MIN_REMAINING_SECONDS: int = 600
+    AUDIO_URL_CACHE_SIZE: int = 2048  # 0 disables the presigned URL cache
     ANALYSIS_BACKEND: str = "openai"  # openai | mock | gemini
 
     DEEPGRAM_API_KEY: str = ""
@@ -48,8 +58,15 @@ class Settings(BaseSettings):
 
     TRANSCRIPTION_BACKEND: Literal["deepgram", "mock"] = "deepgram"
     DEEPGRAM_WEBHOOK_SECRET: str = ""
+    DEEPGRAM_API_URL: str = "https://api.deepgram.com/v1/listen"
+    DEEPGRAM_MAX_CONNECTIONS: int = 10
+    DEEPGRAM_MAX_KEEPALIVE_CONNECTIONS: int = 5
+    DEEPGRAM_MAX_INFLIGHT_SUBMITS: int = 8
+    DEEPGRAM_SUBMIT_TIMEOUT_SECONDS: float = 30.0
 
     AUTH_SECRET: str = ""
+    METRICS_TOKEN: str = ""  # bearer token for /api/v1/health/metrics; empty disables the endpoint
+    METRICS_PUBLISH_INTERVAL_SECONDS: int = 60  # how often each process stores its metrics in Mongo (0 disables)
 
     RESEND_API_KEY: str = ""
     EMAIL_FROM: str = "noreply@hr-platform.com"
@@ -59,6 +76,57 @@ class Settings(BaseSettings):
 
     MAX_FILE_SIZE_MB: int = 500
     MAX_BATCH_FILES: int = 10
+    BATCH_UPLOAD_CONCURRENCY: int = 4
+
+    RESUMABLE_CHUNK_SIZE_MB: int = 8  # S3 needs parts of at least 5MB
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+    UPLOAD_SESSION_GC_INTERVAL_SECONDS: int = 900
+
+    # Delete storage objects no interview or upload session references (0 disables)
+    STORAGE_GC_INTERVAL_SECONDS: int = 6 * 3600
+    STORAGE_GC_GRACE_HOURS: int = 48
+
+    # Durable pipeline job queue (the jobs collection)
+    JOBS_RUN_IN_API: bool = True  # turn off when a separate `python -m app.worker` drains the queue
+    JOB_PREPROCESS_CONCURRENCY: int = 2  # ffmpeg itself runs in the AUDIO_PREPROCESS_WORKERS pool
+    JOB_TRANSCRIBE_CONCURRENCY: int = 8  # Deepgram submissions are short HTTP calls
+    JOB_WEBHOOK_CONCURRENCY: int = 4
+    JOB_ANALYSE_CONCURRENCY: int = 2     # LLM calls are slow and rate limited
+    JOB_SHUTDOWN_GRACE_SECONDS: float = 30.0
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 300
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 10.0
+    JOB_RETRY_MAX_SECONDS: float = 900.0
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+
+    # Recover interviews stuck in queued/transcribing/analysing (lost webhooks, lost jobs)
+    STUCK_SWEEP_INTERVAL_SECONDS: int = 300
+    STUCK_INTERVIEW_MINUTES: int = 30
+    STUCK_SWEEP_BATCH: int = 20
+    STUCK_MAX_RECOVERIES: int = 2
+
+    # Extract a mono 16 kHz Opus copy of the audio before transcription (needs ffmpeg)
+    AUDIO_PREPROCESS_ENABLED: bool = False
+    AUDIO_PREPROCESS_MIME_TYPES: list[str] = ["video/mp4", "video/quicktime", "video/webm", "audio/wav", "audio/x-wav"]
+    AUDIO_PREPROCESS_WORKERS: int = 2
+    AUDIO_PREPROCESS_BITRATE: str = "24k"
+    AUDIO_PREPROCESS_TIMEOUT_SECONDS: int = 900
+    FFMPEG_PATH: str = "ffmpeg"
+
+    # Cut long silences from the compacted audio (applies to every upload type)
+    SILENCE_TRIM_ENABLED: bool = False
+    SILENCE_TRIM_MIN_SILENCE_MS: int = 2000
+    SILENCE_TRIM_PADDING_MS: int = 300
+
+    # Split long recordings at pauses into overlapping segments transcribed in parallel (needs preprocessing)
+    CHUNKED_TRANSCRIPTION_ENABLED: bool = False
+    CHUNK_TARGET_MINUTES: int = 15    # recordings under 1.5x this stay whole
+    CHUNK_OVERLAP_SECONDS: int = 10
+    CHUNK_SEARCH_SECONDS: int = 30    # how far from each target to look for a pause
+
+    # Precompute min/max waveform peaks for the player (samples per peak at 16 kHz, each a multiple of the last)
+    WAVEFORM_ENABLED: bool = False
+    WAVEFORM_LEVELS: list[int] = [256, 1024, 4096, 16384]
 
     @property
     def CORS_ORIGINS(self) -> list[str]:
@@ -67,10 +135,22 @@ class Settings(BaseSettings):
             origins += ["http://localhost:3000", "http://127.0.0.1:3000", "https://interview-transcriptor-frontend.vercel.app"]
         return list(set(origins))
 
+    @property
+    def BACKEND_BASE_URL(self) -> str:
+        """Public base URL of this API, used for callback and download links."""
+        backend_url = self.BACKEND_URL or "http://localhost:8000"
+        if not backend_url.startswith("http"):
+            backend_url = f"https://{backend_url}"
+        return backend_url.rstrip("/")
+
     @property
     def MAX_FILE_SIZE_BYTES(self) -> int:
         return self.MAX_FILE_SIZE_MB * 1024 * 1024
 
+    @property
+    def RESUMABLE_CHUNK_SIZE_BYTES(self) -> int:
+        return self.RESUMABLE_CHUNK_SIZE_MB * 1024 * 1024
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,3 +1,4 @@
+import hmac
 import logging
 from typing import Annotated
 
@@ -58,4 +59,26 @@ async def get_current_user(
         raise auth_error
 
 
-CurrentUser = Annotated[dict, Depends(get_current_user)]
\ No newline at end of file
+CurrentUser = Annotated[dict, Depends(get_current_user)]
+
+
+async def require_metrics_token(
+    credentials: Annotated[
+        HTTPAuthorizationCredentials | None,
+        Depends(_bearer_scheme),
+    ],
+) -> None:
+    """
+    Metrics are for operators and scrapers, so they take the METRICS_TOKEN
+    bearer token rather than a user's login. Without one they are not served.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found.")
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), settings.METRICS_TOKEN.encode(),
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
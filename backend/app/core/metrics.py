@@ -0,0 +1,82 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class Metrics:
+    """
+    In-process timing counters, keyed by operation name (e.g. "storage.upload"),
+    plus gauges for point-in-time values (e.g. how many interviews are stuck)
+    and counters for running totals (e.g. bytes reclaimed by storage GC).
+    Thread-safe — storage calls record from executor threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings: dict[str, _Timing] = {}
+        self._gauges: dict[str, float] = {}
+        self._counters: dict[str, int] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = _Timing()
+            timing.count += 1
+            timing.total += seconds
+            if seconds > timing.max:
+                timing.max = seconds
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def gauges(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._gauges)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def counters(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    "count":      t.count,
+                    "total_ms":   round(t.total * 1000, 3),
+                    "avg_ms":     round(t.total * 1000 / t.count, 3) if t.count else 0.0,
+                    "max_ms":     round(t.max * 1000, 3),
+                }
+                for name, t in self._timings.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self._gauges.clear()
+            self._counters.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,35 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+_tasks: list[asyncio.Task] = []
+
+
+async def _run_every(name: str, interval: float, fn: Callable[[], Awaitable[object]]) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await fn()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # A failed pass must never kill the loop — try again next interval
+            logger.exception("Periodic task %s failed", name)
+
+
+def start_periodic(name: str, interval: float, fn: Callable[[], Awaitable[object]]) -> None:
+    """Run fn every interval seconds in the background until stop_periodic()."""
+    if interval <= 0:
+        logger.info("Periodic task %s disabled", name)
+        return
+    _tasks.append(asyncio.create_task(_run_every(name, interval, fn), name=name))
+    logger.info("Periodic task %s started — every %ss", name, interval)
+
+
+async def stop_periodic() -> None:
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -1,14 +1,25 @@
 import logging
 from contextlib import asynccontextmanager
+from functools import partial
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.api.v1 import interviews, templates, webhooks, websocket
+from app.api.v1 import files, interviews, templates, uploads, webhooks, websocket
 from app.core.config import settings
 from app.core.database import connect_db, disconnect_db
+from app.core.deps import DBDep, require_metrics_token
 from app.core.limiter import limiter
+from app.core.metrics import metrics
+from app.core.periodic import start_periodic, stop_periodic
+from app.services.jobs import start_worker, stop_worker
+from app.services.metrics_snapshots import publish_metrics, recent_snapshots
+from app.services.pipeline import HANDLERS, mark_job_failed, worker_concurrency
+from app.services.preprocessing import close_preprocessing, init_preprocessing
+from app.services.storage import close_storage_backend, init_storage_backend
+from app.services.transcription import close_transcription_service, init_transcription_service
+from app.worker import start_maintenance
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
@@ -24,7 +35,20 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     logger.info("Starting up — environment: %s", settings.ENVIRONMENT)
     await connect_db()
+    init_storage_backend()
+    init_transcription_service()
+    if settings.JOBS_RUN_IN_API:
+        # Single-process setups: this process is the worker tier too (see app/worker.py)
+        init_preprocessing()
+        start_maintenance()
+        start_worker(HANDLERS, worker_concurrency(), on_dead=mark_job_failed)
+    start_periodic("metrics-publish", settings.METRICS_PUBLISH_INTERVAL_SECONDS, partial(publish_metrics, "api"))
     yield
+    await stop_worker()
+    await stop_periodic()
+    close_preprocessing()
+    await close_transcription_service()
+    close_storage_backend()
     await disconnect_db()
 
 
@@ -53,10 +77,12 @@ def create_app() -> FastAPI:
     )
 
     prefix = "/api/v1"
+    app.include_router(uploads.router,    prefix=prefix)
     app.include_router(interviews.router, prefix=prefix)
     app.include_router(templates.router,  prefix=prefix)
     app.include_router(webhooks.router,   prefix=prefix)
     app.include_router(websocket.router,  prefix=prefix)
+    app.include_router(files.router,      prefix=prefix)
 
     @app.get("/api/v1/health", tags=["Health"])
     async def health_check():
@@ -66,6 +92,19 @@ def create_app() -> FastAPI:
             "environment": settings.ENVIRONMENT,
         }
 
+    @app.get("/api/v1/health/metrics", tags=["Health"], dependencies=[Depends(require_metrics_token)])
+    async def health_metrics(db: DBDep):
+        """
+        Per-operation timings (storage calls etc.), gauges and counters for
+        this process, and the latest ones every process (workers included) published.
+        """
+        return {
+            "timings":   metrics.snapshot(),
+            "gauges":    metrics.gauges(),
+            "counters":  metrics.counters(),
+            "processes": await recent_snapshots(db),
+        }
+
     @app.exception_handler(HTTPException)
     async def http_exception_handler(request: Request, exc: HTTPException):
         return JSONResponse(
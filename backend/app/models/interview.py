@@ -1,7 +1,11 @@
-from datetime import datetime
+import re
+from bisect import bisect_left
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Any
 
+import numpy as np
+from bson import Binary
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
@@ -37,6 +41,214 @@ class Transcript(BaseModel):
     language_code: str = "en"
     confidence:    float = 0.0
 
+    @field_validator("words", mode="before")
+    @classmethod
+    def expand_columnar_words(cls, v: Any) -> Any:
+        return decode_words(v)
+
+
+class TranscriptSummary(BaseModel):
+    language_code:   str = "en"
+    confidence:      float = 0.0
+    word_count:      int = 0
+    utterance_count: int = 0
+
+
+# Columnar word storage
+#
+# Stored transcripts keep words as parallel columns instead of an array of
+# {text, start_ms, end_ms, confidence, speaker} subdocuments, whose repeated
+# keys made up most of a long interview's size. The columns are cut into
+# blocks of block_size words, so a window of a long transcript can $slice
+# just the blocks it spans (see transcripts.load_window). Each block holds:
+#   text         its words joined by a space — together the blocks are the
+#                transcript's full text, so it is not stored a second time
+#   start_ms     int32 little-endian, delta from the previous word's start
+#                (the block's first word: from 0)
+#   duration_ms  int32 little-endian, end_ms - start_ms
+#   confidence   uint8, confidence quantised to 1/255
+#   speaker      index into speakers: uint8, or uint16 little-endian when
+#                there are more than 256 (told apart by the column's length)
+# Utterances point at the words they span (word_range) rather than repeating
+# their text. columnar-v1 (words joined with \x1f) and columnar-v2 stored all
+# the columns as one block; documents from before either hold a plain list.
+# All of them still decode.
+# A space inside a word ("New York" as one token) is stored as a no-break
+# space so it doesn't split the word, and turned back into a space on read.
+# A no-break space the word really had is escaped with \x1b (as is \x1b
+# itself), so every word comes back exactly as it went in.
+
+WORDS_FORMAT = "columnar-v3"
+WORD_BLOCK_SIZE = 1024
+_SEPARATORS = {"columnar-v1": "\x1f", "columnar-v2": " "}
+_INNER_SPACE = "\u00a0"
+_ESCAPE = "\x1b"
+_UNESCAPE = re.compile("\x1b(.)|\u00a0", re.DOTALL)
+
+
+def _escape_word(text: str) -> str:
+    if _ESCAPE in text or _INNER_SPACE in text:
+        text = text.replace(_ESCAPE, _ESCAPE * 2).replace(_INNER_SPACE, _ESCAPE + _INNER_SPACE)
+    return text.replace(" ", _INNER_SPACE)
+
+
+def _unescape_words(text: str) -> str:
+    if _ESCAPE in text:
+        return _UNESCAPE.sub(lambda m: m.group(1) or " ", text)
+    return text.replace(_INNER_SPACE, " ")
+
+
+def _split_words(text: str) -> list[str]:
+    """The words of one block's (or a columnar-v2 document's) text."""
+    texts = text.split(" ")
+    if _INNER_SPACE in text or _ESCAPE in text:
+        texts = [_unescape_words(t) for t in texts]
+    return texts
+
+
+def encode_words(words: list[dict], block_size: int = WORD_BLOCK_SIZE) -> dict:
+    """Pack parsed transcript words into the columnar storage format."""
+    n = len(words)
+    starts = np.fromiter((w["start_ms"] for w in words), dtype=np.int64, count=n)
+    ends = np.fromiter((w["end_ms"] for w in words), dtype=np.int64, count=n)
+    confidence = np.fromiter((w.get("confidence") or 0.0 for w in words), dtype=np.float64, count=n)
+    confidence = np.rint(np.clip(confidence, 0.0, 1.0) * 255).astype(np.uint8)
+
+    speakers: list[str | None] = []
+    codes: dict[str | None, int] = {}
+    speaker = np.empty(n, dtype=np.int64)
+    for i, w in enumerate(words):
+        label = w.get("speaker")
+        if label not in codes:
+            codes[label] = len(speakers)
+            speakers.append(label)
+        speaker[i] = codes[label]
+    speaker = speaker.astype(np.uint8 if len(speakers) <= 256 else "<u2")
+
+    blocks = []
+    for first in range(0, n, block_size):
+        block = slice(first, first + block_size)
+        blocks.append({
+            # A space inside a word would split it in two on decode
+            "text":        " ".join(_escape_word(w["text"]) for w in words[block]),
+            "start_ms":    Binary(np.diff(starts[block], prepend=0).astype("<i4").tobytes()),
+            "duration_ms": Binary((ends[block] - starts[block]).astype("<i4").tobytes()),
+            "confidence":  Binary(confidence[block].tobytes()),
+            "speaker":     Binary(speaker[block].tobytes()),
+        })
+    return {
+        "format":     WORDS_FORMAT,
+        "count":      n,
+        "block_size": block_size,
+        "blocks":     blocks,
+        "speakers":   speakers,
+    }
+
+
+def word_texts(words: dict | list | None) -> list[str]:
+    """The text of each stored word, without expanding the other columns."""
+    if not isinstance(words, dict):
+        return [w["text"] for w in words or []]
+    if not words["count"]:
+        return []
+    if "blocks" in words:
+        return [text for block in words["blocks"] for text in _split_words(block["text"])]
+    if words["format"] == "columnar-v2":
+        return _split_words(words["text"])
+    return words["text"].split(_SEPARATORS[words["format"]])
+
+
+def words_text(words: dict | list | None) -> str:
+    """The transcript's full text as derived from its words."""
+    if isinstance(words, dict) and words["count"] and words["format"] != "columnar-v1":
+        if "blocks" in words:
+            return " ".join(_unescape_words(block["text"]) for block in words["blocks"])
+        return _unescape_words(words["text"])
+    return " ".join(word_texts(words))
+
+
+def _decode_columns(columns: dict, texts: list[str], speakers: list, start: int = 0, stop: int | None = None) -> list[dict]:
+    """Expand words[start:stop] of one set of columns, given their texts."""
+    window = slice(start, stop)
+    # Start times are deltas, so the running sum is needed up to stop
+    starts = np.cumsum(np.frombuffer(columns["start_ms"], dtype="<i4")[:stop], dtype=np.int64)[start:]
+    ends = starts + np.frombuffer(columns["duration_ms"], dtype="<i4")[window]
+    confidence = np.round(np.frombuffer(columns["confidence"], dtype=np.uint8)[window] / 255, 3)
+    count = len(columns["start_ms"]) // 4
+    codes = np.frombuffer(columns["speaker"], dtype=np.uint8 if len(columns["speaker"]) == count else "<u2")[window]
+    return [
+        {"text": text, "start_ms": start_ms, "end_ms": end_ms, "confidence": conf, "speaker": speakers[code]}
+        for text, start_ms, end_ms, conf, code in zip(
+            texts[window],
+            starts.tolist(),
+            ends.tolist(),
+            confidence.tolist(),
+            codes.tolist(),
+        )
+    ]
+
+
+def decode_words(words: dict | list | None, start: int = 0, stop: int | None = None) -> list[dict]:
+    """
+    Expand stored words (columnar or legacy list), or just words[start:stop],
+    back into word dicts. Only the blocks holding that range are decoded.
+    """
+    if not isinstance(words, dict):
+        return (words or [])[start:stop] if start or stop is not None else words or []
+    if not words["count"]:
+        return []
+    if "blocks" not in words:
+        return _decode_columns(words, word_texts(words), words["speakers"], start, stop)
+    size = words["block_size"]
+    stop = words["count"] if stop is None else min(stop, words["count"])
+    first, last = start // size, -(-stop // size)
+    decoded = [
+        word
+        for block in words["blocks"][first:last]
+        for word in _decode_columns(block, _split_words(block["text"]), words["speakers"])
+    ]
+    return decoded[start - first * size:stop - first * size]
+
+
+def encode_utterances(utterances: list[dict], words: list[dict]) -> list[dict]:
+    """
+    Replace each utterance's text with the [first, last) range of words it
+    spans. The text is kept only where the words don't reproduce it exactly.
+    """
+    starts = [w["start_ms"] for w in words]
+    texts = [w["text"] for w in words]
+    encoded = []
+    for u in utterances:
+        first = bisect_left(starts, u["start_ms"])
+        last = bisect_left(starts, u["end_ms"], first)
+        compact = {key: value for key, value in u.items() if key != "text"}
+        compact["word_range"] = [first, last]
+        if " ".join(texts[first:last]) != u.get("text", ""):
+            compact["text"] = u.get("text", "")
+        encoded.append(compact)
+    return encoded
+
+
+def decode_utterances(utterances: list[dict], texts: list[str]) -> list[dict]:
+    """Restore utterance text from word_range, given the stored word texts (see word_texts)."""
+    decoded = []
+    join = " ".join
+    for u in utterances:
+        utterance = u.copy()
+        word_range = utterance.pop("word_range", None)
+        if word_range is not None and "text" not in utterance:
+            utterance["text"] = join(texts[word_range[0]:word_range[1]])
+        decoded.append(utterance)
+    return decoded
+
+
+class MediaInfo(BaseModel):
+    container:        str
+    codec:            str | None = None
+    duration_seconds: float | None = None
+    sample_rate:      int | None = None
+    channels:         int | None = None
+
 
 class SentimentBySpeaker(BaseModel):
     overall: str
@@ -81,24 +293,28 @@ class AIAnalysis(BaseModel):
 class InterviewResponse(BaseModel):
     model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
 
-    id:               str = Field(alias="_id")
-    user_id:          str
-    title:            str
-    original_name:    str
-    filename:         str
-    file_size:        int
-    file_type:        str
-    storage_key:      str
-    duration_seconds: float | None = None
-    status:           InterviewStatus
-    error_message:    str | None = None
-    deepgram_job_id:  str | None = None
-    template_id:      str | None = None
-    transcript:       Transcript | None = None
-    ai_analysis:      AIAnalysis | None = None
-    tags:             list[str] = []
-    created_at:       datetime
-    updated_at:       datetime
+    id:                 str = Field(alias="_id")
+    user_id:            str
+    title:              str
+    original_name:      str
+    filename:           str
+    file_size:          int
+    file_type:          str
+    storage_key:        str
+    content_hash:       str | None = None
+    media:              MediaInfo | None = None
+    duration_seconds:   float | None = None
+    status:             InterviewStatus
+    error_message:      str | None = None
+    deepgram_job_id:    str | None = None
+    template_id:        str | None = None
+    # Stored in the transcripts collection; only the detail endpoint loads it
+    transcript:         Transcript | None = None
+    transcript_summary: TranscriptSummary | None = None
+    ai_analysis:        AIAnalysis | None = None
+    tags:               list[str] = []
+    created_at:         datetime
+    updated_at:         datetime
 
     @field_validator("id", "user_id", "template_id", mode="before")
     @classmethod
@@ -135,4 +351,48 @@ class InterviewSummaryResponse(BaseModel):
 
 class UpdateInterviewRequest(BaseModel):
     title: str | None = Field(None, min_length=1, max_length=200)
-    tags:  list[str] | None = None
\ No newline at end of file
+    tags:  list[str] | None = None
+
+
+def new_interview_document(
+    user_id: str,
+    title: str,
+    original_name: str,
+    storage_key: str,
+    file_size: int,
+    file_type: str,
+    content_hash: str | None = None,
+    media: dict | None = None,
+) -> dict:
+    """
+    Build the MongoDB document for a freshly uploaded interview.
+    media is the header probe result (container, codec, duration_seconds,
+    sample_rate, channels); its duration is shown until Deepgram reports one.
+    """
+    now = datetime.now(timezone.utc)
+    return {
+        "user_id":            user_id,
+        "title":              title,
+        "original_name":      original_name,
+        "filename":           storage_key.split("/")[-1],
+        "file_size":          file_size,
+        "file_type":          file_type,
+        "storage_key":        storage_key,
+        "content_hash":       content_hash,
+        "media":              media,
+        "audio_storage_key":  None,
+        "audio_file_size":    None,
+        "audio_offset_map":   None,
+        "audio_segments":     None,
+        "duration_seconds":   (media or {}).get("duration_seconds"),
+        "status":             InterviewStatus.uploaded.value,
+        "error_message":      None,
+        "deepgram_job_id":    None,
+        "template_id":        None,
+        "transcript_summary": None,
+        "ai_analysis":        None,
+        "tags":               [],
+        "notifications":      [],
+        "created_at":         now,
+        "updated_at":         now,
+    }
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class CreateUploadSessionRequest(BaseModel):
+    filename:     str = Field(..., min_length=1, max_length=255)
+    content_type: str
+    total_size:   int = Field(..., gt=0)
+    title:        str | None = Field(None, min_length=1, max_length=200)
@@ -9,6 +9,7 @@ from openai import AsyncOpenAI
 from app.core.config import settings
 from app.core.database import get_db
 from app.services.notification import manager
+from app.services.transcripts import load_transcript
 
 logger = logging.getLogger(__name__)
 
@@ -221,11 +222,13 @@ async def _run_mock_analysis(transcript_text: str) -> tuple[dict, int, int]:
 
 # Main analysis runner
 
-async def run_analysis(interview_id: str, user_id: str | None) -> None:
+async def run_analysis(interview_id: str, user_id: str | None, reraise: bool = False) -> None:
     """
-    Called by webhooks.py after transcription completes.
+    Run from the job queue (see pipeline.py) after transcription completes.
     Fetches the interview, calls the configured AI backend, saves result, notifies user.
     Supported backends: "mock" | "openai" | "gemini"
+    With reraise, a failed AI call propagates so the queue can retry it
+    instead of marking the interview failed straight away.
     """
     db = get_db()
 
@@ -235,7 +238,7 @@ async def run_analysis(interview_id: str, user_id: str | None) -> None:
         logger.error("run_analysis: invalid interview_id %s", interview_id)
         return
 
-    interview = await db["interviews"].find_one({"_id": oid})
+    interview = await db["interviews"].find_one({"_id": oid}, {"ai_analysis": 1, "transcript_summary": 1, "template_id": 1})
     if not interview:
         logger.error("run_analysis: interview not found %s", interview_id)
         return
@@ -245,7 +248,7 @@ async def run_analysis(interview_id: str, user_id: str | None) -> None:
         logger.info("run_analysis: already analysed %s, skipping", interview_id)
         return
 
-    transcript = interview.get("transcript")
+    transcript = await load_transcript(db, oid, ["text"]) if interview.get("transcript_summary") else None
     if not transcript or not transcript.get("text"):
         await _mark_failed(interview_id, "No transcript available for analysis.")
         return
@@ -282,6 +285,8 @@ async def run_analysis(interview_id: str, user_id: str | None) -> None:
                 transcript_text, template_prompt
             )
     except Exception as exc:
+        if reraise:
+            raise
         logger.exception("run_analysis: analysis failed: %s", exc)
         await _mark_failed(interview_id, f"AI analysis failed: {str(exc)}")
         if user_id:
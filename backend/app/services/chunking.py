@@ -0,0 +1,239 @@
+"""
+Chunked transcription of long recordings.
+
+Deepgram's turnaround grows with the length of the file, so with
+CHUNKED_TRANSCRIPTION_ENABLED preprocessing also splits a long recording at
+pauses (see silence.quiet_split_points) into segments that reach
+CHUNK_OVERLAP_SECONDS into their neighbours. Each is submitted as its own
+job with ?segment=n on the callback URL. Every segment result is parsed onto
+the recording's timeline with the segment's offset map and kept in
+transcript_segments. When the last one arrives they are stitched into one
+transcript:
+
+- at each boundary the words both segments heard are aligned, and the
+  transcript switches segment at the shared word nearest the split, so the
+  overlap is kept once
+- Deepgram numbers speakers per job, so each segment's labels are mapped
+  onto the first segment's. The overlap's shared words say which voices
+  are the same. A voice not heard there takes over from whoever spoke most
+  recently, on the assumption that the conversation carries on across the
+  split.
+"""
+import re
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.services.silence import build_offset_map
+from app.services.transcription import _speaker_label
+from app.services.transcripts import compact_transcript, expand_transcript
+
+COLLECTION = "transcript_segments"
+
+# The same word heard by two segments is timed within this of itself
+MAX_DRIFT_MS = 500
+# Utterances of one speaker either side of a split closer than this are one turn
+MERGE_GAP_MS = 1000
+
+_NON_WORD = re.compile(r"\W+")
+
+
+def plan_segments(
+    points: list[int],
+    kept: list[tuple[int, int]],
+    total: int,
+    sample_rate: int,
+    overlap_ms: int,
+) -> list[dict]:
+    """
+    Split a recording of total samples at points. kept are the [start, end)
+    sample ranges that survive silence trimming. Returns one
+    {"spans", "offset_map", "start_ms", "end_ms"} per segment: the sample
+    ranges to encode, the map from the segment's timeline back to the
+    recording's, and the part of the recording the segment stands for.
+    Segments that would be all silence are left out.
+    """
+    overlap = overlap_ms * sample_rate // 1000
+    bounds = [0, *points, total]
+    segments = []
+    for start, end in zip(bounds, bounds[1:]):
+        first, last = max(start - overlap, 0), min(end + overlap, total)
+        spans = [(max(s, first), min(e, last)) for s, e in kept if min(e, last) > max(s, first)]
+        if not spans:
+            continue
+        segments.append({
+            "spans":      spans,
+            "offset_map": build_offset_map(spans, sample_rate, last),
+            "start_ms":   start * 1000 // sample_rate,
+            "end_ms":     end * 1000 // sample_rate,
+        })
+    return segments
+
+
+def _norm(text: str) -> str:
+    return _NON_WORD.sub("", text.lower())
+
+
+def _shared_words(words: list[dict], incoming: list[dict]) -> list[tuple[int, int]]:
+    """(index in words, index in incoming) of the words both segments transcribed."""
+    if not words or not incoming:
+        return []
+    first = bisect_left(words, incoming[0]["start_ms"] - MAX_DRIFT_MS, key=lambda w: w["start_ms"])
+    last = bisect_left(incoming, words[-1]["end_ms"] + MAX_DRIFT_MS, key=lambda w: w["start_ms"])
+    tail, head = words[first:], incoming[:last]
+    matcher = SequenceMatcher(None, [_norm(w["text"]) for w in tail], [_norm(w["text"]) for w in head], autojunk=False)
+    return [
+        (first + block.a + k, block.b + k)
+        for block in matcher.get_matching_blocks()
+        for k in range(block.size)
+        if abs(tail[block.a + k]["start_ms"] - head[block.b + k]["start_ms"]) <= MAX_DRIFT_MS
+    ]
+
+
+def _map_speakers(words: list[dict], incoming: list[dict], utterances: list[dict], shared: list[tuple[int, int]]) -> dict:
+    """Map an incoming segment's speaker labels onto the ones used so far."""
+    mapping: dict = {}
+    votes = Counter((incoming[j]["speaker"], words[i]["speaker"]) for i, j in shared)
+    for (label, known), _ in votes.most_common():
+        if label not in mapping and known not in mapping.values():
+            mapping[label] = known
+    # Most recent first
+    recent = list(dict.fromkeys(w["speaker"] for w in reversed(words)))
+    free = [known for known in recent if known not in mapping.values()]
+    used = len(recent)
+    for label in dict.fromkeys([w["speaker"] for w in incoming] + [u["speaker"] for u in utterances]):
+        if label in mapping:
+            continue
+        if free:
+            mapping[label] = free.pop(0)
+        else:
+            mapping[label] = _speaker_label(used)
+            used += 1
+    return mapping
+
+
+def _clip(utterance: dict, words: list[dict], start_ms: int, end_ms: int) -> dict | None:
+    """utterance cut down to its words starting within [start_ms, end_ms), or None if there are none."""
+    lo = bisect_left(words, max(utterance["start_ms"], start_ms), key=lambda w: w["start_ms"])
+    hi = bisect_left(words, min(utterance["end_ms"], end_ms), key=lambda w: w["start_ms"])
+    inside = words[lo:hi]
+    if not inside:
+        return None
+    return {
+        **utterance,
+        "text":     " ".join(w["text"] for w in inside),
+        "start_ms": inside[0]["start_ms"],
+        "end_ms":   inside[-1]["end_ms"],
+    }
+
+
+def stitch_segments(segments: list[dict]) -> dict:
+    """
+    Join segment results, in order, into one parse result. Each segment is
+    {"start_ms", "end_ms", "transcript", "duration_seconds"} with timestamps
+    already on the recording's timeline.
+    """
+    words: list[dict] = []
+    utterances: list[dict] = []
+    weighted_confidence = 0.0
+    for segment in segments:
+        transcript = segment["transcript"]
+        incoming = transcript["words"]
+        weighted_confidence += transcript.get("confidence", 0.0) * len(incoming)
+
+        shared = _shared_words(words, incoming)
+        mapping = _map_speakers(words, incoming, transcript["utterances"], shared)
+        if shared:
+            # Switch over at the shared word nearest the split
+            i, j = min(shared, key=lambda pair: abs(incoming[pair[1]]["start_ms"] - segment["start_ms"]))
+            cut_ms = incoming[j]["start_ms"]
+        else:
+            cut_ms = segment["start_ms"] if words else 0
+            i = bisect_left(words, cut_ms, key=lambda w: w["start_ms"])
+            j = bisect_left(incoming, cut_ms, key=lambda w: w["start_ms"])
+        del words[i:]
+        incoming = [{**w, "speaker": mapping[w["speaker"]]} for w in incoming[j:]]
+
+        # Utterances running over the switch keep only their own side's words
+        while utterances and utterances[-1]["end_ms"] > cut_ms:
+            clipped = _clip(utterances.pop(), words, 0, cut_ms)
+            if clipped:
+                utterances.append(clipped)
+                break
+        for utterance in transcript["utterances"]:
+            if utterance["end_ms"] <= cut_ms:
+                continue
+            utterance = {**utterance, "speaker": mapping[utterance["speaker"]]}
+            if utterance["start_ms"] < cut_ms:
+                utterance = _clip(utterance, incoming, cut_ms, utterance["end_ms"] + 1)
+                if utterance is None:
+                    continue
+            previous = utterances[-1] if utterances else None
+            if (
+                previous and previous["speaker"] == utterance["speaker"]
+                and utterance["start_ms"] - previous["end_ms"] < MERGE_GAP_MS
+                and previous["end_ms"] <= cut_ms <= utterance["start_ms"]
+            ):
+                # One turn the split ran through
+                previous.update(text=f"{previous['text']} {utterance['text']}", end_ms=utterance["end_ms"])
+                continue
+            utterances.append(utterance)
+        words.extend(incoming)
+
+    first = segments[0]["transcript"] if segments else {}
+    total_words = sum(len(s["transcript"]["words"]) for s in segments)
+    return {
+        "transcript": {
+            "text":          " ".join(w["text"] for w in words),
+            "words":         words,
+            "utterances":    utterances,
+            "language_code": first.get("language_code", "en"),
+            "confidence":    weighted_confidence / total_words if total_words else first.get("confidence", 0.0),
+        },
+        "duration_seconds": max((s.get("duration_seconds") or 0 for s in segments), default=0),
+    }
+
+
+async def save_segment_result(db: AsyncIOMotorDatabase, interview_id: ObjectId, index: int, parsed: dict) -> None:
+    await db[COLLECTION].replace_one(
+        {"_id": f"{interview_id}:{index}"},
+        {
+            "interview_id":     interview_id,
+            "index":            index,
+            "transcript":       compact_transcript(parsed["transcript"]),
+            "duration_seconds": parsed.get("duration_seconds"),
+            "received_at":      datetime.now(timezone.utc),
+        },
+        upsert=True,
+    )
+
+
+async def received_segments(db: AsyncIOMotorDatabase, interview_id: ObjectId) -> set[int]:
+    """Indexes of the segments whose result is in."""
+    docs = await db[COLLECTION].find({"interview_id": interview_id}, {"index": 1}).to_list(length=None)
+    return {doc["index"] for doc in docs}
+
+
+async def collect_segments(db: AsyncIOMotorDatabase, interview_id: ObjectId, segments: list[dict]) -> dict | None:
+    """The stitched parse result once every one of segments (audio_segments) is in, else None."""
+    docs = await db[COLLECTION].find({"interview_id": interview_id}).to_list(length=None)
+    results = {doc["index"]: doc for doc in docs}
+    if any(index not in results for index in range(len(segments))):
+        return None
+    return stitch_segments([
+        {
+            "start_ms":         segment["start_ms"],
+            "end_ms":           segment["end_ms"],
+            "transcript":       expand_transcript(results[index]["transcript"]),
+            "duration_seconds": results[index]["duration_seconds"],
+        }
+        for index, segment in enumerate(segments)
+    ])
+
+
+async def clear_segment_results(db: AsyncIOMotorDatabase, interview_id: ObjectId) -> None:
+    await db[COLLECTION].delete_many({"interview_id": interview_id})
@@ -0,0 +1,135 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.services.transcripts import copy_transcript
+from app.services.waveform import COLLECTION as WAVEFORM_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+# An interview about to reuse a storage object holds it here, keyed by the
+# interview's _id, until it is inserted and references the object itself.
+# release_storage_object leaves held objects alone, so the object can't be
+# deleted between the dedup lookup and the insert.
+HOLDS_COLLECTION = "storage_holds"
+# A hold older than this belongs to an insert that never happened; the
+# storage reaper collects the object if nothing references it
+HOLD_SECONDS = 3600
+
+
+def _same_content(content_hash: str) -> dict:
+    # The $type matches the partial index on content_hash, so the planner can use it
+    return {"content_hash": {"$eq": content_hash, "$type": "string"}}
+
+
+def _references(storage_key: str) -> dict:
+    return {"$or": [
+        {"storage_key": storage_key},
+        {"audio_storage_key": storage_key},
+        {"audio_segments.storage_key": storage_key},
+    ]}
+
+
+async def reuse_existing_upload(db: AsyncIOMotorDatabase, storage, document: dict) -> dict:
+    """
+    If another interview already has the same content_hash, point this
+    document at that storage object (dropping the copy just uploaded) and
+    carry over its transcript so the recording is never transcribed twice.
+    Mutates and returns document.
+    """
+    content_hash = document.get("content_hash")
+    if not content_hash:
+        return document
+
+    projection = {
+        "storage_key":        1,
+        "audio_storage_key":  1,
+        "audio_file_size":    1,
+        "audio_offset_map":   1,
+        "audio_segments":     1,
+        "transcript_summary": 1,
+        "duration_seconds":   1,
+    }
+    # Prefer a copy that has already been transcribed
+    existing = (
+        await db["interviews"].find_one({**_same_content(content_hash), "transcript_summary": {"$ne": None}}, projection)
+        or await db["interviews"].find_one(_same_content(content_hash), projection)
+    )
+    if not existing or existing["storage_key"] == document["storage_key"]:
+        return document
+
+    # Hold the object, then make sure it wasn't released before the hold landed
+    document.setdefault("_id", ObjectId())
+    await db[HOLDS_COLLECTION].replace_one(
+        {"_id": document["_id"]},
+        {"storage_key": existing["storage_key"], "held_at": datetime.now(timezone.utc)},
+        upsert=True,
+    )
+    if not await db["interviews"].count_documents(_references(existing["storage_key"]), limit=1):
+        await drop_storage_hold(db, document["_id"])
+        return document
+
+    duplicate_key = document["storage_key"]
+    document["storage_key"] = existing["storage_key"]
+    document["filename"]    = existing["storage_key"].split("/")[-1]
+    if existing.get("audio_storage_key"):
+        document["audio_storage_key"] = existing["audio_storage_key"]
+        document["audio_file_size"]   = existing.get("audio_file_size")
+        document["audio_offset_map"]  = existing.get("audio_offset_map")
+        document["audio_segments"]    = existing.get("audio_segments")
+    if existing.get("transcript_summary"):
+        # The copy is keyed by this interview's id, fixed above
+        summary = await copy_transcript(db, existing["_id"], document["_id"], document.get("user_id"))
+        if summary:
+            document["transcript_summary"] = summary
+            document["duration_seconds"]   = existing.get("duration_seconds") or document.get("duration_seconds")
+
+    try:
+        await storage.delete(duplicate_key)
+    except Exception:
+        logger.warning("Could not delete duplicate upload %s", duplicate_key)
+
+    logger.info("Upload deduplicated: %s reuses %s", content_hash[:12], existing["storage_key"])
+    return document
+
+
+async def find_existing_transcript(db: AsyncIOMotorDatabase, interview: dict) -> dict | None:
+    """
+    Return {"_id", "transcript_summary", "duration_seconds"} of an interview
+    with the same content that has been transcribed — interview itself if it has.
+    """
+    if interview.get("transcript_summary"):
+        return interview
+
+    content_hash = interview.get("content_hash")
+    if not content_hash:
+        return None
+
+    return await db["interviews"].find_one(
+        {**_same_content(content_hash), "transcript_summary": {"$ne": None}},
+        {"transcript_summary": 1, "duration_seconds": 1},
+    )
+
+
+async def release_storage_object(db: AsyncIOMotorDatabase, storage, storage_key: str) -> bool:
+    """
+    Delete a storage object once no interview references it any more.
+    Deduplicated interviews share objects, so deleting one copy must not
+    remove the file from under the others, nor from under an upload that
+    is about to reuse it. Returns True if it was deleted.
+    """
+    if await db["interviews"].count_documents(_references(storage_key), limit=1):
+        return False
+    held_since = datetime.now(timezone.utc) - timedelta(seconds=HOLD_SECONDS)
+    if await db[HOLDS_COLLECTION].count_documents({"storage_key": storage_key, "held_at": {"$gt": held_since}}, limit=1):
+        return False
+    await storage.delete(storage_key)
+    await db[WAVEFORM_COLLECTION].delete_one({"_id": storage_key})
+    return True
+
+
+async def drop_storage_hold(db: AsyncIOMotorDatabase, interview_id: ObjectId) -> None:
+    """Drop the hold an interview took in reuse_existing_upload, if any."""
+    await db[HOLDS_COLLECTION].delete_one({"_id": interview_id})
@@ -0,0 +1,319 @@
+"""
+Durable job queue on a Mongo collection.
+
+Pipeline stages are stored as job documents instead of fire-and-forget
+asyncio tasks, so a restart or crash never loses work. A worker leases a job
+atomically with find_one_and_update; the lease lasts
+JOB_VISIBILITY_TIMEOUT_SECONDS and is extended while the handler runs, so a
+job held by a worker that died becomes visible again on its own. Failures
+are retried with exponential backoff; after JOB_MAX_ATTEMPTS the job is
+dead-lettered (status "dead") and kept for inspection.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "jobs"
+
+Handler = Callable[[dict], Awaitable[None]]
+DeadLetterHook = Callable[[dict], Awaitable[None]]
+
+
+class Deferred(Exception):
+    """
+    Raised by a handler whose job can't run yet: the job goes back to the
+    queue for delay seconds without counting as an attempt.
+    """
+
+    def __init__(self, delay: float, reason: str = ""):
+        super().__init__(reason)
+        self.delay = delay
+
+
+async def enqueue(db: AsyncIOMotorDatabase, kind: str, payload: dict, key: str | None = None) -> str | None:
+    """
+    Add a job. With a key, at most one job per key is pending or running at
+    a time — enqueueing again is a no-op that returns None.
+    Returns the job id.
+    """
+    now = datetime.now(timezone.utc)
+    job = {
+        "kind":             kind,
+        "payload":          payload,
+        "status":           "pending",
+        "attempts":         0,
+        "run_at":           now,
+        "lease_id":         None,
+        "lease_expires_at": None,
+        "last_error":       None,
+        "created_at":       now,
+        "updated_at":       now,
+    }
+    if key is None:
+        result = await db[COLLECTION].insert_one(job)
+        return str(result.inserted_id)
+
+    # active_key has a unique index; it is removed once the job finishes
+    try:
+        result = await db[COLLECTION].update_one(
+            {"active_key": key},
+            {"$setOnInsert": {**job, "active_key": key}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return None
+    return str(result.upserted_id) if result.upserted_id else None
+
+
+async def is_active(db: AsyncIOMotorDatabase, key: str) -> bool:
+    """Whether a job enqueued with key is still pending or running."""
+    return bool(await db[COLLECTION].count_documents({"active_key": key}, limit=1))
+
+
+async def run_now(db: AsyncIOMotorDatabase, key: str) -> None:
+    """Bring a pending (e.g. deferred) job enqueued with key forward so it runs on the next lease."""
+    await db[COLLECTION].update_one(
+        {"active_key": key, "status": "pending"},
+        {"$set": {"run_at": datetime.now(timezone.utc)}},
+    )
+
+
+async def lease(db: AsyncIOMotorDatabase, kinds: list[str]) -> dict | None:
+    """Claim the next due job of one of kinds, or an abandoned one whose lease ran out."""
+    now = datetime.now(timezone.utc)
+    return await db[COLLECTION].find_one_and_update(
+        {
+            "kind": {"$in": kinds},
+            "$or": [
+                {"status": "pending", "run_at": {"$lte": now}},
+                {"status": "running", "lease_expires_at": {"$lte": now}},
+            ],
+        },
+        {
+            "$set": {
+                "status":           "running",
+                "lease_id":         uuid.uuid4().hex,
+                "lease_expires_at": now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS),
+                "updated_at":       now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("run_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def extend_lease(db: AsyncIOMotorDatabase, job: dict) -> bool:
+    """Push the lease out again; False if another worker has taken the job over."""
+    now = datetime.now(timezone.utc)
+    result = await db[COLLECTION].update_one(
+        {"_id": job["_id"], "lease_id": job["lease_id"]},
+        {"$set": {
+            "lease_expires_at": now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS),
+            "updated_at":       now,
+        }},
+    )
+    return result.matched_count == 1
+
+
+async def complete(db: AsyncIOMotorDatabase, job: dict) -> None:
+    await db[COLLECTION].delete_one({"_id": job["_id"], "lease_id": job["lease_id"]})
+
+
+async def release(db: AsyncIOMotorDatabase, job: dict) -> None:
+    """Hand an interrupted job straight back to the queue without counting the attempt."""
+    now = datetime.now(timezone.utc)
+    await db[COLLECTION].update_one(
+        {"_id": job["_id"], "lease_id": job["lease_id"]},
+        {
+            "$set": {"status": "pending", "run_at": now, "lease_id": None, "lease_expires_at": None, "updated_at": now},
+            "$inc": {"attempts": -1},
+        },
+    )
+
+
+async def defer(db: AsyncIOMotorDatabase, job: dict, delay: float) -> None:
+    """Put a job back to run after delay seconds; like release, the attempt isn't counted."""
+    now = datetime.now(timezone.utc)
+    await db[COLLECTION].update_one(
+        {"_id": job["_id"], "lease_id": job["lease_id"]},
+        {
+            "$set": {
+                "status":           "pending",
+                "run_at":           now + timedelta(seconds=delay),
+                "lease_id":         None,
+                "lease_expires_at": None,
+                "updated_at":       now,
+            },
+            "$inc": {"attempts": -1},
+        },
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    return min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+
+
+async def fail(db: AsyncIOMotorDatabase, job: dict, error: str) -> bool:
+    """Schedule a retry with backoff, or dead-letter the job. Returns True if it is now dead."""
+    now = datetime.now(timezone.utc)
+    dead = job["attempts"] >= settings.JOB_MAX_ATTEMPTS
+    if dead:
+        update = {
+            "$set":   {"status": "dead", "last_error": error, "lease_id": None, "updated_at": now},
+            "$unset": {"active_key": ""},
+        }
+    else:
+        update = {"$set": {
+            "status":           "pending",
+            "run_at":           now + timedelta(seconds=retry_delay(job["attempts"])),
+            "last_error":       error,
+            "lease_id":         None,
+            "lease_expires_at": None,
+            "updated_at":       now,
+        }}
+    await db[COLLECTION].update_one({"_id": job["_id"], "lease_id": job["lease_id"]}, update)
+    return dead
+
+
+class JobWorker:
+    """
+    Runs jobs from the queue with handlers keyed by job kind. Each kind has
+    its own pool of consumers (concurrency[kind]), so a backlog of one stage
+    can't starve the others.
+    """
+
+    def __init__(
+        self,
+        handlers: dict[str, Handler],
+        concurrency: dict[str, int],
+        on_dead: DeadLetterHook | None = None,
+    ):
+        self._handlers = handlers
+        self._concurrency = concurrency
+        self._on_dead = on_dead
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def run(self) -> None:
+        """Consume until stop() — in-flight jobs are finished first."""
+        await asyncio.gather(*(
+            self._consume(kind)
+            for kind, slots in self._concurrency.items() if kind in self._handlers
+            for _ in range(slots)
+        ))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run(), name="job-worker")
+
+    async def stop(self, grace: float) -> None:
+        """
+        Stop leasing, give running jobs up to grace seconds to finish, then
+        cancel the rest — those are released back to the queue straight away.
+        """
+        self._stopping.set()
+        if self._task is None:
+            return
+        _, pending = await asyncio.wait({self._task}, timeout=grace)
+        if pending:
+            logger.warning("Jobs still running after %ss, interrupting them", grace)
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _consume(self, kind: str) -> None:
+        db = get_db()
+        while not self._stopping.is_set():
+            try:
+                job = await lease(db, [kind])
+            except Exception:
+                logger.exception("Could not lease a %s job", kind)
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), settings.JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.run_job(db, job)
+
+    async def run_job(self, db: AsyncIOMotorDatabase, job: dict) -> None:
+        if job["attempts"] > settings.JOB_MAX_ATTEMPTS:
+            # Its lease kept expiring — the job takes its worker down with it
+            await self._dead_letter(db, job, "Lease expired on every attempt")
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(db, job))
+        try:
+            with metrics.timer(f"jobs.{job['kind']}"):
+                await self._handlers[job["kind"]](job["payload"])
+        except asyncio.CancelledError:
+            # Interrupted at shutdown — let another worker pick it up now rather than after the lease
+            await asyncio.shield(release(db, job))
+            raise
+        except Deferred as exc:
+            await defer(db, job, exc.delay)
+        except Exception as exc:
+            logger.warning("Job %s (%s) failed on attempt %d: %s", job["_id"], job["kind"], job["attempts"], exc)
+            if await fail(db, job, str(exc) or exc.__class__.__name__):
+                await self._notify_dead(job, str(exc) or exc.__class__.__name__)
+        else:
+            await complete(db, job)
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, db: AsyncIOMotorDatabase, job: dict) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_VISIBILITY_TIMEOUT_SECONDS / 3)
+            try:
+                if not await extend_lease(db, job):
+                    return
+            except Exception:
+                logger.warning("Could not extend lease of job %s", job["_id"])
+
+    async def _dead_letter(self, db: AsyncIOMotorDatabase, job: dict, error: str) -> None:
+        await fail(db, {**job, "attempts": settings.JOB_MAX_ATTEMPTS}, error)
+        await self._notify_dead(job, error)
+
+    async def _notify_dead(self, job: dict, error: str) -> None:
+        logger.error("Job %s (%s) dead-lettered: %s", job["_id"], job["kind"], error)
+        if self._on_dead is not None:
+            try:
+                await self._on_dead({**job, "last_error": error})
+            except Exception:
+                logger.exception("Dead-letter hook failed for job %s", job["_id"])
+
+
+_worker: JobWorker | None = None
+
+
+def start_worker(
+    handlers: dict[str, Handler],
+    concurrency: dict[str, int],
+    on_dead: DeadLetterHook | None = None,
+) -> None:
+    """Drain the queue in the background of this process until stop_worker()."""
+    global _worker
+    if _worker is None:
+        _worker = JobWorker(handlers, concurrency, on_dead)
+        _worker.start()
+        logger.info("Job worker started — concurrency %s", concurrency)
+
+
+async def stop_worker() -> None:
+    global _worker
+    if _worker is not None:
+        await _worker.stop(settings.JOB_SHUTDOWN_GRACE_SECONDS)
+        _worker = None
@@ -0,0 +1,417 @@
+"""
+Lightweight container probing from the first and last few KB of an upload.
+Nothing is decoded — only headers are parsed — so it runs inline while the
+file streams to storage.
+"""
+import struct
+
+# How much of the start and end of each upload is kept for probing
+HEAD_BYTES = 64 * 1024
+TAIL_BYTES = 64 * 1024
+
+# Which claimed MIME types are acceptable for each sniffed container
+CONTAINER_MIME_TYPES: dict[str, set[str]] = {
+    "mp3":  {"audio/mpeg"},
+    "wav":  {"audio/wav", "audio/x-wav"},
+    "mp4":  {"audio/mp4", "video/mp4", "video/quicktime"},
+    "ogg":  {"audio/ogg"},
+    "webm": {"audio/webm", "video/webm"},
+}
+
+
+# Top-level box types an MP4/QuickTime file can start with; older QuickTime
+# files have no ftyp and open with the movie, the media data or padding
+_MP4_FIRST_BOXES = {b"ftyp", b"moov", b"mdat", b"wide", b"free"}
+# How far into an MP3 without an ID3 tag the first frame is looked for, past
+# leading padding or tags of other kinds
+_MP3_SYNC_WINDOW = 16 * 1024
+
+
+class MediaTypeMismatchError(Exception):
+    """The file's magic bytes don't match the content type the client claimed."""
+
+
+def sniff_container(head: bytes) -> str | None:
+    """Identify the container from its magic bytes."""
+    if head[:3] == b"ID3":
+        return "mp3"
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if bytes(head[4:8]) in _MP4_FIRST_BOXES:
+        return "mp4"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if _first_mp3_frame(head, 0, _MP3_SYNC_WINDOW) is not None:
+        return "mp3"
+    return None
+
+
+def check_content_type(head: bytes, content_type: str) -> str:
+    """Return the sniffed container, or raise if it contradicts content_type."""
+    container = sniff_container(head)
+    if container is None or content_type not in CONTAINER_MIME_TYPES[container]:
+        raise MediaTypeMismatchError(
+            f"File content ({container or 'unknown'}) does not match declared type '{content_type}'."
+        )
+    return container
+
+
+def probe(head: bytes, tail: bytes, size: int) -> dict | None:
+    """
+    Best-effort metadata from the start and end of a file:
+    {"container", "codec", "duration_seconds", "sample_rate", "channels"}.
+    Fields that can't be determined from headers alone are None.
+    """
+    container = sniff_container(head)
+    if container is None:
+        return None
+
+    info = {
+        "container":        container,
+        "codec":            None,
+        "duration_seconds": None,
+        "sample_rate":      None,
+        "channels":         None,
+    }
+    try:
+        _PROBES[container](head, tail, size, info)
+    except (struct.error, IndexError, ValueError):
+        # Truncated or unusual headers — keep whatever was parsed so far
+        pass
+
+    if info["duration_seconds"] is not None:
+        info["duration_seconds"] = round(info["duration_seconds"], 3)
+    return info
+
+
+# ── MP3 ───────────────────────────────────────────────────────────────────────
+
+_MP3_BITRATES = {
+    # (version is MPEG1, layer) -> kbps by index
+    (True, 1):  (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2):  (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3):  (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _mp3_frame_at(buf: bytes, pos: int) -> dict | None:
+    if pos + 4 > len(buf) or buf[pos] != 0xFF or buf[pos + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = buf[pos + 1], buf[pos + 2], buf[pos + 3]
+    version_bits = (b1 >> 3) & 0x03
+    layer = 4 - ((b1 >> 1) & 0x03)
+    bitrate_idx = b2 >> 4
+    rate_idx = (b2 >> 2) & 0x03
+    if version_bits == 1 or layer == 4 or bitrate_idx in (0, 15) or rate_idx == 3:
+        return None
+
+    mpeg1 = version_bits == 3
+    sample_rate = _MP3_SAMPLE_RATES[version_bits][rate_idx]
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_idx] * 1000
+    padding = (b2 >> 1) & 0x01
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 576 if layer == 3 and not mpeg1 else 1152
+        length = samples // 8 * bitrate // sample_rate + padding
+    return {
+        "mpeg1":       mpeg1,
+        "layer":       layer,
+        "bitrate":     bitrate,
+        "sample_rate": sample_rate,
+        "samples":     samples,
+        "length":      length,
+        "channels":    1 if (b3 >> 6) == 3 else 2,
+    }
+
+
+def _first_mp3_frame(buf: bytes, start: int, end: int) -> int | None:
+    """
+    Offset of the first frame header in buf[start:end]. One right at start,
+    where a frame is expected, is taken on its own; anywhere else the next
+    frame header must follow it, as random bytes rarely chain like that.
+    """
+    pos = start if buf[start:start + 1] == b"\xff" else buf.find(b"\xff", start, end)
+    while pos != -1:
+        frame = _mp3_frame_at(buf, pos)
+        if frame and pos == start:
+            return pos
+        if frame:
+            following = pos + frame["length"]
+            if following + 4 > len(buf):
+                # Runs past what was read — can't be told apart
+                return pos
+            after = _mp3_frame_at(buf, following)
+            if after and (after["mpeg1"], after["layer"], after["sample_rate"]) == (
+                frame["mpeg1"], frame["layer"], frame["sample_rate"],
+            ):
+                return pos
+        pos = buf.find(b"\xff", pos + 1, end)
+    return None
+
+
+def _probe_mp3(head: bytes, tail: bytes, size: int, info: dict) -> None:
+    audio_start = 0
+    if head[:3] == b"ID3":
+        tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        audio_start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+
+    # Find the first frame header after the tag
+    pos = _first_mp3_frame(head, audio_start, len(head))
+    if pos is None:
+        return
+    frame = _mp3_frame_at(head, pos)
+
+    info["codec"] = f"mp{frame['layer']}"
+    info["sample_rate"] = frame["sample_rate"]
+    info["channels"] = frame["channels"]
+
+    # VBR files carry a Xing/Info (or VBRI) header with the total frame count
+    side_info = (32 if frame["channels"] == 2 else 17) if frame["mpeg1"] else (17 if frame["channels"] == 2 else 9)
+    xing = pos + 4 + side_info
+    frames = None
+    if head[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack_from(">I", head, xing + 4)[0]
+        if flags & 0x1:
+            frames = struct.unpack_from(">I", head, xing + 8)[0]
+    elif head[pos + 36:pos + 40] == b"VBRI":
+        frames = struct.unpack_from(">I", head, pos + 36 + 14)[0]
+
+    if frames:
+        info["duration_seconds"] = frames * frame["samples"] / frame["sample_rate"]
+        return
+
+    # Constant bitrate: every second is bitrate / 8 bytes
+    audio_bytes = size - pos - (128 if tail[-128:-125] == b"TAG" else 0)
+    info["duration_seconds"] = audio_bytes * 8 / frame["bitrate"]
+
+
+# ── WAV ───────────────────────────────────────────────────────────────────────
+
+_WAV_CODECS = {1: "pcm_s{bits}le", 3: "pcm_f{bits}le", 6: "pcm_alaw", 7: "pcm_mulaw", 0xFFFE: "pcm_s{bits}le"}
+
+
+def _probe_wav(head: bytes, tail: bytes, size: int, info: dict) -> None:
+    pos, byte_rate = 12, None
+    while pos + 8 <= len(head):
+        chunk_id = head[pos:pos + 4]
+        chunk_size = struct.unpack_from("<I", head, pos + 4)[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            fmt, channels, sample_rate, byte_rate, _, bits = struct.unpack_from("<HHIIHH", head, body)
+            info["codec"] = _WAV_CODECS.get(fmt, f"wav_0x{fmt:04x}").format(bits=bits)
+            info["sample_rate"] = sample_rate
+            info["channels"] = channels
+        elif chunk_id == b"data":
+            # Streamed recorders write 0 or 0xFFFFFFFF here — fall back to the file size
+            data_size = chunk_size if 0 < chunk_size < 0xFFFFFFFF else size - body
+            data_size = min(data_size, size - body)
+            if byte_rate:
+                info["duration_seconds"] = data_size / byte_rate
+            return
+        pos = body + chunk_size + (chunk_size & 1)
+
+
+# ── MP4 / QuickTime ───────────────────────────────────────────────────────────
+
+_MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+_MP4_AUDIO_CODECS = {b"mp4a": "aac", b"Opus": "opus", b"alac": "alac", b"ac-3": "ac3", b"ec-3": "eac3", b"fLaC": "flac"}
+
+
+def _iter_boxes(buf: bytes, start: int, end: int):
+    """Yield (type, payload_start, payload_end) for boxes in buf[start:end], clipped to the buffer."""
+    pos = start
+    while pos + 8 <= end:
+        box_size, box_type = struct.unpack_from(">I4s", buf, pos)
+        header = 8
+        if box_size == 1:
+            box_size = struct.unpack_from(">Q", buf, pos + 8)[0]
+            header = 16
+        elif box_size == 0:
+            box_size = end - pos
+        if box_size < header:
+            return
+        yield box_type, pos + header, min(pos + box_size, end)
+        pos += box_size
+
+
+def _walk_mp4(buf: bytes, start: int, end: int, info: dict, state: dict) -> None:
+    for box_type, body, body_end in _iter_boxes(buf, start, end):
+        if box_type in _MP4_CONTAINERS:
+            if box_type == b"trak":
+                state["handler"] = None
+            _walk_mp4(buf, body, body_end, info, state)
+        elif box_type == b"mvhd" and info["duration_seconds"] is None:
+            if buf[body] == 1:
+                timescale, duration = struct.unpack_from(">IQ", buf, body + 20)
+            else:
+                timescale, duration = struct.unpack_from(">II", buf, body + 12)
+            if timescale:
+                info["duration_seconds"] = duration / timescale
+        elif box_type == b"hdlr":
+            state["handler"] = buf[body + 8:body + 12]
+        elif box_type == b"stsd" and state.get("handler") == b"soun" and info["codec"] is None:
+            entry = body + 8  # version/flags + entry count
+            codec = buf[entry + 4:entry + 8]
+            info["codec"] = _MP4_AUDIO_CODECS.get(codec, codec.decode("latin-1").strip())
+            audio = entry + 8 + 8  # box header + SampleEntry reserved/data_reference_index
+            info["channels"] = struct.unpack_from(">H", buf, audio + 8)[0]
+            info["sample_rate"] = struct.unpack_from(">I", buf, audio + 16)[0] >> 16
+
+
+def _probe_mp4(head: bytes, tail: bytes, size: int, info: dict) -> None:
+    # moov sits at the start of "fast start" files and at the end of most
+    # camera/recorder output, after an mdat that can be gigabytes long. Follow
+    # the top-level boxes by their sizes (the bytes "moov" can just as well
+    # turn up inside the media data) and read the header of each from
+    # whichever end of the file was kept.
+    tail_start = size - len(tail)
+    pos = 0
+    while pos + 8 <= size:
+        if pos + 8 <= len(head):
+            buf, local = head, pos
+        elif pos >= tail_start:
+            buf, local = tail, pos - tail_start
+        else:
+            return  # the box starts in the middle of the file, which wasn't kept
+        box_size, box_type = struct.unpack_from(">I4s", buf, local)
+        header = 8
+        if box_size == 1:
+            box_size = struct.unpack_from(">Q", buf, local + 8)[0]
+            header = 16
+        elif box_size == 0:
+            box_size = size - pos
+        if box_size < header:
+            return
+        if box_type == b"moov":
+            _walk_mp4(buf, local + header, min(local + box_size, len(buf)), info, {"handler": None})
+            return
+        pos += box_size
+
+
+# ── Ogg (Vorbis / Opus) ───────────────────────────────────────────────────────
+
+def _probe_ogg(head: bytes, tail: bytes, size: int, info: dict) -> None:
+    segments = head[26]
+    packet = 27 + segments
+    pre_skip = 0
+    if head[packet:packet + 8] == b"OpusHead":
+        info["codec"] = "opus"
+        info["channels"] = head[packet + 9]
+        pre_skip = struct.unpack_from("<H", head, packet + 10)[0]
+        info["sample_rate"] = struct.unpack_from("<I", head, packet + 12)[0] or 48000
+        granule_rate = 48000  # Opus granule positions always count 48kHz samples
+    elif head[packet:packet + 7] == b"\x01vorbis":
+        info["codec"] = "vorbis"
+        info["channels"] = head[packet + 11]
+        info["sample_rate"] = granule_rate = struct.unpack_from("<I", head, packet + 12)[0]
+    elif head[packet:packet + 5] == b"\x7fFLAC":
+        info["codec"] = "flac"
+        streaminfo = packet + 13 + 4 + 10  # FLAC mapping header, metadata block header, min/max sizes
+        packed = int.from_bytes(head[streaminfo:streaminfo + 8], "big")
+        info["sample_rate"] = granule_rate = packed >> 44
+        info["channels"] = ((packed >> 41) & 0x7) + 1
+    else:
+        return
+
+    # The last page's granule position is the total sample count
+    last_page = tail.rfind(b"OggS")
+    if last_page >= 0 and granule_rate:
+        granule = struct.unpack_from("<q", tail, last_page + 6)[0]
+        if granule > 0:
+            info["duration_seconds"] = max(granule - pre_skip, 0) / granule_rate
+
+
+# ── Matroska / WebM ───────────────────────────────────────────────────────────
+
+_EBML_SEGMENT, _EBML_INFO, _EBML_TRACKS, _EBML_TRACK_ENTRY, _EBML_AUDIO = (
+    0x18538067, 0x1549A966, 0x1654AE6B, 0xAE, 0xE1,
+)
+_EBML_MASTERS = {_EBML_SEGMENT, _EBML_INFO, _EBML_TRACKS, _EBML_TRACK_ENTRY, _EBML_AUDIO}
+_EBML_CLUSTER = 0x1F43B675
+_MATROSKA_CODECS = {"A_OPUS": "opus", "A_VORBIS": "vorbis", "A_AAC": "aac", "A_MPEG/L3": "mp3", "A_FLAC": "flac"}
+
+
+def _read_vint(buf: bytes, pos: int, keep_marker: bool) -> tuple[int, int, bool]:
+    """Read an EBML variable-length integer; returns (value, length, is_unknown_size)."""
+    first = buf[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ValueError("Invalid EBML vint")
+    value = first if keep_marker else first & (mask - 1)
+    all_ones = (first & (mask - 1)) == mask - 1
+    for b in buf[pos + 1:pos + length]:
+        value = (value << 8) | b
+        all_ones = all_ones and b == 0xFF
+    return value, length, all_ones
+
+
+def _walk_ebml(buf: bytes, start: int, end: int, info: dict, state: dict) -> bool:
+    """Walk elements in buf[start:end]; returns False once a Cluster (media data) is reached."""
+    pos = start
+    while pos < end - 1:
+        element_id, id_len, _ = _read_vint(buf, pos, keep_marker=True)
+        size, size_len, unknown = _read_vint(buf, pos + id_len, keep_marker=False)
+        body = pos + id_len + size_len
+        body_end = end if unknown else min(body + size, end)
+
+        if element_id == _EBML_CLUSTER:
+            return False
+        if element_id in _EBML_MASTERS:
+            if element_id == _EBML_TRACK_ENTRY:
+                state["track"] = {}
+            if not _walk_ebml(buf, body, body_end, info, state):
+                return False
+            if element_id == _EBML_TRACK_ENTRY:
+                track = state["track"]
+                if track.get("type") == 2 and info["codec"] is None:
+                    info["codec"] = _MATROSKA_CODECS.get(track.get("codec"), track.get("codec"))
+                    info["sample_rate"] = track.get("sample_rate")
+                    info["channels"] = track.get("channels", 1)
+        elif body_end - body == size:
+            data = buf[body:body_end]
+            if element_id == 0x2AD7B1:    # TimecodeScale (ns per tick)
+                state["timecode_scale"] = int.from_bytes(data, "big")
+            elif element_id == 0x4489:    # Duration (ticks, float)
+                state["duration"] = struct.unpack(">f" if size == 4 else ">d", data)[0]
+            elif element_id == 0x83:      # TrackType
+                state["track"]["type"] = int.from_bytes(data, "big")
+            elif element_id == 0x86:      # CodecID
+                state["track"]["codec"] = data.decode("ascii", "replace").rstrip("\x00")
+            elif element_id == 0xB5:      # SamplingFrequency
+                state["track"]["sample_rate"] = int(struct.unpack(">f" if size == 4 else ">d", data)[0])
+            elif element_id == 0x9F:      # Channels
+                state["track"]["channels"] = int.from_bytes(data, "big")
+        pos = body + size if not unknown else end
+    return True
+
+
+def _probe_webm(head: bytes, tail: bytes, size: int, info: dict) -> None:
+    # Skip the EBML header element, then walk the Segment's metadata
+    _, id_len, _ = _read_vint(head, 0, keep_marker=True)
+    header_size, size_len, _ = _read_vint(head, id_len, keep_marker=False)
+    state: dict = {"timecode_scale": 1_000_000, "track": {}}
+    _walk_ebml(head, id_len + size_len + header_size, len(head), info, state)
+    # MediaRecorder output often has no Duration element — leave it unknown then
+    if state.get("duration"):
+        info["duration_seconds"] = state["duration"] * state["timecode_scale"] / 1e9
+
+
+_PROBES = {
+    "mp3":  _probe_mp3,
+    "wav":  _probe_wav,
+    "mp4":  _probe_mp4,
+    "ogg":  _probe_ogg,
+    "webm": _probe_webm,
+}
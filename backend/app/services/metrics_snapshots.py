@@ -0,0 +1,61 @@
+"""
+Metrics of every process, not just the one answering.
+
+The registry in app.core.metrics lives in memory, so /api/v1/health/metrics
+can only report the process that serves it — never a separate worker, which
+does the Deepgram, ffmpeg and job work. Every METRICS_PUBLISH_INTERVAL_SECONDS
+each process writes its snapshot to metrics_snapshots, keyed by host and pid,
+and the endpoint lists the ones published recently. Metric names contain dots,
+which Mongo field names shouldn't, so each section is stored as a list.
+"""
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.metrics import metrics
+
+COLLECTION = "metrics_snapshots"
+
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# A process that missed this many publishes in a row is taken to be gone
+_STALE_INTERVALS = 3
+
+
+async def publish_metrics(role: str) -> None:
+    """Store this process's current metrics under PROCESS_ID."""
+    await get_db()[COLLECTION].replace_one(
+        {"_id": PROCESS_ID},
+        {
+            "role":       role,
+            "timings":    [{"name": name, **timing} for name, timing in metrics.snapshot().items()],
+            "gauges":     [{"name": name, "value": value} for name, value in metrics.gauges().items()],
+            "counters":   [{"name": name, "value": value} for name, value in metrics.counters().items()],
+            "updated_at": datetime.now(timezone.utc),
+        },
+        upsert=True,
+    )
+
+
+async def recent_snapshots(db: AsyncIOMotorDatabase) -> list[dict]:
+    """The snapshots published recently, one per process, in the shape the endpoint reports."""
+    interval = settings.METRICS_PUBLISH_INTERVAL_SECONDS
+    if interval <= 0:
+        return []
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=interval * _STALE_INTERVALS)
+    docs = await db[COLLECTION].find({"updated_at": {"$gte": cutoff}}).sort("_id", 1).to_list(length=None)
+    return [
+        {
+            "process":    doc["_id"],
+            "role":       doc["role"],
+            "updated_at": doc["updated_at"].replace(tzinfo=timezone.utc).isoformat(),
+            "timings":    {t.pop("name"): t for t in doc["timings"]},
+            "gauges":     {g["name"]: g["value"] for g in doc["gauges"]},
+            "counters":   {c["name"]: c["value"] for c in doc["counters"]},
+        }
+        for doc in docs
+    ]
@@ -0,0 +1,346 @@
+"""
+Interview pipeline stages, run from the job queue.
+
+preprocess  — compact the audio and compute waveform peaks after upload (see preprocessing)
+transcribe  — submit the audio to Deepgram, or each segment of a chunked recording;
+              waits while the interview is still being preprocessed
+webhook     — parse and save the transcript Deepgram called back with, then enqueue analyse
+              (for a chunked recording, once every segment is in — see chunking)
+analyse     — run the AI analysis over the transcript
+
+Handlers raise on failure so the queue retries them; once a job is
+dead-lettered the interview is marked failed and the user notified.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.services.analysis import run_analysis
+from app.services.chunking import clear_segment_results, collect_segments, received_segments, save_segment_result
+from app.services.jobs import Deferred, enqueue, is_active, run_now
+from app.services.notification import manager
+from app.services.preprocessing import preprocess_interview
+from app.services.transcription import get_transcription_service
+from app.services.transcripts import save_transcript
+from app.services.webhook_events import COLLECTION as WEBHOOK_EVENTS, load_payload
+
+logger = logging.getLogger(__name__)
+
+# How often a transcribe job waiting on preprocessing checks again; the
+# preprocess job also wakes it as soon as it finishes
+PREPROCESS_WAIT_SECONDS = 30
+# Deepgram can call back before submit_transcription has stored the job id.
+# Such a callback is held back this often, for at most CALLBACK_WAIT_MAX_SECONDS
+CALLBACK_WAIT_SECONDS = 15
+CALLBACK_WAIT_MAX_SECONDS = 600
+# The job stitching a chunked interview's segments holds it for at most this
+# long, so a worker that died mid-stitch doesn't hold it up for good
+STITCH_LEASE_SECONDS = 300
+TRANSCRIBING_STATUSES = ("queued", "transcribing")
+
+
+async def preprocess(payload: dict) -> None:
+    interview_id = payload["interview_id"]
+    await preprocess_interview(interview_id)
+    # Transcription may have been requested meanwhile and be waiting on the compact copy
+    await run_now(get_db(), f"transcribe:{interview_id}")
+
+
+async def submit_transcription(payload: dict) -> None:
+    interview_id = payload["interview_id"]
+    db = get_db()
+    oid = ObjectId(interview_id)
+    doc = await db["interviews"].find_one(
+        {"_id": oid},
+        {"status": 1, "user_id": 1, "storage_key": 1, "audio_storage_key": 1, "audio_segments": 1},
+    )
+    if not doc or doc.get("status") != "queued":
+        # Deleted, or already submitted by an attempt whose lease ran out
+        logger.info("Skipping transcription of interview %s", interview_id)
+        return
+    if await is_active(db, f"preprocess:{interview_id}"):
+        # Submitting now would send the original instead of the compact copy
+        raise Deferred(PREPROCESS_WAIT_SECONDS, "Waiting for audio preprocessing")
+
+    if doc.get("audio_segments"):
+        job_id = await _submit_segments(db, oid, interview_id, doc["audio_segments"])
+    else:
+        # Prefer the compacted audio-only copy when preprocessing has produced one
+        source_key = doc.get("audio_storage_key") or doc["storage_key"]
+        # Recorded before submitting: the webhook can arrive before submit() returns,
+        # and only applies the silence offset map if the trimmed copy was sent
+        await db["interviews"].update_one({"_id": oid}, {"$set": {"transcription_source_key": source_key}})
+
+        job_id = await get_transcription_service().submit(storage_key=source_key, interview_id=interview_id)
+
+    now = datetime.now(timezone.utc)
+    updated = await db["interviews"].update_one(
+        {"_id": oid, "status": "queued"},
+        {"$set": {
+            "status":          "transcribing",
+            "deepgram_job_id": job_id,
+            "updated_at":      now,
+        }},
+    )
+    if updated.modified_count and doc.get("user_id"):
+        await manager.send_to_user(str(doc["user_id"]), {
+            "type":         "status_update",
+            "interview_id": interview_id,
+            "status":       "transcribing",
+            "updated_at":   now.isoformat(),
+        })
+
+
+async def _submit_segments(db, oid: ObjectId, interview_id: str, segments: list[dict]) -> str:
+    """
+    Submit every segment of a chunked recording that has no result yet, all
+    at once. Returns the job ids, comma separated.
+    """
+    # A resubmission (sweeper, retry) doesn't transcribe again what already came back
+    received = await received_segments(db, oid)
+    service = get_transcription_service()
+    job_ids = await asyncio.gather(*(
+        service.submit(storage_key=segment["storage_key"], interview_id=interview_id, segment=index)
+        for index, segment in enumerate(segments)
+        if index not in received
+    ))
+    logger.info("Interview %s submitted as %d segments", interview_id, len(job_ids))
+    return ",".join(job_ids)
+
+
+async def process_transcription_result(payload: dict) -> None:
+    interview_id = payload["interview_id"]
+    db = get_db()
+    event = await db[WEBHOOK_EVENTS].find_one({"_id": payload["event_id"]})
+    if not event or event.get("processed_at"):
+        return
+
+    oid = ObjectId(interview_id)
+    interview = await db["interviews"].find_one(
+        {"_id": oid},
+        {
+            "user_id":                  1,
+            "status":                   1,
+            "deepgram_job_id":          1,
+            "superseded_job_ids":       1,
+            "audio_storage_key":        1,
+            "audio_offset_map":         1,
+            "audio_segments":           1,
+            "transcription_source_key": 1,
+        },
+    )
+    if not interview:
+        logger.info("Transcript for deleted interview %s dropped", interview_id)
+        return
+    if not _is_current_job(interview, event):
+        # Late: the interview moved on, or the job was resubmitted (see sweeper)
+        logger.info("Callback %s for interview %s dropped", event["_id"], interview_id)
+        await _mark_processed(db, event["_id"])
+        return
+    # Silence-trimmed audio was submitted — timestamps must be mapped back
+    offset_map = None
+    if interview.get("audio_storage_key") and interview.get("transcription_source_key") == interview["audio_storage_key"]:
+        offset_map = interview.get("audio_offset_map")
+
+    segment = payload.get("segment")
+    segments = interview.get("audio_segments") or []
+    if segment is not None:
+        if segment >= len(segments):
+            logger.info("Segment %s result for interview %s dropped", segment, interview_id)
+            await _mark_processed(db, event["_id"])
+            return
+        # Maps the segment's timeline onto the recording's, trimmed silences included
+        offset_map = segments[segment]["offset_map"]
+
+    # Outside the try: a storage read that fails is retried, unlike a bad payload
+    raw_body = await load_payload(event)
+    try:
+        parsed = await get_transcription_service().parse_webhook(raw_body, offset_map=offset_map)
+    except Exception as exc:
+        # A malformed payload won't parse on a retry either
+        logger.exception("Failed to parse Deepgram webhook for interview %s: %s", interview_id, exc)
+        await _set_failed(db, interview, "Failed to parse transcription result.")
+        await _mark_processed(db, event["_id"])
+        return
+
+    stitching = False
+    if segment is not None:
+        await save_segment_result(db, oid, segment, parsed)
+        stitching = await _claim_stitch(db, oid, len(segments))
+        if not stitching:
+            # Others still to come, or the interview moved on
+            await _mark_processed(db, event["_id"])
+            return
+
+    user_id = str(interview["user_id"]) if interview.get("user_id") else None
+    try:
+        if stitching:
+            parsed = await collect_segments(db, oid, segments)
+            if parsed is None:
+                # Cleared since the claim, e.g. by a re-transcribe; the claim is released below
+                logger.info("Segment results for interview %s cleared before stitching", interview_id)
+                await _mark_processed(db, event["_id"])
+                return
+        summary = await save_transcript(db, oid, user_id, parsed["transcript"])
+        now = datetime.now(timezone.utc)
+        updated = await db["interviews"].update_one(
+            # A callback processed meanwhile may already have moved it on
+            {"_id": oid, "status": {"$in": list(TRANSCRIBING_STATUSES)}},
+            {"$set": {
+                "transcript_summary": summary,
+                "duration_seconds":   parsed.get("duration_seconds"),
+                "status":             "analysing",
+                "updated_at":         now,
+            }},
+        )
+        if stitching:
+            await clear_segment_results(db, oid)
+    finally:
+        if stitching:
+            await db["interviews"].update_one({"_id": oid}, {"$unset": {"stitching_at": ""}})
+    if not updated.modified_count:
+        logger.info("Interview %s moved on while callback %s was processed", interview_id, event["_id"])
+        await _mark_processed(db, event["_id"])
+        return
+    logger.info("Transcript saved for interview %s, queueing analysis", interview_id)
+
+    await enqueue(db, "analyse", {"interview_id": interview_id, "user_id": user_id}, key=f"analyse:{interview_id}")
+    await _mark_processed(db, event["_id"], now)
+
+    if user_id:
+        await manager.send_to_user(user_id, {
+            "type":         "status_update",
+            "interview_id": interview_id,
+            "status":       "analysing",
+            "updated_at":   now.isoformat(),
+        })
+
+
+async def _claim_stitch(db, oid: ObjectId, count: int) -> bool:
+    """
+    Claim the stitching of a chunked interview once all count segment results
+    are in, so that of two results arriving together only one job stitches
+    and saves them. False while segments are missing or once the interview
+    has moved on; raises Deferred while another job holds the claim.
+    """
+    if not set(range(count)) <= await received_segments(db, oid):
+        return False
+    now = datetime.now(timezone.utc)
+    transcribing = {"_id": oid, "status": {"$in": list(TRANSCRIBING_STATUSES)}}
+    claimed = await db["interviews"].find_one_and_update(
+        {
+            **transcribing,
+            "$or": [
+                {"stitching_at": None},
+                {"stitching_at": {"$lt": now - timedelta(seconds=STITCH_LEASE_SECONDS)}},
+            ],
+        },
+        {"$set": {"stitching_at": now}},
+        {"_id": 1},
+    )
+    if claimed:
+        return True
+    if await db["interviews"].count_documents(transcribing):
+        # Checked again once the other job is done, or its claim has lapsed
+        raise Deferred(CALLBACK_WAIT_SECONDS, "Another job is stitching the segments")
+    return False
+
+
+def _is_current_job(interview: dict, event: dict) -> bool:
+    """
+    Whether a callback belongs to the job the interview is waiting on: the
+    stored deepgram_job_id, or one of the segment job ids it lists. Raises
+    Deferred for a callback that may have overtaken its own submission.
+    """
+    if interview.get("status") not in TRANSCRIBING_STATUSES:
+        return False
+    request_id = event["_id"]
+    if request_id in (interview.get("deepgram_job_id") or "").split(","):
+        return True
+    if interview["status"] == "queued" and request_id not in (interview.get("superseded_job_ids") or []):
+        received_at = event["received_at"].replace(tzinfo=timezone.utc)
+        if (datetime.now(timezone.utc) - received_at).total_seconds() < CALLBACK_WAIT_MAX_SECONDS:
+            # Possibly the submission still in flight, whose id isn't stored yet
+            raise Deferred(CALLBACK_WAIT_SECONDS, "Waiting for the job id to be stored")
+    return False
+
+
+async def _mark_processed(db, event_id: str, now: datetime | None = None) -> None:
+    await db[WEBHOOK_EVENTS].update_one({"_id": event_id}, {"$set": {"processed_at": now or datetime.now(timezone.utc)}})
+
+
+async def analyse(payload: dict) -> None:
+    await run_analysis(payload["interview_id"], payload.get("user_id"), reraise=True)
+
+
+HANDLERS = {
+    "preprocess": preprocess,
+    "transcribe": submit_transcription,
+    "webhook":    process_transcription_result,
+    "analyse":    analyse,
+}
+
+
+def worker_concurrency() -> dict[str, int]:
+    """Jobs of each kind one worker process runs at once."""
+    return {
+        "preprocess": settings.JOB_PREPROCESS_CONCURRENCY,
+        "transcribe": settings.JOB_TRANSCRIBE_CONCURRENCY,
+        "webhook":    settings.JOB_WEBHOOK_CONCURRENCY,
+        "analyse":    settings.JOB_ANALYSE_CONCURRENCY,
+    }
+
+
+_FAILURE_MESSAGES = {
+    "preprocess": "Audio preprocessing failed",
+    "transcribe": "Transcription submission failed",
+    "webhook":    "Saving the transcript failed",
+    "analyse":    "AI analysis failed",
+}
+
+
+async def mark_job_failed(job: dict) -> None:
+    """Dead-letter hook: the interview can't make progress, so show it as failed."""
+    interview_id = job["payload"]["interview_id"]
+    db = get_db()
+    if job["kind"] == "preprocess":
+        # Only an optimisation — transcription goes ahead with the original file
+        logger.warning("Preprocessing interview %s gave up: %s", interview_id, job["last_error"])
+        await run_now(db, f"transcribe:{interview_id}")
+        return
+    now = datetime.now(timezone.utc)
+    doc = await db["interviews"].find_one_and_update(
+        {"_id": ObjectId(interview_id)},
+        {"$set": {
+            "status":        "failed",
+            "error_message": f"{_FAILURE_MESSAGES.get(job['kind'], 'Processing failed')}: {job['last_error']}",
+            "updated_at":    now,
+        }},
+        projection={"user_id": 1},
+    )
+    if doc and doc.get("user_id"):
+        await manager.send_to_user(str(doc["user_id"]), {
+            "type":         "status_update",
+            "interview_id": interview_id,
+            "status":       "failed",
+            "updated_at":   now.isoformat(),
+        })
+
+
+async def _set_failed(db, interview: dict, error: str) -> None:
+    now = datetime.now(timezone.utc)
+    await db["interviews"].update_one(
+        {"_id": interview["_id"]},
+        {"$set": {"status": "failed", "error_message": error, "updated_at": now}},
+    )
+    if interview.get("user_id"):
+        await manager.send_to_user(str(interview["user_id"]), {
+            "type":         "status_update",
+            "interview_id": str(interview["_id"]),
+            "status":       "failed",
+            "updated_at":   now.isoformat(),
+        })
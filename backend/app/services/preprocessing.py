@@ -0,0 +1,355 @@
+"""
+Audio preprocessing after upload: compaction before transcription and
+waveform peaks for the player.
+
+Video uploads are mostly picture data Deepgram would download only to throw
+away. After upload, the audio track is extracted with ffmpeg, downmixed to
+mono, resampled to 16 kHz and encoded as Opus, then stored under its own
+key (audio_storage_key) which transcription submits instead of the original.
+With SILENCE_TRIM_ENABLED the decoded PCM also goes through the energy-based
+silence trimmer first, and the resulting offset map (audio_offset_map) lets
+the webhook put timestamps back on the original timeline. With
+WAVEFORM_ENABLED the same decode also yields the player's waveform peaks.
+With CHUNKED_TRANSCRIPTION_ENABLED a long recording is also encoded as
+overlapping segments split at pauses (audio_segments), which are
+transcribed in parallel (see chunking).
+Preprocessing runs as a "preprocess" job on the worker tier (see
+pipeline), so a restart doesn't lose it, and a transcribe job waits for it
+rather than submitting the uncompacted original. ffmpeg and the NumPy
+analysis run in a process pool so the worker's event loop is never blocked.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import aiofiles
+import numpy as np
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.metrics import metrics
+from app.services.jobs import enqueue
+from app.services.chunking import plan_segments
+from app.services.silence import build_offset_map, quiet_split_points, speech_segments
+from app.services.storage import get_storage_backend
+from app.services.waveform import COLLECTION as WAVEFORM_COLLECTION, compute_peaks, save_waveform
+
+logger = logging.getLogger(__name__)
+
+COMPACT_CONTENT_TYPE = "audio/ogg"
+COMPACT_FILENAME = "audio.ogg"
+SAMPLE_RATE = 16000
+_READ_CHUNK = 1024 * 1024
+
+_pool: ProcessPoolExecutor | None = None
+
+
+_FFMPEG_FLAGS = ["-nostdin", "-hide_banner", "-loglevel", "error", "-y"]
+
+
+def _opus_output(output_path: str) -> list[str]:
+    return ["-c:a", "libopus", "-b:a", settings.AUDIO_PREPROCESS_BITRATE, "-application", "voip", output_path]
+
+
+def ffmpeg_command(source: str, output_path: str) -> list[str]:
+    """First audio track only, mono, 16 kHz, Opus tuned for speech."""
+    return [
+        settings.FFMPEG_PATH, *_FFMPEG_FLAGS,
+        "-i", source,
+        "-map", "0:a:0", "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        *_opus_output(output_path),
+    ]
+
+
+def decode_command(source: str, pcm_path: str) -> list[str]:
+    """First audio track as raw mono 16 kHz signed 16-bit PCM, for silence analysis."""
+    return [
+        settings.FFMPEG_PATH, *_FFMPEG_FLAGS,
+        "-i", source,
+        "-map", "0:a:0", "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "s16le", pcm_path,
+    ]
+
+
+def encode_command(output_path: str) -> list[str]:
+    """Encode raw PCM from stdin (the kept spans) to Opus."""
+    return [
+        settings.FFMPEG_PATH, *_FFMPEG_FLAGS,
+        "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-i", "pipe:0",
+        *_opus_output(output_path),
+    ]
+
+
+def _run_ffmpeg(command: list[str], timeout: int) -> None:
+    completed = subprocess.run(command, capture_output=True, timeout=timeout)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.decode(errors="replace").strip()[-500:] or "ffmpeg failed")
+
+
+def _encode_segments(pcm_path: str, segments: list[tuple[int, int]], output_path: str, timeout: int) -> None:
+    """Pipe only the kept sample ranges into the encoder — the trimmed PCM is never held in memory."""
+    samples = np.memmap(pcm_path, dtype="<i2", mode="r")
+    step = _READ_CHUNK // 2
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(encode_command(output_path), stdin=subprocess.PIPE, stderr=stderr)
+        try:
+            for start, end in segments:
+                for offset in range(start, end, step):
+                    process.stdin.write(samples[offset:min(offset + step, end)].tobytes())
+            process.stdin.close()
+            returncode = process.wait(timeout=timeout)
+        except BaseException:
+            process.kill()
+            raise
+        if returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(stderr.read().decode(errors="replace").strip()[-500:] or "ffmpeg failed")
+
+
+def _process(
+    source: str,
+    workdir: str,
+    encode: bool,
+    timeout: int,
+    trim_silence: bool,
+    min_silence_ms: int,
+    padding_ms: int,
+    waveform_levels: list[int] | None,
+    chunking: tuple[int, int, int] | None = None,
+) -> dict:
+    """
+    Runs in a pool worker. The audio is decoded at most once; the PCM then
+    feeds the waveform peaks, the silence trimmer and the encoder as needed.
+    chunking is (segment_ms, overlap_ms, search_ms) to also split a long
+    recording into segments (see chunking.plan_segments).
+    Returns {"size", "offset_map", "duration_ms", "waveform", "segments"} —
+    the encoded file is left at workdir/COMPACT_FILENAME and each segment's
+    at workdir/segment["file"].
+    """
+    output_path = os.path.join(workdir, COMPACT_FILENAME)
+    result = {"size": None, "offset_map": None, "duration_ms": None, "waveform": None, "segments": None}
+
+    if not trim_silence and not waveform_levels and not chunking:
+        # Nothing needs the samples — let ffmpeg go straight to Opus
+        _run_ffmpeg(ffmpeg_command(source, output_path), timeout)
+        result["size"] = os.path.getsize(output_path)
+        return result
+
+    pcm_path = os.path.join(workdir, "audio.pcm")
+    _run_ffmpeg(decode_command(source, pcm_path), timeout)
+    if os.path.getsize(pcm_path) < 2:
+        raise RuntimeError("No audio decoded")
+
+    samples = np.memmap(pcm_path, dtype="<i2", mode="r")
+    result["duration_ms"] = len(samples) * 1000 // SAMPLE_RATE
+    if waveform_levels:
+        result["waveform"] = compute_peaks(samples, waveform_levels)
+
+    if encode:
+        segments = [(0, len(samples))]
+        if trim_silence:
+            segments = speech_segments(samples, SAMPLE_RATE, min_silence_ms, padding_ms)
+            result["offset_map"] = build_offset_map(segments, SAMPLE_RATE, len(samples))
+        _encode_segments(pcm_path, segments, output_path, timeout)
+        result["size"] = os.path.getsize(output_path)
+
+        if chunking:
+            segment_ms, overlap_ms, search_ms = chunking
+            points = quiet_split_points(samples, SAMPLE_RATE, segment_ms, search_ms)
+            if points:
+                result["segments"] = []
+                for n, part in enumerate(plan_segments(points, segments, len(samples), SAMPLE_RATE, overlap_ms)):
+                    filename = f"segment-{n}.ogg"
+                    _encode_segments(pcm_path, part.pop("spans"), os.path.join(workdir, filename), timeout)
+                    result["segments"].append({**part, "file": filename})
+
+    del samples
+    os.remove(pcm_path)
+    return result
+
+
+def init_preprocessing() -> None:
+    global _pool
+    if _pool is None and settings.AUDIO_PREPROCESS_ENABLED:
+        # spawn, not fork: forking a process that runs an event loop and open sockets is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.AUDIO_PREPROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+
+def close_preprocessing() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def process_audio(source: str, workdir: str, encode: bool, waveform: bool) -> dict:
+    """
+    Decode source (a URL or path ffmpeg can read) in the process pool and
+    produce the compact copy and/or waveform peaks. See _process.
+    """
+    init_preprocessing()
+    loop = asyncio.get_running_loop()
+    with metrics.timer("preprocess.audio"):
+        return await loop.run_in_executor(
+            _pool,
+            _process,
+            source,
+            workdir,
+            encode,
+            settings.AUDIO_PREPROCESS_TIMEOUT_SECONDS,
+            settings.SILENCE_TRIM_ENABLED,
+            settings.SILENCE_TRIM_MIN_SILENCE_MS,
+            settings.SILENCE_TRIM_PADDING_MS,
+            settings.WAVEFORM_LEVELS if waveform else None,
+            _chunking() if encode else None,
+        )
+
+
+def _chunking() -> tuple[int, int, int] | None:
+    if not settings.CHUNKED_TRANSCRIPTION_ENABLED:
+        return None
+    return (
+        settings.CHUNK_TARGET_MINUTES * 60_000,
+        settings.CHUNK_OVERLAP_SECONDS * 1000,
+        settings.CHUNK_SEARCH_SECONDS * 1000,
+    )
+
+
+def needs_compaction(interview: dict) -> bool:
+    # Silence trimming and chunking pay off for every format, compaction alone only for bulky ones
+    return (
+        settings.AUDIO_PREPROCESS_ENABLED
+        and (
+            settings.SILENCE_TRIM_ENABLED
+            or settings.CHUNKED_TRANSCRIPTION_ENABLED
+            or interview.get("file_type") in settings.AUDIO_PREPROCESS_MIME_TYPES
+        )
+        and not interview.get("audio_storage_key")
+    )
+
+
+def needs_waveform(interview: dict) -> bool:
+    return settings.AUDIO_PREPROCESS_ENABLED and settings.WAVEFORM_ENABLED
+
+
+async def _file_chunks(path: str):
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(_READ_CHUNK):
+            yield chunk
+
+
+async def preprocess_interview(interview_id: str) -> str | None:
+    """
+    Produce the compact audio copy (recorded as audio_storage_key) and the
+    waveform peaks for an interview, decoding the file once for both.
+    Failures are logged and leave the interview on its original file.
+    Returns the audio key, if any.
+    """
+    db = get_db()
+    oid = ObjectId(interview_id)
+    interview = await db["interviews"].find_one(
+        {"_id": oid},
+        {"storage_key": 1, "file_type": 1, "original_name": 1, "audio_storage_key": 1},
+    )
+    if not interview:
+        return None
+
+    storage_key = interview["storage_key"]
+    encode = needs_compaction(interview)
+    # Waveforms are keyed by storage object, so duplicates already have one
+    waveform = needs_waveform(interview) and not await db[WAVEFORM_COLLECTION].count_documents(
+        {"_id": storage_key}, limit=1
+    )
+
+    audio_key = interview.get("audio_storage_key")
+    if encode:
+        # A deduplicated copy of this recording may already have been compacted
+        sibling = await db["interviews"].find_one(
+            {"storage_key": storage_key, "audio_storage_key": {"$ne": None}},
+            {"audio_storage_key": 1, "audio_file_size": 1, "audio_offset_map": 1, "audio_segments": 1},
+        )
+        if sibling:
+            await db["interviews"].update_one({"_id": oid}, {"$set": {
+                "audio_storage_key": sibling["audio_storage_key"],
+                "audio_file_size":   sibling.get("audio_file_size"),
+                "audio_offset_map":  sibling.get("audio_offset_map"),
+                "audio_segments":    sibling.get("audio_segments"),
+            }})
+            audio_key, encode = sibling["audio_storage_key"], False
+
+    if not encode and not waveform:
+        return audio_key
+
+    storage = get_storage_backend()
+    workdir = tempfile.mkdtemp(prefix="preprocess-")
+    segments = None
+    try:
+        source = await storage.presigned_url(storage_key, expires_in=settings.AUDIO_PREPROCESS_TIMEOUT_SECONDS)
+        result = await process_audio(source, workdir, encode=encode, waveform=waveform)
+
+        if result["waveform"]:
+            await save_waveform(db, storage_key, SAMPLE_RATE, result["duration_ms"], result["waveform"])
+
+        if encode:
+            stem = os.path.splitext(interview.get("original_name") or "audio")[0]
+            audio_key = await storage.upload_stream(
+                _file_chunks(os.path.join(workdir, COMPACT_FILENAME)),
+                filename=f"{stem}.ogg",
+                content_type=COMPACT_CONTENT_TYPE,
+            )
+            if result["segments"]:
+                segments = []
+                for n, segment in enumerate(result["segments"]):
+                    key = await storage.upload_stream(
+                        _file_chunks(os.path.join(workdir, segment.pop("file"))),
+                        filename=f"{stem}-{n}.ogg",
+                        content_type=COMPACT_CONTENT_TYPE,
+                    )
+                    segments.append({"storage_key": key, **segment})
+    except Exception as exc:
+        logger.warning("Audio preprocessing failed for interview %s: %s", interview_id, exc)
+        return None
+    finally:
+        await asyncio.to_thread(shutil.rmtree, workdir, True)
+
+    if not encode:
+        return audio_key
+
+    offset_map = result["offset_map"]
+    updated = await db["interviews"].update_one({"_id": oid}, {"$set": {
+        "audio_storage_key": audio_key,
+        "audio_file_size":   result["size"],
+        "audio_offset_map":  offset_map,
+        "audio_segments":    segments,
+        "updated_at":        datetime.now(timezone.utc),
+    }})
+    if updated.matched_count == 0:
+        # Interview was deleted while we were encoding
+        for key in [audio_key, *(segment["storage_key"] for segment in segments or [])]:
+            await storage.delete(key)
+        return None
+
+    logger.info(
+        "Compacted audio for interview %s to %d bytes (%d silence cuts, %d segments)",
+        interview_id, result["size"], len(offset_map) - 2 if offset_map else 0, len(segments or []),
+    )
+    return audio_key
+
+
+async def schedule_preprocessing(db: AsyncIOMotorDatabase, interview: dict) -> None:
+    """Queue preprocessing for a freshly inserted interview, if it applies."""
+    if not (needs_compaction(interview) or needs_waveform(interview)):
+        return
+    interview_id = str(interview["_id"])
+    await enqueue(db, "preprocess", {"interview_id": interview_id}, key=f"preprocess:{interview_id}")
@@ -0,0 +1,132 @@
+"""
+Energy-based silence trimming.
+
+Long silent stretches (waiting rooms, pauses) are cut from the audio sent to
+Deepgram, which bills per second. The cuts are recorded in an offset map —
+[[trimmed_ms, original_ms], ...], one pair per kept span plus a final pair
+for the end of the file — so transcript timestamps can be shifted back onto
+the original recording's timeline.
+"""
+import math
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+FRAME_MS = 30
+_BLOCK_FRAMES = 8192  # frames analysed per pass, bounds memory on long recordings
+
+
+def frame_energy_db(samples: np.ndarray, frame: int) -> np.ndarray:
+    """RMS level of each full frame in dBFS, for 16-bit PCM samples."""
+    n_frames = len(samples) // frame
+    energy = np.empty(n_frames, dtype=np.float32)
+    for first in range(0, n_frames, _BLOCK_FRAMES):
+        last = min(first + _BLOCK_FRAMES, n_frames)
+        block = np.asarray(samples[first * frame:last * frame], dtype=np.float32).reshape(-1, frame)
+        rms = np.sqrt(np.mean(block * block, axis=1)) / 32768.0
+        energy[first:last] = 20.0 * np.log10(np.maximum(rms, 1e-10))
+    return energy
+
+
+def speech_segments(
+    samples: np.ndarray,
+    sample_rate: int,
+    min_silence_ms: int,
+    padding_ms: int,
+) -> list[tuple[int, int]]:
+    """
+    Return the [start, end) sample ranges to keep. Silences of at least
+    min_silence_ms are cut, leaving padding_ms on each side so word edges and
+    natural pauses survive. The threshold adapts to the recording's noise floor.
+    """
+    total = len(samples)
+    frame = sample_rate * FRAME_MS // 1000
+    energy = frame_energy_db(samples, frame)
+    if len(energy) == 0:
+        return [(0, total)] if total else []
+
+    # 10 dB over the quietest decile, but never so high that quiet speech counts as silence
+    threshold = float(np.clip(np.percentile(energy, 10) + 10.0, -60.0, -35.0))
+    silent = (energy <= threshold).astype(np.int8)
+
+    edges = np.diff(np.concatenate(([0], silent, [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+
+    pad = padding_ms // FRAME_MS
+    long_runs = (run_ends - run_starts) >= math.ceil(min_silence_ms / FRAME_MS)
+    run_starts, run_ends = run_starts[long_runs], run_ends[long_runs]
+    # Padding only matters next to speech — silence at either end of the file goes entirely
+    cut_starts = np.where(run_starts == 0, 0, (run_starts + pad) * frame)
+    cut_ends = np.where(run_ends == len(energy), total, (run_ends - pad) * frame)
+    valid = cut_ends > cut_starts
+    cut_starts, cut_ends = cut_starts[valid], cut_ends[valid]
+
+    keep_starts = np.concatenate(([0], cut_ends))
+    keep_ends = np.concatenate((cut_starts, [total]))
+    return [(int(s), int(e)) for s, e in zip(keep_starts, keep_ends) if e > s]
+
+
+def quiet_split_points(samples: np.ndarray, sample_rate: int, every_ms: int, search_ms: int) -> list[int]:
+    """
+    Sample positions roughly every every_ms at which to split the recording,
+    each moved to the quietest moment within search_ms of its target so a
+    split lands in a pause rather than mid-word. No split is placed within
+    half of every_ms of the end.
+    """
+    frame = sample_rate * FRAME_MS // 1000
+    energy = frame_energy_db(samples, frame)
+    every, search = every_ms // FRAME_MS, search_ms // FRAME_MS
+    # Averaged over ~300 ms, so the gap between two syllables doesn't count as a pause
+    smooth = 10
+    points = []
+    target = every
+    while target + every // 2 < len(energy):
+        first = max(target - search, 0)
+        window = energy[first:min(target + search, len(energy))]
+        if len(window) > smooth:
+            window = np.convolve(window, np.ones(smooth) / smooth, mode="same")
+        quietest = first + int(np.argmin(window))
+        points.append(quietest * frame + frame // 2)
+        target = quietest + every
+    return points
+
+
+def build_offset_map(segments: list[tuple[int, int]], sample_rate: int, total: int) -> list[list[int]] | None:
+    """Offset map for the kept segments, or None when nothing was cut."""
+    if not segments or segments == [(0, total)]:
+        return None
+
+    offset_map = []
+    trimmed = 0
+    for start, end in segments:
+        offset_map.append([trimmed * 1000 // sample_rate, start * 1000 // sample_rate])
+        trimmed += end - start
+    offset_map.append([trimmed * 1000 // sample_rate, total * 1000 // sample_rate])
+    return offset_map
+
+
+class TimelineMapper:
+    """Maps trimmed-audio milliseconds back to the original recording."""
+
+    def __init__(self, offset_map: list[list[int]]):
+        self._trimmed = [pair[0] for pair in offset_map]
+        self._original = [pair[1] for pair in offset_map]
+
+    def __call__(self, ms: int, is_end: bool = False) -> int:
+        # An end time sitting exactly on a cut belongs to the span before it
+        find = bisect_left if is_end else bisect_right
+        i = max(find(self._trimmed, ms) - 1, 0)
+        return self._original[i] + ms - self._trimmed[i]
+
+
+def remap_transcript(parsed: dict, offset_map: list[list[int]]) -> dict:
+    """Shift word/utterance timestamps and the duration of a parsed webhook result in place."""
+    to_original = TimelineMapper(offset_map)
+    transcript = parsed["transcript"]
+    for item in transcript["words"] + transcript["utterances"]:
+        item["start_ms"] = to_original(item["start_ms"])
+        item["end_ms"]   = to_original(item["end_ms"], is_end=True)
+    # The original file's length, not the trimmed one Deepgram measured
+    parsed["duration_seconds"] = offset_map[-1][1] / 1000
+    return parsed
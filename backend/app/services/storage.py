@@ -1,10 +1,33 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import mimetypes
+import os
+import shutil
+import time
 import uuid
-from typing import Protocol
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Protocol
+from urllib.parse import quote
 
+import aiofiles
 import boto3
 from botocore.config import Config
+from botocore.exceptions import ClientError
 
 from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# S3 requires every multipart part except the last to be at least 5MB.
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+# DeleteObjects accepts at most 1000 keys per request.
+DELETE_BATCH_SIZE = 1000
 
 
 class StorageBackend(Protocol):
@@ -12,6 +35,28 @@ class StorageBackend(Protocol):
         """Upload a file and return the storage key."""
         ...
 
+    async def upload_stream(
+        self, chunks: AsyncIterable[bytes], filename: str, content_type: str
+    ) -> str:
+        """Upload a file from an async stream of chunks and return the storage key."""
+        ...
+
+    async def create_multipart(self, filename: str, content_type: str) -> tuple[str, str]:
+        """Start a multipart upload and return (storage_key, upload_id)."""
+        ...
+
+    async def upload_part(self, storage_key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Upload one part (1-based part_number) and return its ETag."""
+        ...
+
+    async def complete_multipart(self, storage_key: str, upload_id: str, parts: list[dict]) -> None:
+        """Assemble parts ([{"PartNumber", "ETag"}], ascending) into the final object."""
+        ...
+
+    async def abort_multipart(self, storage_key: str, upload_id: str) -> None:
+        """Discard a multipart upload and any parts already sent."""
+        ...
+
     async def delete(self, storage_key: str) -> None:
         """Delete a file by its storage key."""
         ...
@@ -20,11 +65,41 @@ class StorageBackend(Protocol):
         """Return a temporary URL for direct download."""
         ...
 
+    async def presigned_upload(self, filename: str, content_type: str, size: int, expires_in: int = 3600) -> dict:
+        """
+        Authorise a browser to upload exactly size bytes of content_type
+        straight to storage. Returns {"storage_key", "method", "url",
+        "fields", "headers"} — POST sends fields as form data before the
+        file, PUT sends the raw body with headers.
+        """
+        ...
+
+    async def head(self, storage_key: str) -> dict | None:
+        """{"size", "content_type", "etag"} of a stored object, or None if it doesn't exist."""
+        ...
+
+    async def read_range(self, storage_key: str, start: int, length: int) -> bytes:
+        """Read up to length bytes starting at start."""
+        ...
+
+    def list_objects(self, prefix: str = "") -> AsyncIterator[list[dict]]:
+        """Yield stored objects a page at a time, as [{"key", "size", "last_modified"}]."""
+        ...
+
+    async def delete_many(self, storage_keys: list[str]) -> list[str]:
+        """Delete up to DELETE_BATCH_SIZE objects in one request; returns the keys deleted."""
+        ...
+
 
 class S3StorageBackend:
     """
     Works with Cloudflare R2, AWS S3, and MinIO — same boto3 SDK.
     The endpoint URL is what differentiates them.
+
+    boto3 is synchronous, so every client call is run on a dedicated, bounded
+    thread pool — never on the event loop — and timed under "storage.<op>".
+    One instance is shared per process (see init_storage_backend) so the
+    client's connection pool and TLS sessions are reused across requests.
     """
     # boto3 is the standard S3-compatible client.
     # Despite the AWS parameter names, this works with any S3-compatible
@@ -37,14 +112,31 @@ class S3StorageBackend:
             aws_access_key_id=settings.S3_ACCESS_KEY, # R2 Access Key ID
             aws_secret_access_key=settings.S3_SECRET_KEY, # R2 Secret Access Key
             region_name=settings.S3_REGION,
-            config=Config(signature_version="s3v4"),
+            config=Config(
+                signature_version="s3v4",
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            ),
         )
         self._bucket = settings.S3_BUCKET_NAME
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.STORAGE_MAX_WORKERS,
+            thread_name_prefix="storage",
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._client.close()
+
+    async def _call(self, op: str, fn, **kwargs):
+        loop = asyncio.get_running_loop()
+        with metrics.timer(f"storage.{op}"):
+            return await loop.run_in_executor(self._executor, partial(fn, **kwargs))
 
     async def upload(self, file_bytes: bytes, filename: str, content_type: str) -> str:
-        ext = filename.rsplit(".", 1)[-1] if "." in filename else ""
-        storage_key = f"interviews/{uuid.uuid4()}.{ext}"
-        self._client.put_object(
+        storage_key = _new_storage_key(filename)
+        await self._call(
+            "put_object",
+            self._client.put_object,
             Bucket=self._bucket,
             Key=storage_key,
             Body=file_bytes,
@@ -52,16 +144,205 @@ class S3StorageBackend:
         )
         return storage_key
 
+    async def upload_stream(
+        self, chunks: AsyncIterable[bytes], filename: str, content_type: str
+    ) -> str:
+        """
+        Buffers at most one part at a time and sends it with S3 multipart upload,
+        so peak memory stays constant regardless of file size.
+        Files smaller than one part go up with a single put_object.
+        Any error (including the size limit tripping mid-stream) aborts the
+        multipart upload so no orphaned parts are left behind.
+        """
+        storage_key = _new_storage_key(filename)
+        buffer = bytearray()
+        upload_id: str | None = None
+        parts: list[dict] = []
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                if len(buffer) < MULTIPART_PART_SIZE:
+                    continue
+                if upload_id is None:
+                    upload_id = await self._create_multipart_upload(storage_key, content_type)
+                part_number = len(parts) + 1
+                etag = await self.upload_part(storage_key, upload_id, part_number, bytes(buffer))
+                parts.append({"PartNumber": part_number, "ETag": etag})
+                buffer = bytearray()
+
+            if upload_id is None:
+                await self._call(
+                    "put_object",
+                    self._client.put_object,
+                    Bucket=self._bucket,
+                    Key=storage_key,
+                    Body=bytes(buffer),
+                    ContentType=content_type,
+                )
+                return storage_key
+
+            if buffer:
+                part_number = len(parts) + 1
+                etag = await self.upload_part(storage_key, upload_id, part_number, bytes(buffer))
+                parts.append({"PartNumber": part_number, "ETag": etag})
+            await self.complete_multipart(storage_key, upload_id, parts)
+            return storage_key
+
+        except BaseException:
+            if upload_id is not None:
+                await self.abort_multipart(storage_key, upload_id)
+            raise
+
+    async def create_multipart(self, filename: str, content_type: str) -> tuple[str, str]:
+        storage_key = _new_storage_key(filename)
+        return storage_key, await self._create_multipart_upload(storage_key, content_type)
+
+    async def _create_multipart_upload(self, storage_key: str, content_type: str) -> str:
+        response = await self._call(
+            "create_multipart_upload",
+            self._client.create_multipart_upload,
+            Bucket=self._bucket,
+            Key=storage_key,
+            ContentType=content_type,
+        )
+        return response["UploadId"]
+
+    async def upload_part(self, storage_key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        response = await self._call(
+            "upload_part",
+            self._client.upload_part,
+            Bucket=self._bucket,
+            Key=storage_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        return response["ETag"]
+
+    async def complete_multipart(self, storage_key: str, upload_id: str, parts: list[dict]) -> None:
+        await self._call(
+            "complete_multipart_upload",
+            self._client.complete_multipart_upload,
+            Bucket=self._bucket,
+            Key=storage_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+
+    async def abort_multipart(self, storage_key: str, upload_id: str) -> None:
+        await self._call(
+            "abort_multipart_upload",
+            self._client.abort_multipart_upload,
+            Bucket=self._bucket,
+            Key=storage_key,
+            UploadId=upload_id,
+        )
+
     async def delete(self, storage_key: str) -> None:
-        self._client.delete_object(Bucket=self._bucket, Key=storage_key)
+        await self._call(
+            "delete_object",
+            self._client.delete_object,
+            Bucket=self._bucket,
+            Key=storage_key,
+        )
 
     async def presigned_url(self, storage_key: str, expires_in: int = 3600) -> str:
-        return self._client.generate_presigned_url(
-            "get_object",
+        # Signing is local, but resolving credentials can hit the network
+        return await self._call(
+            "presigned_url",
+            self._client.generate_presigned_url,
+            ClientMethod="get_object",
             Params={"Bucket": self._bucket, "Key": storage_key},
             ExpiresIn=expires_in,
         )
 
+    async def presigned_upload(self, filename: str, content_type: str, size: int, expires_in: int = 3600) -> dict:
+        """
+        PUT (the default) signs Content-Type and Content-Length, so the bucket
+        rejects any other type or size — and works on R2, which has no POST
+        uploads. POST carries the same limits as policy conditions.
+        """
+        storage_key = _new_storage_key(filename)
+        if settings.DIRECT_UPLOAD_METHOD == "post":
+            post = await self._call(
+                "presigned_post",
+                self._client.generate_presigned_post,
+                Bucket=self._bucket,
+                Key=storage_key,
+                Fields={"Content-Type": content_type},
+                Conditions=[{"Content-Type": content_type}, ["content-length-range", size, size]],
+                ExpiresIn=expires_in,
+            )
+            return {"storage_key": storage_key, "method": "POST", "url": post["url"], "fields": post["fields"], "headers": {}}
+
+        url = await self._call(
+            "presigned_put",
+            self._client.generate_presigned_url,
+            ClientMethod="put_object",
+            Params={"Bucket": self._bucket, "Key": storage_key, "ContentType": content_type, "ContentLength": size},
+            ExpiresIn=expires_in,
+        )
+        return {"storage_key": storage_key, "method": "PUT", "url": url, "fields": {}, "headers": {"Content-Type": content_type}}
+
+    async def head(self, storage_key: str) -> dict | None:
+        try:
+            response = await self._call(
+                "head_object",
+                self._client.head_object,
+                Bucket=self._bucket,
+                Key=storage_key,
+            )
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return {
+            "size":         response["ContentLength"],
+            "content_type": response.get("ContentType"),
+            "etag":         response.get("ETag"),
+        }
+
+    async def read_range(self, storage_key: str, start: int, length: int) -> bytes:
+        def read() -> bytes:
+            response = self._client.get_object(
+                Bucket=self._bucket,
+                Key=storage_key,
+                Range=f"bytes={start}-{start + length - 1}",
+            )
+            return response["Body"].read()
+
+        return await self._call("get_object_range", read)
+
+    async def list_objects(self, prefix: str = "") -> AsyncIterator[list[dict]]:
+        kwargs = {"Bucket": self._bucket, "Prefix": prefix}
+        while True:
+            response = await self._call("list_objects_v2", self._client.list_objects_v2, **kwargs)
+            yield [
+                {"key": obj["Key"], "size": obj["Size"], "last_modified": obj["LastModified"]}
+                for obj in response.get("Contents", [])
+            ]
+            if not response.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+    async def delete_many(self, storage_keys: list[str]) -> list[str]:
+        if not storage_keys:
+            return []
+        if len(storage_keys) > DELETE_BATCH_SIZE:
+            raise ValueError(f"At most {DELETE_BATCH_SIZE} keys per delete")
+        response = await self._call(
+            "delete_objects",
+            self._client.delete_objects,
+            Bucket=self._bucket,
+            Delete={"Objects": [{"Key": key} for key in storage_keys], "Quiet": True},
+        )
+        # Quiet mode only reports failures
+        failed = {error["Key"] for error in response.get("Errors", [])}
+        for error in response.get("Errors", []):
+            logger.warning("Could not delete %s: %s", error["Key"], error.get("Message"))
+        return [key for key in storage_keys if key not in failed]
+
 
 class MockStorageBackend:
     """Used in tests — no real network calls."""
@@ -69,14 +350,296 @@ class MockStorageBackend:
     async def upload(self, file_bytes: bytes, filename: str, content_type: str) -> str:
         return f"interviews/mock-{uuid.uuid4()}.mp3"
 
+    async def upload_stream(
+        self, chunks: AsyncIterable[bytes], filename: str, content_type: str
+    ) -> str:
+        async for _ in chunks:
+            pass
+        return f"interviews/mock-{uuid.uuid4()}.mp3"
+
+    async def create_multipart(self, filename: str, content_type: str) -> tuple[str, str]:
+        return f"interviews/mock-{uuid.uuid4()}.mp3", f"mock-upload-{uuid.uuid4()}"
+
+    async def upload_part(self, storage_key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        return f'"mock-etag-{part_number}"'
+
+    async def complete_multipart(self, storage_key: str, upload_id: str, parts: list[dict]) -> None:
+        pass
+
+    async def abort_multipart(self, storage_key: str, upload_id: str) -> None:
+        pass
+
     async def delete(self, storage_key: str) -> None:
         pass
 
     async def presigned_url(self, storage_key: str, expires_in: int = 3600) -> str:
         return f"http://mock-storage/{storage_key}"
 
+    async def presigned_upload(self, filename: str, content_type: str, size: int, expires_in: int = 3600) -> dict:
+        storage_key = f"interviews/mock-{uuid.uuid4()}.mp3"
+        return {
+            "storage_key": storage_key,
+            "method":      "PUT",
+            "url":         f"http://mock-storage/{storage_key}",
+            "fields":      {},
+            "headers":     {"Content-Type": content_type},
+        }
+
+    async def head(self, storage_key: str) -> dict | None:
+        return None
+
+    async def read_range(self, storage_key: str, start: int, length: int) -> bytes:
+        return b""
+
+    async def list_objects(self, prefix: str = "") -> AsyncIterator[list[dict]]:
+        return
+        yield
+
+    async def delete_many(self, storage_keys: list[str]) -> list[str]:
+        return list(storage_keys)
+
+    def close(self) -> None:
+        pass
+
+
+class LocalStorageBackend:
+    """
+    Stores files on the local filesystem under LOCAL_STORAGE_PATH — for
+    single-node and air-gapped deployments, and network-free benchmarks.
+    Writes stream to a temporary file that is renamed into place, so a
+    reader never sees a partial object. Download URLs point at the
+    /files endpoint and carry an HMAC signature with an expiry, so they
+    behave like S3 presigned URLs (Deepgram can fetch them unauthenticated).
+    """
+
+    def __init__(self):
+        # Fail at startup rather than hand out URLs anyone can sign
+        _local_signing_key()
+        self._root = Path(settings.LOCAL_STORAGE_PATH).resolve()
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, storage_key: str) -> Path:
+        """Resolve a storage key to a path, refusing anything outside the storage root."""
+        path = (self._root / storage_key).resolve()
+        if not path.is_relative_to(self._root) or path == self._root:
+            raise ValueError(f"Invalid storage key: {storage_key}")
+        return path
+
+    async def _call(self, op: str, fn, *args):
+        """Run a blocking filesystem call off the event loop, timed like the S3 calls."""
+        with metrics.timer(f"storage.{op}"):
+            return await asyncio.to_thread(fn, *args)
+
+    async def upload(self, file_bytes: bytes, filename: str, content_type: str) -> str:
+        return await self.upload_stream(_single_chunk(file_bytes), filename, content_type)
+
+    async def upload_stream(
+        self, chunks: AsyncIterable[bytes], filename: str, content_type: str
+    ) -> str:
+        storage_key = _new_storage_key(filename)
+        await self.write(storage_key, chunks)
+        return storage_key
+
+    async def write(self, storage_key: str, chunks: AsyncIterable[bytes]) -> None:
+        """Stream chunks into storage_key, replacing any existing object atomically."""
+        path = self.path_for(storage_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+        with metrics.timer("storage.write"):
+            try:
+                async with aiofiles.open(tmp_path, "wb") as f:
+                    async for chunk in chunks:
+                        await f.write(chunk)
+                await asyncio.to_thread(os.replace, tmp_path, path)
+            except BaseException:
+                await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+                raise
+
+    async def create_multipart(self, filename: str, content_type: str) -> tuple[str, str]:
+        upload_id = uuid.uuid4().hex
+        self._parts_dir(upload_id).mkdir(parents=True)
+        return _new_storage_key(filename), upload_id
+
+    async def upload_part(self, storage_key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        part_path = self._parts_dir(upload_id) / f"{part_number:05d}"
+        async with aiofiles.open(part_path, "wb") as f:
+            await f.write(data)
+        return f'"{part_number}-{len(data)}"'
+
+    async def complete_multipart(self, storage_key: str, upload_id: str, parts: list[dict]) -> None:
+        part_paths = [self._parts_dir(upload_id) / f"{p['PartNumber']:05d}" for p in parts]
+        with metrics.timer("storage.complete_multipart"):
+            await asyncio.to_thread(self._concatenate, part_paths, self.path_for(storage_key))
+        await self.abort_multipart(storage_key, upload_id)
+
+    async def abort_multipart(self, storage_key: str, upload_id: str) -> None:
+        await asyncio.to_thread(shutil.rmtree, self._parts_dir(upload_id), True)
+
+    async def delete(self, storage_key: str) -> None:
+        await self._call("delete_object", partial(self.path_for(storage_key).unlink, missing_ok=True))
+
+    async def presigned_url(self, storage_key: str, expires_in: int = 3600) -> str:
+        expires = int(time.time()) + expires_in
+        signature = sign_local_url(storage_key, expires)
+        return (
+            f"{settings.BACKEND_BASE_URL}/api/v1/files/{quote(storage_key)}"
+            f"?expires={expires}&signature={signature}"
+        )
+
+    async def presigned_upload(self, filename: str, content_type: str, size: int, expires_in: int = 3600) -> dict:
+        """A signed PUT to the /files endpoint, bound to this size and content type."""
+        storage_key = _new_storage_key(filename)
+        expires = int(time.time()) + expires_in
+        signature = sign_local_url(storage_key, expires, scope=upload_scope(size, content_type))
+        return {
+            "storage_key": storage_key,
+            "method":      "PUT",
+            "url": (
+                f"{settings.BACKEND_BASE_URL}/api/v1/files/{quote(storage_key)}"
+                f"?expires={expires}&size={size}&signature={signature}"
+            ),
+            "fields":      {},
+            "headers":     {"Content-Type": content_type},
+        }
+
+    async def head(self, storage_key: str) -> dict | None:
+        try:
+            stat = await asyncio.to_thread(os.stat, self.path_for(storage_key))
+        except FileNotFoundError:
+            return None
+        return {
+            "size":         stat.st_size,
+            "content_type": mimetypes.guess_type(storage_key)[0],
+            "etag":         f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+        }
+
+    async def read_range(self, storage_key: str, start: int, length: int) -> bytes:
+        def read() -> bytes:
+            with open(self.path_for(storage_key), "rb") as f:
+                return os.pread(f.fileno(), length, start)
+
+        return await asyncio.to_thread(read)
+
+    async def list_objects(self, prefix: str = "") -> AsyncIterator[list[dict]]:
+        def scan() -> list[dict]:
+            objects = []
+            for dirpath, dirnames, filenames in os.walk(self._root):
+                # Skip .multipart staging and in-flight .tmp files
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                for name in filenames:
+                    if name.startswith("."):
+                        continue
+                    path = Path(dirpath) / name
+                    key = path.relative_to(self._root).as_posix()
+                    if not key.startswith(prefix):
+                        continue
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    objects.append({
+                        "key":           key,
+                        "size":          stat.st_size,
+                        "last_modified": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+                    })
+            return objects
+
+        objects = await asyncio.to_thread(scan)
+        for first in range(0, len(objects), DELETE_BATCH_SIZE):
+            yield objects[first:first + DELETE_BATCH_SIZE]
+
+    async def delete_many(self, storage_keys: list[str]) -> list[str]:
+        def remove() -> list[str]:
+            deleted = []
+            for key in storage_keys:
+                try:
+                    self.path_for(key).unlink(missing_ok=True)
+                except (OSError, ValueError) as exc:
+                    logger.warning("Could not delete %s: %s", key, exc)
+                    continue
+                deleted.append(key)
+            return deleted
+
+        return await self._call("delete_objects", remove)
+
+    def close(self) -> None:
+        pass
+
+    def _parts_dir(self, upload_id: str) -> Path:
+        if not upload_id.isalnum():
+            raise ValueError(f"Invalid upload id: {upload_id}")
+        return self._root / ".multipart" / upload_id
+
+    @staticmethod
+    def _concatenate(part_paths: list[Path], destination: Path) -> None:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = destination.with_name(f".{destination.name}.tmp")
+        with open(tmp_path, "wb") as out:
+            for part_path in part_paths:
+                with open(part_path, "rb") as part:
+                    shutil.copyfileobj(part, out, MULTIPART_PART_SIZE)
+        os.replace(tmp_path, destination)
+
+
+def _local_signing_key() -> bytes:
+    key = (settings.LOCAL_STORAGE_SIGNING_SECRET or settings.AUTH_SECRET).encode()
+    if not key:
+        raise ValueError("Local storage needs LOCAL_STORAGE_SIGNING_SECRET or AUTH_SECRET to sign URLs")
+    return key
+
+
+def upload_scope(size: int, content_type: str) -> str:
+    """What a local upload URL is bound to — a download signature can't be replayed as an upload."""
+    return f"PUT:{size}:{content_type}"
+
+
+def sign_local_url(storage_key: str, expires: int, scope: str = "") -> str:
+    message = f"{storage_key}:{expires}" + (f":{scope}" if scope else "")
+    return hmac.new(_local_signing_key(), message.encode(), hashlib.sha256).hexdigest()
+
+
+def verify_local_url(storage_key: str, expires: int, signature: str, scope: str = "") -> bool:
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sign_local_url(storage_key, expires, scope), signature)
+
+
+async def _single_chunk(data: bytes):
+    yield data
+
+
+_storage: S3StorageBackend | LocalStorageBackend | MockStorageBackend | None = None
+
+
+def init_storage_backend() -> None:
+    """Called once from the app lifespan — builds the process-wide backend."""
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "mock":
+            _storage = MockStorageBackend()
+        elif settings.STORAGE_BACKEND == "local":
+            _storage = LocalStorageBackend()
+        else:
+            _storage = S3StorageBackend()
+        logger.info("Storage backend initialised: %s", settings.STORAGE_BACKEND)
+
+
+def close_storage_backend() -> None:
+    global _storage
+    if _storage is not None:
+        _storage.close()
+        _storage = None
+        logger.info("Storage backend closed.")
+
+
+def get_storage_backend() -> S3StorageBackend | LocalStorageBackend | MockStorageBackend:
+    # Scripts and tests that never run the lifespan get a lazily built instance
+    if _storage is None:
+        init_storage_backend()
+    return _storage
+
 
-def get_storage_backend() -> S3StorageBackend | MockStorageBackend:
-    if settings.STORAGE_BACKEND == "mock":
-        return MockStorageBackend()
-    return S3StorageBackend()
+def _new_storage_key(filename: str) -> str:
+    ext = filename.rsplit(".", 1)[-1] if "." in filename else ""
+    return f"interviews/{uuid.uuid4()}.{ext}"
@@ -0,0 +1,100 @@
+"""
+Storage garbage collection.
+
+Objects can outlive every reference to them: an upload that failed after
+the file was stored, a compacted copy whose interview was deleted mid-encode,
+a direct upload whose session document was already purged. The reaper lists
+the bucket and deletes any object that no interview (storage_key,
+audio_storage_key or audio_segments) and no open upload session points at,
+in DeleteObjects batches. Objects held by a deduplicated upload that hasn't
+been inserted yet are skipped too, as are large webhook bodies whose event
+is still kept (see webhook_events). Objects younger than STORAGE_GC_GRACE_HOURS are
+left alone, so a file stored a moment before its interview is inserted is
+never taken.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.metrics import metrics
+from app.services import upload_sessions
+from app.services.dedup import HOLDS_COLLECTION
+from app.services.storage import DELETE_BATCH_SIZE, get_storage_backend
+from app.services.waveform import COLLECTION as WAVEFORM_COLLECTION
+from app.services.webhook_events import COLLECTION as WEBHOOK_EVENTS
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "interviews/"
+
+
+async def _referenced(db, keys: list[str]) -> set[str]:
+    referenced = set()
+    cursor = db["interviews"].find(
+        {"$or": [
+            {"storage_key": {"$in": keys}},
+            {"audio_storage_key": {"$in": keys}},
+            {"audio_segments.storage_key": {"$in": keys}},
+        ]},
+        {"storage_key": 1, "audio_storage_key": 1, "audio_segments.storage_key": 1},
+    )
+    async for doc in cursor:
+        referenced.add(doc["storage_key"])
+        referenced.add(doc.get("audio_storage_key"))
+        referenced.update(segment["storage_key"] for segment in doc.get("audio_segments") or [])
+    # Sessions still in flight own their object until they complete or expire
+    cursor = db[upload_sessions.COLLECTION].find({"storage_key": {"$in": keys}}, {"storage_key": 1})
+    async for session in cursor:
+        referenced.add(session["storage_key"])
+    # As do uploads about to reuse one
+    cursor = db[HOLDS_COLLECTION].find({"storage_key": {"$in": keys}}, {"storage_key": 1})
+    async for hold in cursor:
+        referenced.add(hold["storage_key"])
+    cursor = db[WEBHOOK_EVENTS].find({"payload_key": {"$in": keys}}, {"payload_key": 1})
+    async for event in cursor:
+        referenced.add(event["payload_key"])
+    return referenced
+
+
+async def reap_orphaned_objects() -> dict:
+    """
+    Delete unreferenced storage objects older than the grace period.
+    Returns {"scanned", "deleted", "bytes_reclaimed"}.
+    """
+    db = get_db()
+    storage = get_storage_backend()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.STORAGE_GC_GRACE_HOURS)
+    stats = {"scanned": 0, "deleted": 0, "bytes_reclaimed": 0}
+
+    async def sweep(candidates: list[dict]) -> None:
+        referenced = await _referenced(db, [obj["key"] for obj in candidates])
+        orphans = {obj["key"]: obj["size"] for obj in candidates if obj["key"] not in referenced}
+        if not orphans:
+            return
+        deleted = await storage.delete_many(list(orphans))
+        await db[WAVEFORM_COLLECTION].delete_many({"_id": {"$in": deleted}})
+        reclaimed = sum(orphans[key] for key in deleted)
+        stats["deleted"] += len(deleted)
+        stats["bytes_reclaimed"] += reclaimed
+        metrics.incr("storage_gc.objects_deleted", len(deleted))
+        metrics.incr("storage_gc.bytes_reclaimed", reclaimed)
+
+    with metrics.timer("storage.gc"):
+        candidates: list[dict] = []
+        async for page in storage.list_objects(PREFIX):
+            stats["scanned"] += len(page)
+            metrics.incr("storage_gc.objects_scanned", len(page))
+            candidates.extend(obj for obj in page if obj["last_modified"] < cutoff)
+            while len(candidates) >= DELETE_BATCH_SIZE:
+                await sweep(candidates[:DELETE_BATCH_SIZE])
+                del candidates[:DELETE_BATCH_SIZE]
+        if candidates:
+            await sweep(candidates)
+
+    if stats["deleted"]:
+        logger.info(
+            "Storage GC deleted %d of %d objects, reclaiming %.1f MB",
+            stats["deleted"], stats["scanned"], stats["bytes_reclaimed"] / (1024 * 1024),
+        )
+    return stats
@@ -0,0 +1,133 @@
+"""
+Reconciliation of interviews stuck mid-pipeline.
+
+A lost Deepgram callback (deploy, network trouble, wrong BACKEND_BASE_URL)
+or a job that never made it into the queue leaves an interview in queued,
+transcribing or analysing indefinitely. Every STUCK_SWEEP_INTERVAL_SECONDS
+the sweeper looks for interviews whose status hasn't changed for
+STUCK_INTERVIEW_MINUTES and puts them back on track:
+
+queued       re-enqueue the transcription job if the queue no longer has one
+transcribing the webhook never came — resubmit to Deepgram. The job ids
+             given up on are kept in superseded_job_ids, so a callback that
+             turns up late for one of them is dropped
+analysing    re-enqueue the analysis job if the queue no longer has one
+
+Interviews the queue is still working on (retrying with backoff) are left
+alone, and are kept out of the query so they don't use up a pass. At most STUCK_SWEEP_BATCH interviews are acted on per pass, oldest
+first, and each gets STUCK_MAX_RECOVERIES attempts before it is marked
+failed. Stuck counts and the oldest stuck age are published as gauges.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.metrics import metrics
+from app.services.jobs import COLLECTION as JOBS, enqueue, is_active
+from app.services.notification import manager
+
+logger = logging.getLogger(__name__)
+
+STUCK_STATUSES = ("queued", "transcribing", "analysing")
+
+
+async def _publish_gauges(db, cutoff: datetime, now: datetime) -> None:
+    for status in STUCK_STATUSES:
+        count = await db["interviews"].count_documents({"status": status, "updated_at": {"$lt": cutoff}})
+        metrics.set_gauge(f"pipeline.stuck.{status}", count)
+    oldest = await db["interviews"].find_one(
+        {"status": {"$in": list(STUCK_STATUSES)}, "updated_at": {"$lt": cutoff}},
+        {"updated_at": 1},
+        sort=[("updated_at", 1)],
+    )
+    age = (now - oldest["updated_at"].replace(tzinfo=timezone.utc)).total_seconds() if oldest else 0
+    metrics.set_gauge("pipeline.stuck.oldest_seconds", age)
+
+
+async def _fail(db, interview: dict, error: str, now: datetime) -> None:
+    await db["interviews"].update_one(
+        {"_id": interview["_id"], "status": interview["status"]},
+        {"$set": {"status": "failed", "error_message": error, "updated_at": now}},
+    )
+    if interview.get("user_id"):
+        await manager.send_to_user(str(interview["user_id"]), {
+            "type":         "status_update",
+            "interview_id": str(interview["_id"]),
+            "status":       "failed",
+            "updated_at":   now.isoformat(),
+        })
+
+
+async def _recover(db, interview: dict, now: datetime) -> str | None:
+    """Put one stuck interview back on track. Returns what was done, if anything."""
+    interview_id = str(interview["_id"])
+    status = interview["status"]
+    stage = "analyse" if status == "analysing" else "transcribe"
+    if status != "transcribing" and await is_active(db, f"{stage}:{interview_id}"):
+        return None
+
+    if interview.get("recovery_attempts", 0) >= settings.STUCK_MAX_RECOVERIES:
+        await _fail(db, interview, f"Processing stalled while {status}. Please try again.", now)
+        return "failed"
+
+    if stage == "transcribe":
+        # Back to queued so the transcription job submits again
+        update = {"$set": {"status": "queued", "updated_at": now}, "$unset": {"deepgram_job_id": ""}}
+        if interview.get("deepgram_job_id"):
+            update["$addToSet"] = {"superseded_job_ids": {"$each": interview["deepgram_job_id"].split(",")}}
+    else:
+        update = {"$set": {"updated_at": now}}
+    update["$inc"] = {"recovery_attempts": 1}
+    # Conditional on the state we saw, so a webhook landing meanwhile wins
+    claimed = await db["interviews"].update_one(
+        {"_id": interview["_id"], "status": status, "updated_at": interview["updated_at"]},
+        update,
+    )
+    if not claimed.modified_count:
+        return None
+
+    if stage == "analyse":
+        await enqueue(db, "analyse", {"interview_id": interview_id, "user_id": interview.get("user_id")}, key=f"analyse:{interview_id}")
+    else:
+        await enqueue(db, "transcribe", {"interview_id": interview_id}, key=f"transcribe:{interview_id}")
+    return "resubmitted" if status == "transcribing" else "requeued"
+
+
+async def _queued_interviews(db, kind: str) -> list[ObjectId]:
+    """Interviews the queue still has a pending or running job of kind for."""
+    cursor = db[JOBS].find({"active_key": {"$exists": True}, "kind": kind}, {"payload.interview_id": 1})
+    return [ObjectId(job["payload"]["interview_id"]) async for job in cursor]
+
+
+async def sweep_stuck_interviews() -> dict:
+    """One reconciliation pass. Returns counts of what was done."""
+    db = get_db()
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(minutes=settings.STUCK_INTERVIEW_MINUTES)
+    await _publish_gauges(db, cutoff, now)
+
+    actions = {"requeued": 0, "resubmitted": 0, "failed": 0}
+    cursor = db["interviews"].find(
+        {
+            "updated_at": {"$lt": cutoff},
+            "$or": [
+                {"status": "queued",       "_id": {"$nin": await _queued_interviews(db, "transcribe")}},
+                {"status": "transcribing"},
+                {"status": "analysing",    "_id": {"$nin": await _queued_interviews(db, "analyse")}},
+            ],
+        },
+        {"status": 1, "user_id": 1, "updated_at": 1, "recovery_attempts": 1, "deepgram_job_id": 1},
+    ).sort("updated_at", 1).limit(settings.STUCK_SWEEP_BATCH)
+    async for interview in cursor:
+        try:
+            action = await _recover(db, interview, now)
+        except Exception:
+            logger.exception("Could not recover interview %s", interview["_id"])
+            continue
+        if action:
+            actions[action] += 1
+            logger.warning("Interview %s stuck in %s since %s: %s", interview["_id"], interview["status"], interview["updated_at"], action)
+    return actions
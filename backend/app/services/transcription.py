@@ -1,69 +1,106 @@
+import asyncio
 import logging
 from typing import Protocol
 
+import httpx
+import orjson
+
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.silence import remap_transcript
 
 logger = logging.getLogger(__name__)
 
 
 
 class TranscriptionService(Protocol):
-    async def submit(self, storage_key: str, interview_id: str) -> str: ...
-    async def parse_webhook(self, payload: dict) -> dict: ...
+    async def submit(self, storage_key: str, interview_id: str, segment: int | None = None) -> str: ...
+    async def parse_webhook(self, payload: dict | bytes, offset_map: list[list[int]] | None = None) -> dict: ...
 
 
 
 class DeepgramService:
-    async def submit(self, storage_key: str, interview_id: str) -> str:
+    """
+    Talks to Deepgram's pre-recorded REST API over one shared httpx.AsyncClient.
+    The SDK opens a fresh HTTP client for every request, so we call the
+    endpoint directly to keep a tunable, reusable connection pool.
+    At most DEEPGRAM_MAX_INFLIGHT_SUBMITS submissions run at once; the rest
+    wait for a slot. One instance is shared per process (see
+    init_transcription_service).
+    """
+
+    def __init__(self):
+        self._client = httpx.AsyncClient(
+            headers={"Authorization": f"Token {settings.DEEPGRAM_API_KEY}"},
+            limits=httpx.Limits(
+                max_connections=settings.DEEPGRAM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.DEEPGRAM_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(settings.DEEPGRAM_SUBMIT_TIMEOUT_SECONDS, connect=10.0),
+        )
+        self._slots = asyncio.Semaphore(settings.DEEPGRAM_MAX_INFLIGHT_SUBMITS)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def submit(self, storage_key: str, interview_id: str, segment: int | None = None) -> str:
         """
         Generate a presigned R2 URL and submit it to Deepgram.
         Deepgram fetches the file directly — we never stream bytes through our server.
-        Returns the Deepgram request_id (our job ID).
+        segment is the index of a chunked recording's segment (see chunking),
+        passed back on the callback URL.
+        Returns the Deepgram request_id (our job ID). Waiting for a slot and
+        the request itself must finish within DEEPGRAM_SUBMIT_TIMEOUT_SECONDS.
         """
-        from deepgram import DeepgramClient, PrerecordedOptions, UrlSource
         from app.services.storage import get_storage_backend
 
         storage = get_storage_backend()
         presigned_url = await storage.presigned_url(storage_key, expires_in=3600)
 
-        backend_url = getattr(settings, "BACKEND_URL", None) or "http://localhost:8000"
-        if not backend_url.startswith("http"):
-            backend_url = f"https://{backend_url}"
-        webhook_url = f"{backend_url}/api/v1/webhooks/deepgram?interview_id={interview_id}"
+        webhook_url = f"{settings.BACKEND_BASE_URL}/api/v1/webhooks/deepgram?interview_id={interview_id}"
+        if segment is not None:
+            webhook_url += f"&segment={segment}"
 
         logger.info("Deepgram webhook callback URL: %s", webhook_url)
 
-        client  = DeepgramClient(settings.DEEPGRAM_API_KEY)
-        options = PrerecordedOptions(
-            model="nova-2",
-            smart_format=True,
-            diarize=True,
-            utterances=True,
-            punctuate=True,
-            paragraphs=True,
-        )
-
-        source   = UrlSource(url=presigned_url)
-        response = client.listen.rest.v("1").transcribe_url_callback(
-            source,
-            callback=webhook_url,
-            options=options,
-        )
+        params = {
+            "model":        "nova-2",
+            "smart_format": "true",
+            "diarize":      "true",
+            "utterances":   "true",
+            "punctuate":    "true",
+            "paragraphs":   "true",
+            "callback":     webhook_url,
+        }
+        timeout = settings.DEEPGRAM_SUBMIT_TIMEOUT_SECONDS
+        try:
+            response = await asyncio.wait_for(self._post(params, presigned_url), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Deepgram did not accept the job within {timeout}s") from None
+        response.raise_for_status()
 
-        job_id = (
-            getattr(response, "request_id", None)
-            or f"job-{interview_id}"
-        )
+        job_id = response.json().get("request_id") or f"job-{interview_id}"
 
         logger.info("Deepgram job submitted: %s for interview %s", job_id, interview_id)
         return job_id
 
-    async def parse_webhook(self, payload: dict) -> dict:
+    async def _post(self, params: dict, url: str) -> httpx.Response:
+        async with self._slots:
+            with metrics.timer("deepgram.submit"):
+                return await self._client.post(settings.DEEPGRAM_API_URL, params=params, json={"url": url})
+
+    async def parse_webhook(self, payload: dict | bytes, offset_map: list[list[int]] | None = None) -> dict:
         """
         Transform Deepgram's webhook payload into our Transcript shape.
+        payload may be the raw callback body, which is decoded once with orjson.
         Deepgram sends: results.channels[0].alternatives[0] for words
         and results.utterances for speaker-level segments.
+        When the submitted audio had silences trimmed, offset_map shifts every
+        timestamp back onto the original recording so the player seeks correctly.
         """
+        if isinstance(payload, (bytes, bytearray, memoryview)):
+            # orjson rejects bytes subclasses such as bson.Binary
+            payload = orjson.loads(bytes(payload) if type(payload) is not bytes else payload)
         results = payload.get("results", {})
         channels = results.get("channels", [])
         utterances = results.get("utterances", [])
@@ -79,27 +116,21 @@ class DeepgramService:
             text = alt.get("transcript", "")
             confidence = alt.get("confidence", 0.0)
 
-            for w in alt.get("words", []):
-                words.append({
-                    "text":       w.get("punctuated_word", w.get("word", "")),
-                    "start_ms":   int(w.get("start", 0) * 1000),
-                    "end_ms":     int(w.get("end", 0) * 1000),
-                    "confidence": w.get("confidence", 0.0),
-                    "speaker":    _speaker_label(w.get("speaker")),
-                })
+            words = _parse_words(alt.get("words", []))
 
         # Utterances: sentence-level with speaker + sentiment
+        labels = _SpeakerLabels()
         parsed_utterances = []
         for u in utterances:
             parsed_utterances.append({
-                "speaker":   _speaker_label(u.get("speaker")),
+                "speaker":   labels[u.get("speaker")],
                 "text":      u.get("transcript", ""),
                 "start_ms":  int(u.get("start", 0) * 1000),
                 "end_ms":    int(u.get("end", 0) * 1000),
                 "sentiment": _parse_sentiment(u.get("sentiment")),
             })
 
-        return {
+        parsed = {
             "transcript": {
                 "text":          text,
                 "words":         words,
@@ -109,16 +140,22 @@ class DeepgramService:
             },
             "duration_seconds": metadata.get("duration", 0),
         }
+        if offset_map:
+            remap_transcript(parsed, offset_map)
+        return parsed
 
 
 
 class MockTranscriptionService:
     """Returns realistic fake data — no real API calls."""
-    async def submit(self, storage_key: str, interview_id: str) -> str:
+    async def submit(self, storage_key: str, interview_id: str, segment: int | None = None) -> str:
         logger.info("Mock transcription submitted for interview %s", interview_id)
-        return f"mock-job-{interview_id}"
+        return f"mock-job-{interview_id}" if segment is None else f"mock-job-{interview_id}-{segment}"
+
+    async def close(self) -> None:
+        pass
 
-    async def parse_webhook(self, payload: dict) -> dict:
+    async def parse_webhook(self, payload: dict | bytes, offset_map: list[list[int]] | None = None) -> dict:
         return {
             "transcript": {
                 "text": "Interviewer: Tell me about yourself. Candidate: I have five years of Python experience.",
@@ -139,10 +176,30 @@ class MockTranscriptionService:
 
 # Factory 
 
+_service: DeepgramService | MockTranscriptionService | None = None
+
+
+def init_transcription_service() -> None:
+    """Called once from the app lifespan — builds the process-wide service."""
+    global _service
+    if _service is None:
+        _service = MockTranscriptionService() if settings.TRANSCRIPTION_BACKEND == "mock" else DeepgramService()
+        logger.info("Transcription service initialised: %s", settings.TRANSCRIPTION_BACKEND)
+
+
+async def close_transcription_service() -> None:
+    global _service
+    if _service is not None:
+        await _service.close()
+        _service = None
+        logger.info("Transcription service closed.")
+
+
 def get_transcription_service() -> DeepgramService | MockTranscriptionService:
-    if settings.TRANSCRIPTION_BACKEND == "mock":
-        return MockTranscriptionService()
-    return DeepgramService()
+    # Scripts and tests that never run the lifespan get a lazily built instance
+    if _service is None:
+        init_transcription_service()
+    return _service
 
 
 # Helper functions
@@ -155,6 +212,39 @@ def _speaker_label(speaker_int) -> str:
     return labels[idx] if idx < len(labels) else str(idx)
 
 
+class _SpeakerLabels(dict):
+    """Speaker index -> label, computed once per distinct speaker."""
+
+    def __missing__(self, speaker_int) -> str:
+        label = self[speaker_int] = _speaker_label(speaker_int)
+        return label
+
+
+def _parse_words(raw_words: list[dict]) -> list[dict]:
+    """
+    The hot loop of parse_webhook — an hour of audio is ~10k words. Keys
+    Deepgram always sends are indexed directly, falling back to .get() only
+    for a word that lacks one.
+    """
+    labels = _SpeakerLabels()
+    words = []
+    append = words.append
+    for w in raw_words:
+        try:
+            start, end, confidence = w["start"], w["end"], w["confidence"]
+        except KeyError:
+            start, end, confidence = w.get("start", 0), w.get("end", 0), w.get("confidence", 0.0)
+        text = w.get("punctuated_word")
+        append({
+            "text":       text if text is not None else w.get("word", ""),
+            "start_ms":   int(start * 1000),
+            "end_ms":     int(end * 1000),
+            "confidence": confidence,
+            "speaker":    labels[w.get("speaker")],
+        })
+    return words
+
+
 def _parse_sentiment(sentiment_data) -> str | None:
     """Extract sentiment label from Deepgram's sentiment object."""
     if not sentiment_data:
@@ -0,0 +1,228 @@
+"""
+Transcripts, stored apart from their interview.
+
+A long interview's transcript is most of its document, and almost every
+query on interviews only needs status, keys or the analysis. The transcript
+lives in its own collection with the interview's _id, and only the
+endpoints that show, export or analyse it load it. The interview document
+keeps a transcript_summary (see summarize) so lists and status checks can
+tell whether one exists without reading it.
+
+The words are the one copy of the text: the full text and each utterance's
+text are rebuilt from them on load (see compact_transcript). The text index
+covers word_blocks.text, plus text for the rare transcript that can't be
+derived. The word blocks are kept in their own top-level array beside the
+rest of words, so a window of utterances reads only its slice of the
+utterances and then only the blocks that slice spans (see load_window).
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+from bson import Binary, ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.models.interview import (
+    decode_utterances,
+    decode_words,
+    encode_utterances,
+    encode_words,
+    word_texts,
+    words_text,
+)
+
+COLLECTION = "transcripts"
+
+# Stored fields each loadable field is rebuilt from (words.text: columnar-v1/v2)
+_WORD_TEXT = ["words.format", "words.count", "word_blocks.text", "words.text"]
+_SOURCES = {
+    "text":       ["text", *_WORD_TEXT],
+    "utterances": ["utterances", *_WORD_TEXT],
+    "words":      ["words", "word_blocks"],
+}
+
+
+def summarize(transcript: dict) -> dict:
+    """The fields copied onto the interview document."""
+    words = transcript.get("words") or []
+    return {
+        "language_code":   transcript.get("language_code", "en"),
+        "confidence":      transcript.get("confidence", 0.0),
+        "word_count":      words["count"] if isinstance(words, dict) else len(words),
+        "utterance_count": len(transcript.get("utterances") or []),
+    }
+
+
+def compact_transcript(transcript: dict) -> dict:
+    """
+    The stored form of a parsed transcript: columnar words, utterances as
+    word ranges, and the full text only if the words don't reproduce it.
+    """
+    words = decode_words(transcript.get("words"))
+    encoded = encode_words(words)
+    utterances = transcript.get("utterances") or []
+    document = {
+        **{key: value for key, value in transcript.items() if key != "text"},
+        "words":              {key: value for key, value in encoded.items() if key != "blocks"},
+        "word_blocks":        encoded["blocks"],
+        "utterances":         encode_utterances(utterances, words),
+        # Sorted, for finding the utterances around a time (see load_window)
+        "utterance_start_ms": Binary(np.array([u["start_ms"] for u in utterances], dtype="<i4").tobytes()),
+    }
+    if transcript.get("text", "") != words_text(encoded):
+        document["text"] = transcript.get("text", "")
+    return document
+
+
+def _stored_words(doc: dict) -> dict | list | None:
+    """Pop a stored document's words, with their blocks put back (see compact_transcript)."""
+    words = doc.pop("words", None)
+    blocks = doc.pop("word_blocks", None)
+    return {**words, "blocks": blocks} if blocks is not None else words
+
+
+def expand_transcript(doc: dict, fields: list[str] | None = None) -> dict:
+    """Rebuild fields (all by default) of a stored transcript document."""
+    words = _stored_words(doc)
+    doc.pop("utterance_start_ms", None)
+    if fields is None or "utterances" in fields:
+        doc["utterances"] = decode_utterances(doc.get("utterances") or [], word_texts(words))
+    if fields is None or "text" in fields:
+        doc["text"] = doc["text"] if "text" in doc else words_text(words)
+    if fields is None or "words" in fields:
+        doc["words"] = decode_words(words)
+    return doc
+
+
+async def save_transcript(db: AsyncIOMotorDatabase, interview_id: ObjectId, user_id: str | None, transcript: dict) -> dict:
+    """Store (or replace) an interview's transcript. Returns its summary."""
+    document = {
+        **compact_transcript(transcript),
+        "user_id":    user_id,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    await db[COLLECTION].replace_one({"_id": interview_id}, document, upsert=True)
+    return summarize(document)
+
+
+async def load_transcript(db: AsyncIOMotorDatabase, interview_id: ObjectId, fields: list[str] | None = None) -> dict | None:
+    """
+    The transcript of an interview with words expanded, or None. fields
+    limits what is read — e.g. ["text"] for analysis.
+    """
+    if fields is None:
+        projection = {"_id": 0, "user_id": 0, "updated_at": 0, "utterance_start_ms": 0}
+    else:
+        projection = {"_id": 0, **{source: 1 for field in fields for source in _SOURCES.get(field, [field])}}
+    doc = await db[COLLECTION].find_one({"_id": interview_id}, projection)
+    if doc is None:
+        return None
+    return expand_transcript(doc, fields)
+
+
+async def load_window(
+    db: AsyncIOMotorDatabase,
+    interview_id: ObjectId,
+    limit: int,
+    offset: int = 0,
+    from_ms: int | None = None,
+    to_ms: int | None = None,
+    include_words: bool = False,
+) -> dict | None:
+    """
+    Up to limit utterances starting at index offset — or, given from_ms, the
+    ones overlapping [from_ms, to_ms) — and optionally the words they span.
+    Only that slice of utterances is read; the time lookup bisects the
+    stored utterance start times. Returns {"offset", "utterances"[, "words"]},
+    or None if there is no transcript.
+    """
+    count = limit
+    if from_ms is not None:
+        doc = await db[COLLECTION].find_one({"_id": interview_id}, {"_id": 0, "utterance_start_ms": 1})
+        if doc is None:
+            return None
+        starts = np.frombuffer(doc["utterance_start_ms"], dtype="<i4")
+        # The last utterance starting at or before from_ms, up to the last one starting before to_ms
+        offset = max(int(np.searchsorted(starts, from_ms, side="right")) - 1, 0)
+        stop = len(starts) if to_ms is None else int(np.searchsorted(starts, to_ms, side="left"))
+        count = min(limit, stop - offset)
+    if count <= 0:
+        return {"offset": offset, "utterances": [], **({"words": []} if include_words else {})}
+    # One extra in case the first has already ended by from_ms
+    fetch = count + 1 if from_ms is not None else count
+
+    doc = await db[COLLECTION].find_one(
+        {"_id": interview_id},
+        {"_id": 0, "utterances": {"$slice": [offset, fetch]}, "words.format": 1, "words.count": 1, "words.block_size": 1},
+    )
+    if doc is None:
+        return None
+
+    sliced = doc.get("utterances") or []
+    if from_ms is not None:
+        if sliced and sliced[0]["end_ms"] <= from_ms:
+            # from_ms falls in the silence after it
+            sliced = sliced[1:]
+            offset += 1
+        sliced = sliced[:min(limit, stop - offset)]
+    ranges = [u["word_range"] for u in sliced if "word_range" in u]
+    first = min((r[0] for r in ranges), default=0)
+    last = max((r[1] for r in ranges), default=0)
+    words, base = await _load_word_range(db, interview_id, doc.get("words"), first, last, include_words)
+
+    shifted = [{**u, "word_range": [u["word_range"][0] - base, u["word_range"][1] - base]} if "word_range" in u else u for u in sliced]
+    window = {"offset": offset, "utterances": decode_utterances(shifted, word_texts(words))}
+    if include_words:
+        window["words"] = decode_words(words, first - base, last - base) if last > first else []
+    return window
+
+
+async def _load_word_range(
+    db: AsyncIOMotorDatabase, interview_id: ObjectId, meta: dict | None, first: int, last: int, include_words: bool,
+) -> tuple[dict | list | None, int]:
+    """
+    The stored words covering words[first:last], and the index of the first
+    word they hold. Only the blocks in that range are read; transcripts in
+    a layout without blocks are read whole.
+    """
+    if last <= first:
+        return None, 0
+    if meta and "block_size" in meta:
+        size = meta["block_size"]
+        first_block = first // size
+        projection = {
+            "_id":          0,
+            "words.format": 1,
+            "words.count":  1,
+            "word_blocks":  {"$slice": [first_block, -(-last // size) - first_block]},
+        }
+        if include_words:
+            projection["words.speakers"] = 1
+        doc = await db[COLLECTION].find_one({"_id": interview_id}, projection)
+        if doc is None:
+            return None, 0
+        # Rebased: the blocks read are the only ones decode_words sees
+        doc["words"]["block_size"] = size
+        return _stored_words(doc), first_block * size
+    projection = {"_id": 0, "words": 1} if include_words else {"_id": 0, **{field: 1 for field in _WORD_TEXT}}
+    doc = await db[COLLECTION].find_one({"_id": interview_id}, projection)
+    return doc and doc.get("words"), 0
+
+
+async def copy_transcript(db: AsyncIOMotorDatabase, source_id: ObjectId, target_id: ObjectId, user_id: str | None) -> dict | None:
+    """Give target_id a copy of source_id's transcript (dedup). Returns its summary, or None if there is none."""
+    doc = await db[COLLECTION].find_one({"_id": source_id}, {"_id": 0})
+    if doc is None:
+        return None
+    doc.update(user_id=user_id, updated_at=datetime.now(timezone.utc))
+    await db[COLLECTION].replace_one({"_id": target_id}, doc, upsert=True)
+    return summarize(doc)
+
+
+async def delete_transcript(db: AsyncIOMotorDatabase, interview_id: ObjectId) -> None:
+    await db[COLLECTION].delete_one({"_id": interview_id})
+
+
+async def search_transcripts(db: AsyncIOMotorDatabase, user_id: str, search: str) -> list[ObjectId]:
+    """Ids of the user's interviews whose transcript text matches a $text search."""
+    docs = await db[COLLECTION].find({"user_id": user_id, "$text": {"$search": search}}, {"_id": 1}).to_list(length=None)
+    return [doc["_id"] for doc in docs]
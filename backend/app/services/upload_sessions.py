@@ -0,0 +1,208 @@
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.services.media import HEAD_BYTES, TAIL_BYTES, probe
+from app.services.storage import get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "upload_sessions"
+
+
+def _expiry(now: datetime) -> datetime:
+    return now + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+
+
+async def create_session(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    filename: str,
+    content_type: str,
+    total_size: int,
+    title: str | None,
+) -> dict:
+    """
+    Open an S3 multipart upload and record it as a resumable session.
+    Chunk N of the session is multipart part N + 1.
+    """
+    chunk_size = settings.RESUMABLE_CHUNK_SIZE_BYTES
+    storage_key, upload_id = await get_storage_backend().create_multipart(filename, content_type)
+
+    now = datetime.now(timezone.utc)
+    session = {
+        "kind":          "chunked",
+        "user_id":       user_id,
+        "filename":      filename,
+        "content_type":  content_type,
+        "title":         title,
+        "total_size":    total_size,
+        "chunk_size":    chunk_size,
+        "total_chunks":  math.ceil(total_size / chunk_size),
+        "storage_key":   storage_key,
+        "upload_id":     upload_id,
+        "parts":         {},
+        "status":        "active",
+        "interview_id":  None,
+        "created_at":    now,
+        "updated_at":    now,
+        "expires_at":    _expiry(now),
+    }
+    result = await db[COLLECTION].insert_one(session)
+    session["_id"] = result.inserted_id
+    return session
+
+
+async def create_direct_session(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    filename: str,
+    content_type: str,
+    total_size: int,
+    title: str | None,
+) -> tuple[dict, dict]:
+    """
+    Issue a presigned upload for the browser to send the file straight to
+    the bucket, and record it so /finalize can verify and claim the object.
+    Returns (session, upload instructions).
+    """
+    upload = await get_storage_backend().presigned_upload(
+        filename,
+        content_type,
+        total_size,
+        expires_in=settings.DIRECT_UPLOAD_URL_TTL_SECONDS,
+    )
+
+    now = datetime.now(timezone.utc)
+    session = {
+        "kind":          "direct",
+        "user_id":       user_id,
+        "filename":      filename,
+        "content_type":  content_type,
+        "title":         title,
+        "total_size":    total_size,
+        "storage_key":   upload["storage_key"],
+        "status":        "active",
+        "interview_id":  None,
+        "created_at":    now,
+        "updated_at":    now,
+        "expires_at":    _expiry(now),
+    }
+    result = await db[COLLECTION].insert_one(session)
+    session["_id"] = result.inserted_id
+    return session, upload
+
+
+def expected_chunk_size(session: dict, index: int) -> int:
+    """Every chunk is chunk_size bytes except the last, which holds the remainder."""
+    if index == session["total_chunks"] - 1:
+        return session["total_size"] - index * session["chunk_size"]
+    return session["chunk_size"]
+
+
+async def record_chunk(db: AsyncIOMotorDatabase, session: dict, index: int, etag: str, data: bytes) -> None:
+    now = datetime.now(timezone.utc)
+    # Each chunk pushes the expiry out, so an upload that keeps making progress never expires
+    update = {
+        f"parts.{index}": {"etag": etag, "size": len(data)},
+        "updated_at":     now,
+        "expires_at":     _expiry(now),
+    }
+    # Keep the first and last few KB so the metadata probe can run at completion
+    if index == 0:
+        update["probe_head"] = data[:HEAD_BYTES]
+    if index == session["total_chunks"] - 1:
+        update["probe_tail"] = data[-TAIL_BYTES:]
+    await db[COLLECTION].update_one({"_id": session["_id"]}, {"$set": update})
+
+
+def session_media_info(session: dict) -> dict | None:
+    """Run the header probe over the bytes kept from the first and last chunks."""
+    head = session.get("probe_head")
+    if not head:
+        return None
+    return probe(bytes(head), bytes(session.get("probe_tail") or b""), session["total_size"])
+
+
+def describe_session(session: dict) -> dict:
+    if session.get("kind") == "direct":
+        return {
+            "upload_id":    str(session["_id"]),
+            "kind":         "direct",
+            "status":       session["status"],
+            "total_size":   session["total_size"],
+            "interview_id": session.get("interview_id"),
+            "expires_at":   session["expires_at"].isoformat(),
+        }
+
+    received = sorted(int(i) for i in session.get("parts", {}))
+    chunk_size = session["chunk_size"]
+    received_set = set(received)
+    missing = [i for i in range(session["total_chunks"]) if i not in received_set]
+    return {
+        "upload_id":      str(session["_id"]),
+        "kind":           "chunked",
+        "status":         session["status"],
+        "chunk_size":     chunk_size,
+        "total_size":     session["total_size"],
+        "total_chunks":   session["total_chunks"],
+        "received": [
+            {"index": i, "offset": i * chunk_size, "size": session["parts"][str(i)]["size"]}
+            for i in received
+        ],
+        "received_bytes": sum(p["size"] for p in session.get("parts", {}).values()),
+        "missing":        missing,
+        "interview_id":   session.get("interview_id"),
+        "expires_at":     session["expires_at"].isoformat(),
+    }
+
+
+def completed_parts(session: dict) -> list[dict] | None:
+    """Parts in S3 order, or None while any chunk is still missing."""
+    parts = session.get("parts", {})
+    if len(parts) != session["total_chunks"]:
+        return None
+    return [
+        {"PartNumber": i + 1, "ETag": parts[str(i)]["etag"]}
+        for i in range(session["total_chunks"])
+    ]
+
+
+async def purge_expired_upload_sessions() -> int:
+    """
+    Abort the multipart upload behind every expired session and delete it.
+    For direct uploads that were never finalized, the object the browser may
+    have sent is deleted instead, as is an object that was assembled before
+    its interview could be saved. Finished sessions are simply dropped.
+    Returns how many sessions were removed.
+    """
+    db = get_db()
+    storage = get_storage_backend()
+    now = datetime.now(timezone.utc)
+    purged = 0
+
+    cursor = db[COLLECTION].find(
+        {"expires_at": {"$lt": now}},
+        {"kind": 1, "storage_key": 1, "upload_id": 1, "status": 1, "assembled": 1},
+    )
+    async for session in cursor:
+        if session["status"] != "completed":
+            try:
+                # An assembled multipart upload is a whole object like a direct one
+                if session.get("kind") == "direct" or session.get("assembled"):
+                    await storage.delete(session["storage_key"])
+                else:
+                    await storage.abort_multipart(session["storage_key"], session["upload_id"])
+            except Exception:
+                logger.warning("Could not abort multipart upload for session %s", session["_id"])
+                continue
+        await db[COLLECTION].delete_one({"_id": session["_id"]})
+        purged += 1
+
+    if purged:
+        logger.info("Purged %d expired upload sessions", purged)
+    return purged
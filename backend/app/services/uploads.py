@@ -0,0 +1,66 @@
+import hashlib
+
+from fastapi import UploadFile
+
+from app.services.media import HEAD_BYTES, TAIL_BYTES, check_content_type, probe
+
+# Read size for each pass over the spooled upload. Small enough that a
+# request never holds more than this (plus one storage part) in memory.
+CHUNK_SIZE = 1024 * 1024
+
+
+class FileTooLargeError(Exception):
+    """Raised while streaming when an upload exceeds the size limit."""
+
+
+class UploadStream:
+    """
+    Async iterator over an UploadFile that yields fixed-size chunks.
+    Bytes are counted and hashed (SHA-256) as they pass, so the size limit
+    is enforced and the content hash is known once streaming finishes —
+    the whole file is never read into memory.
+
+    The first and last few KB are kept for the metadata probe. When
+    content_type is given, the magic bytes are checked against it before
+    the first chunk is yielded, so a mislabelled file never reaches storage.
+    """
+
+    def __init__(
+        self,
+        file: UploadFile,
+        max_bytes: int,
+        chunk_size: int = CHUNK_SIZE,
+        content_type: str | None = None,
+    ):
+        self._file = file
+        self._max_bytes = max_bytes
+        self._chunk_size = chunk_size
+        self._content_type = content_type
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._head = b""
+        self._tail = b""
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def media_info(self) -> dict | None:
+        """Duration, codec, sample rate and channels parsed from the headers (after streaming)."""
+        return probe(self._head, self._tail, self.size)
+
+    async def __aiter__(self):
+        while True:
+            chunk = await self._file.read(self._chunk_size)
+            if not chunk:
+                break
+            self.size += len(chunk)
+            if self.size > self._max_bytes:
+                raise FileTooLargeError(f"Upload exceeds {self._max_bytes} bytes.")
+            if self.size == len(chunk) and self._content_type:
+                check_content_type(chunk, self._content_type)
+            if len(self._head) < HEAD_BYTES:
+                self._head += chunk[:HEAD_BYTES - len(self._head)]
+            self._tail = (self._tail + chunk)[-TAIL_BYTES:] if len(chunk) < TAIL_BYTES else chunk[-TAIL_BYTES:]
+            self._hash.update(chunk)
+            yield chunk
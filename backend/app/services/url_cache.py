@@ -0,0 +1,114 @@
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+
+
+class _Entry:
+    __slots__ = ("url", "expires_at", "owners")
+
+    def __init__(self, url: str, expires_at: float):
+        self.url = url
+        self.expires_at = expires_at
+        # (user_id, interview_id) pairs that have already passed the DB ownership check
+        self.owners: set[tuple[str, str]] = set()
+
+
+class PresignedUrlCache:
+    """
+    LRU cache of presigned download URLs keyed by storage_key.
+    A URL is only handed out while it has at least min_remaining seconds
+    left, and the reported expires_in is the time it actually has left.
+    Interviews that have been looked up once are remembered per user, so
+    repeat plays skip both the interview lookup and the signing work.
+    Deleting an interview invalidates it in this process; other processes
+    keep its URL at most until it expires. max_entries of 0 disables caching.
+    """
+
+    def __init__(self, max_entries: int, ttl: int, min_remaining: int):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._min_remaining = min_remaining
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._owners: dict[tuple[str, str], str] = {}
+
+    def lookup(self, user_id: str, interview_id: str) -> tuple[str, int] | None:
+        """Return (url, expires_in) for an interview this user already opened, if still fresh."""
+        storage_key = self._owners.get((user_id, interview_id))
+        if storage_key is None:
+            return None
+        return self._fresh(storage_key)
+
+    async def get_or_sign(
+        self,
+        storage_key: str,
+        sign: Callable[[str, int], Awaitable[str]],
+        owner: tuple[str, str] | None = None,
+    ) -> tuple[str, int]:
+        """Return a cached URL for storage_key, signing a new one when missing or nearly expired."""
+        if self._max_entries <= 0:
+            return await sign(storage_key, self._ttl), self._ttl
+        cached = self._fresh(storage_key)
+        if cached is None:
+            url = await sign(storage_key, self._ttl)
+            self._store(storage_key, _Entry(url, time.monotonic() + self._ttl))
+            cached = (url, self._ttl)
+        if owner is not None:
+            self._entries[storage_key].owners.add(owner)
+            self._owners[owner] = storage_key
+        return cached
+
+    def invalidate_interview(self, user_id: str, interview_id: str) -> None:
+        """Forget an interview; the URL itself is dropped once nothing else references it."""
+        owner = (user_id, interview_id)
+        storage_key = self._owners.pop(owner, None)
+        if storage_key is None:
+            return
+        entry = self._entries.get(storage_key)
+        if entry is None:
+            return
+        entry.owners.discard(owner)
+        if not entry.owners:
+            del self._entries[storage_key]
+
+    def invalidate(self, storage_key: str) -> None:
+        entry = self._entries.pop(storage_key, None)
+        if entry is not None:
+            for owner in entry.owners:
+                self._owners.pop(owner, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._owners.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _fresh(self, storage_key: str) -> tuple[str, int] | None:
+        entry = self._entries.get(storage_key)
+        if entry is None:
+            return None
+        remaining = int(entry.expires_at - time.monotonic())
+        if remaining < self._min_remaining:
+            self.invalidate(storage_key)
+            return None
+        self._entries.move_to_end(storage_key)
+        return entry.url, remaining
+
+    def _store(self, storage_key: str, entry: _Entry) -> None:
+        previous = self._entries.pop(storage_key, None)
+        if previous is not None:
+            entry.owners = previous.owners
+        self._entries[storage_key] = entry
+        while len(self._entries) > self._max_entries:
+            oldest_key = next(iter(self._entries))
+            self.invalidate(oldest_key)
+
+
+# Per-process cache shared by every request on this worker
+presigned_url_cache = PresignedUrlCache(
+    max_entries=settings.AUDIO_URL_CACHE_SIZE,
+    ttl=settings.AUDIO_URL_TTL_SECONDS,
+    min_remaining=settings.AUDIO_URL_MIN_REMAINING_SECONDS,
+)
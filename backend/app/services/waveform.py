@@ -0,0 +1,84 @@
+"""
+Precomputed waveform peaks for the audio player.
+
+Peaks are computed once from the decoded 16 kHz PCM at several zoom levels
+(samples per peak). Each level is stored as int8 pairs — min, max, min,
+max, … — so an hour of audio at the finest level is ~450 KB. Documents are
+keyed by storage_key, so deduplicated interviews share one waveform.
+"""
+import numpy as np
+from bson import Binary
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+COLLECTION = "waveforms"
+_BLOCK_PEAKS = 16384  # peaks computed per pass over the (memory-mapped) samples
+
+
+def compute_peaks(samples: np.ndarray, levels: list[int]) -> list[tuple[int, bytes]]:
+    """
+    Min/max peaks of 16-bit samples for each zoom level in levels (ascending,
+    each a multiple of the previous). Returns [(samples_per_peak, int8 pairs)].
+    """
+    base = levels[0]
+    n_peaks = -(-len(samples) // base)
+    mins = np.empty(n_peaks, dtype=np.int16)
+    maxs = np.empty(n_peaks, dtype=np.int16)
+
+    full = len(samples) // base
+    for first in range(0, full, _BLOCK_PEAKS):
+        last = min(first + _BLOCK_PEAKS, full)
+        block = np.asarray(samples[first * base:last * base]).reshape(-1, base)
+        mins[first:last] = block.min(axis=1)
+        maxs[first:last] = block.max(axis=1)
+    if full < n_peaks:
+        rest = np.asarray(samples[full * base:])
+        mins[full], maxs[full] = rest.min(), rest.max()
+
+    result = [(base, _pack(mins, maxs))]
+    previous = base
+    for samples_per_peak in levels[1:]:
+        factor = samples_per_peak // previous
+        # Coarser levels fold the finer one — no second pass over the audio
+        pad = -len(mins) % factor
+        if pad:
+            mins = np.concatenate((mins, np.repeat(mins[-1:], pad)))
+            maxs = np.concatenate((maxs, np.repeat(maxs[-1:], pad)))
+        mins = mins.reshape(-1, factor).min(axis=1)
+        maxs = maxs.reshape(-1, factor).max(axis=1)
+        result.append((samples_per_peak, _pack(mins, maxs)))
+        previous = samples_per_peak
+    return result
+
+
+def _pack(mins: np.ndarray, maxs: np.ndarray) -> bytes:
+    # int16 >> 8 keeps the sign and lands exactly in int8 range
+    return np.column_stack((mins >> 8, maxs >> 8)).astype(np.int8).tobytes()
+
+
+async def save_waveform(
+    db: AsyncIOMotorDatabase,
+    storage_key: str,
+    sample_rate: int,
+    duration_ms: int,
+    levels: list[tuple[int, bytes]],
+) -> None:
+    await db[COLLECTION].replace_one(
+        {"_id": storage_key},
+        {
+            "sample_rate": sample_rate,
+            "duration_ms": duration_ms,
+            "levels": [
+                {"samples_per_peak": samples_per_peak, "data": Binary(data)}
+                for samples_per_peak, data in levels
+            ],
+        },
+        upsert=True,
+    )
+
+
+def pick_level(waveform: dict, resolution: int | None) -> dict:
+    """The stored level closest to resolution (samples per peak); the coarsest when unspecified."""
+    levels = waveform["levels"]
+    if resolution is None:
+        return levels[-1]
+    return min(levels, key=lambda level: abs(level["samples_per_peak"] - resolution))
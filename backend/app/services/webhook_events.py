@@ -0,0 +1,78 @@
+"""
+Inbound Deepgram callbacks, stored raw before any processing.
+
+The webhook only verifies the signature, records the body keyed by
+Deepgram's request_id and enqueues a job — parsing, persistence and
+notifications run on the job queue (pipeline.process_transcription_result).
+The _id doubles as the idempotency key, so a callback Deepgram retries is
+dropped on insert instead of being processed twice.
+
+A callback with word timings for a multi-hour recording can outgrow a BSON
+document (16 MB), so bodies over INLINE_PAYLOAD_BYTES are written to storage
+and the event keeps the key, size and sha256 instead. Storage GC leaves the
+object alone until the event itself has expired.
+"""
+import hashlib
+import re
+from datetime import datetime, timezone
+
+import orjson
+from bson import Binary
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+from app.services.storage import get_storage_backend
+
+COLLECTION = "webhook_events"
+
+# Well clear of the 16 MB document limit
+INLINE_PAYLOAD_BYTES = 8 * 1024 * 1024
+
+# Deepgram puts metadata (and its request_id) first — no need to parse a multi-MB transcript to find it
+_REQUEST_ID = re.compile(rb'"request_id"\s*:\s*"([^"]+)"')
+_SCAN_BYTES = 4096
+
+
+def extract_request_id(raw_body: bytes) -> str:
+    match = _REQUEST_ID.search(raw_body, 0, _SCAN_BYTES)
+    if match:
+        return match.group(1).decode()
+    try:
+        request_id = orjson.loads(raw_body).get("metadata", {}).get("request_id")
+    except (ValueError, AttributeError):
+        request_id = None
+    # Without one, identical bodies are still recognised as the same delivery
+    return request_id or f"sha256:{hashlib.sha256(raw_body).hexdigest()}"
+
+
+async def record_event(db: AsyncIOMotorDatabase, request_id: str, interview_id: str, raw_body: bytes) -> bool:
+    """Store a callback. Returns False if this request_id was already received."""
+    event = {
+        "_id":          request_id,
+        "interview_id": interview_id,
+        "received_at":  datetime.now(timezone.utc),
+        "processed_at": None,
+    }
+    if len(raw_body) > INLINE_PAYLOAD_BYTES:
+        event["payload_key"] = await get_storage_backend().upload(raw_body, "deepgram-callback.json", "application/json")
+        event["payload_size"] = len(raw_body)
+        event["payload_sha256"] = hashlib.sha256(raw_body).hexdigest()
+    else:
+        event["payload"] = Binary(raw_body)
+    try:
+        await db[COLLECTION].insert_one(event)
+    except DuplicateKeyError:
+        if "payload_key" in event:
+            await get_storage_backend().delete(event["payload_key"])
+        return False
+    return True
+
+
+async def load_payload(event: dict) -> bytes:
+    """The raw callback body of a stored event, wherever record_event put it."""
+    if "payload_key" not in event:
+        return event["payload"]
+    body = await get_storage_backend().read_range(event["payload_key"], 0, event["payload_size"])
+    if hashlib.sha256(body).hexdigest() != event["payload_sha256"]:
+        raise ValueError(f"Stored payload of webhook event {event['_id']} is incomplete or changed")
+    return body
@@ -0,0 +1,94 @@
+"""
+Standalone pipeline worker: python -m app.worker
+
+Drains the Mongo job queue (see app/services/jobs.py) — audio
+preprocessing, Deepgram submissions and AI analysis — with per-stage
+concurrency (JOB_PREPROCESS_CONCURRENCY, JOB_TRANSCRIBE_CONCURRENCY,
+JOB_ANALYSE_CONCURRENCY), and runs the periodic maintenance: upload session
+and storage GC and the stuck-interview sweep. Run it next to the
+API with JOBS_RUN_IN_API=false so request latency never depends on how much
+pipeline work is in flight, and scale the two independently.
+
+Its metrics are published to Mongo every METRICS_PUBLISH_INTERVAL_SECONDS
+and listed under "processes" on the API's /api/v1/health/metrics.
+
+SIGTERM/SIGINT stop leasing new jobs and give running ones
+JOB_SHUTDOWN_GRACE_SECONDS to finish; anything still running after that is
+handed back to the queue for another worker.
+"""
+import asyncio
+import logging
+import signal
+from functools import partial
+
+from app.core.config import settings
+from app.core.database import connect_db, disconnect_db
+from app.core.periodic import start_periodic, stop_periodic
+from app.services.jobs import JobWorker
+from app.services.metrics_snapshots import publish_metrics
+from app.services.pipeline import HANDLERS, mark_job_failed, worker_concurrency
+from app.services.preprocessing import close_preprocessing, init_preprocessing
+from app.services.storage import close_storage_backend, init_storage_backend
+from app.services.storage_gc import reap_orphaned_objects
+from app.services.sweeper import sweep_stuck_interviews
+from app.services.transcription import close_transcription_service, init_transcription_service
+from app.services.upload_sessions import purge_expired_upload_sessions
+
+logger = logging.getLogger(__name__)
+
+
+def start_maintenance() -> None:
+    """Start the periodic maintenance tasks; stop them with stop_periodic()."""
+    start_periodic(
+        "upload-session-gc",
+        settings.UPLOAD_SESSION_GC_INTERVAL_SECONDS,
+        purge_expired_upload_sessions,
+    )
+    start_periodic(
+        "storage-gc",
+        settings.STORAGE_GC_INTERVAL_SECONDS,
+        reap_orphaned_objects,
+    )
+    start_periodic(
+        "stuck-interview-sweep",
+        settings.STUCK_SWEEP_INTERVAL_SECONDS,
+        sweep_stuck_interviews,
+    )
+
+
+async def main() -> None:
+    await connect_db()
+    init_storage_backend()
+    init_transcription_service()
+    init_preprocessing()
+    start_maintenance()
+    # The API can't read this process's metrics registry — it reads what is published
+    start_periodic("metrics-publish", settings.METRICS_PUBLISH_INTERVAL_SECONDS, partial(publish_metrics, "worker"))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker = JobWorker(HANDLERS, worker_concurrency(), on_dead=mark_job_failed)
+    worker.start()
+    logger.info("Worker started — concurrency %s", worker_concurrency())
+    try:
+        await stop.wait()
+        logger.info("Shutting down — waiting up to %ss for running jobs", settings.JOB_SHUTDOWN_GRACE_SECONDS)
+        await worker.stop(settings.JOB_SHUTDOWN_GRACE_SECONDS)
+    finally:
+        await stop_periodic()
+        close_preprocessing()
+        await close_transcription_service()
+        close_storage_backend()
+        await disconnect_db()
+        logger.info("Worker stopped.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+    )
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark stored transcript size and text reconstruction.
+
+Parses a synthetic 2-hour Deepgram callback (see bench_webhook_parse.py)
+and compares three stored layouts by BSON size and by how long it takes to
+decode the BSON and get back the full text, the utterances, the export body
+(_format_utterances) and everything:
+  embedded     text + a subdocument per word + utterances with their text
+  columnar-v1  text + columnar words + utterances with their text
+  compact      columnar words only; text and utterance text derived
+
+    cd backend && python scripts/bench_transcript_storage.py [--runs 5] [--hours 2]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import bson
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.api.v1.interviews import _format_utterances  # noqa: E402
+from app.models.interview import encode_words  # noqa: E402
+from app.services.transcription import DeepgramService  # noqa: E402
+from app.services.transcripts import compact_transcript, expand_transcript  # noqa: E402
+from bench_webhook_parse import synthetic_payload  # noqa: E402
+
+
+def layouts(transcript: dict) -> dict[str, bytes]:
+    # One set of columns for all the words, the text joined with \x1f
+    encoded = encode_words(transcript["words"], block_size=max(len(transcript["words"]), 1))
+    v1_words = {**encoded["blocks"][0], "count": encoded["count"], "speakers": encoded["speakers"], "format": "columnar-v1"}
+    v1_words["text"] = "\x1f".join(w["text"] for w in transcript["words"])
+    return {
+        "embedded":    bson.encode(transcript),
+        "columnar-v1": bson.encode({**transcript, "words": v1_words}),
+        "compact":     bson.encode(compact_transcript(transcript)),
+    }
+
+
+def best_ms(fn, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--hours", type=float, default=2)
+    args = parser.parse_args()
+
+    service = DeepgramService()
+    parsed = asyncio.run(service.parse_webhook(synthetic_payload(args.hours)))
+    transcript = parsed["transcript"]
+    print(f"{args.hours:g}h synthetic interview: {len(transcript['words'])} words, {len(transcript['utterances'])} utterances\n")
+
+    reads = {
+        "text":       lambda raw: expand_transcript(bson.decode(raw), ["text"])["text"],
+        "utterances": lambda raw: expand_transcript(bson.decode(raw), ["utterances"])["utterances"],
+        "export":     lambda raw: _format_utterances(**_export_args(expand_transcript(bson.decode(raw), ["text", "utterances"]))),
+        "all":        lambda raw: expand_transcript(bson.decode(raw)),
+    }
+    print(f"{'layout':<13}{'size KB':>9}" + "".join(f"{name + ' ms':>15}" for name in reads))
+    for name, raw in layouts(transcript).items():
+        timings = "".join(f"{best_ms(lambda: read(raw), args.runs):>15.1f}" for read in reads.values())
+        print(f"{name:<13}{len(raw) / 1024:>9.0f}{timings}")
+
+
+def _export_args(transcript: dict) -> dict:
+    return {"utterances": transcript["utterances"], "transcript_text": transcript["text"]}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark parsing of Deepgram webhook bodies.
+
+Builds synthetic 1-hour and 3-hour callbacks (two speakers, ~170 words a
+minute, utterances every ~12 words) and times decode + parse_webhook,
+reporting the best of --runs and the tracemalloc peak of one run.
+The stdlib json decode is measured alongside orjson for comparison.
+
+    cd backend && python scripts/bench_webhook_parse.py [--runs 5] [--hours 1 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import orjson
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.transcription import DeepgramService  # noqa: E402
+
+WORDS_PER_MINUTE = 170
+WORDS_PER_UTTERANCE = 12
+VOCABULARY = ["so", "I", "think", "the", "team", "shipped", "that", "project", "in", "about", "three", "months",
+              "and", "we", "learned", "a", "lot", "from", "our", "customers", "which", "was", "really", "useful"]
+
+
+def synthetic_payload(hours: float, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    n_words = int(hours * 60 * WORDS_PER_MINUTE)
+    step = 60.0 / WORDS_PER_MINUTE
+    words, utterances = [], []
+    t = 0.0
+    for i in range(0, n_words, WORDS_PER_UTTERANCE):
+        speaker = (i // WORDS_PER_UTTERANCE) % 2
+        chunk = []
+        for _ in range(min(WORDS_PER_UTTERANCE, n_words - i)):
+            word = rng.choice(VOCABULARY)
+            chunk.append({
+                "word":            word.lower(),
+                "punctuated_word": word,
+                "start":           round(t, 3),
+                "end":             round(t + step * 0.8, 3),
+                "confidence":      round(rng.uniform(0.7, 1.0), 4),
+                "speaker":         speaker,
+            })
+            t += step
+        words.extend(chunk)
+        utterances.append({
+            "speaker":    speaker,
+            "transcript": " ".join(w["punctuated_word"] for w in chunk),
+            "start":      chunk[0]["start"],
+            "end":        chunk[-1]["end"],
+            "confidence": 0.95,
+        })
+    payload = {
+        "metadata": {"request_id": f"bench-{hours}h", "duration": round(t, 3)},
+        "results": {
+            "channels":   [{"alternatives": [{
+                "transcript": " ".join(w["punctuated_word"] for w in words),
+                "confidence": 0.95,
+                "words":      words,
+            }]}],
+            "utterances": utterances,
+        },
+    }
+    return orjson.dumps(payload)
+
+
+def measure(fn, runs: int) -> tuple[float, float]:
+    """Best wall time in seconds over runs, and peak traced memory in MB of one run."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 3])
+    args = parser.parse_args()
+
+    service = DeepgramService()
+    loop = asyncio.new_event_loop()
+    try:
+        print(f"{'payload':<10}{'words':>8}{'size MB':>9}  {'step':<26}{'best ms':>9}{'peak MB':>9}")
+        for hours in args.hours:
+            body = synthetic_payload(hours)
+            n_words = int(hours * 60 * WORDS_PER_MINUTE)
+            decoded = orjson.loads(body)
+            steps = {
+                "decode (json)":            lambda: json.loads(body),
+                "decode (orjson)":          lambda: orjson.loads(body),
+                "parse_webhook (dict)":     lambda: loop.run_until_complete(service.parse_webhook(decoded)),
+                "parse_webhook (raw body)": lambda: loop.run_until_complete(service.parse_webhook(body)),
+            }
+            for name, fn in steps.items():
+                best, peak = measure(fn, args.runs)
+                print(f"{f'{hours:g}h':<10}{n_words:>8}{len(body) / 1e6:>9.1f}  {name:<26}{best * 1000:>9.1f}{peak:>9.1f}")
+    finally:
+        loop.run_until_complete(service.close())
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
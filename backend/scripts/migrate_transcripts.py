@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Move transcripts embedded in interview documents into the transcripts
+collection (see app/services/transcripts.py), rewrite ones stored there in
+an older layout into the current one, and create the collection's indexes.
+
+Run once after deploying. Safe to re-run: each interview's transcript is
+upserted before it is removed from the interview.
+
+    cd backend && python scripts/migrate_transcripts.py [--batch-size 100]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import TEXT, UpdateOne
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings  # noqa: E402
+from app.models.interview import WORDS_FORMAT  # noqa: E402
+from app.services.transcripts import COLLECTION, load_transcript, save_transcript  # noqa: E402
+
+EMBEDDED = {"transcript": {"$type": "object"}}
+
+
+async def migrate(db: AsyncIOMotorDatabase, batch_size: int = 100) -> int:
+    """Returns the number of transcripts moved."""
+    fulltext = [("word_blocks.text", TEXT), ("text", TEXT)]
+    existing = (await db[COLLECTION].index_information()).get("transcripts_fulltext")
+    # Mongo reports a text index's fields as weights
+    if existing and set(existing.get("weights") or dict(existing["key"])) != {"word_blocks.text", "text"}:
+        # A collection can only have one text index
+        await db[COLLECTION].drop_index("transcripts_fulltext")
+    await db[COLLECTION].create_index(fulltext, name="transcripts_fulltext")
+    await db[COLLECTION].create_index("user_id")
+
+    outdated = {"$or": [{"words.format": {"$ne": WORDS_FORMAT}}, {"utterance_start_ms": {"$exists": False}}]}
+    async for doc in db[COLLECTION].find(outdated, {"user_id": 1}):
+        transcript = await load_transcript(db, doc["_id"])
+        await save_transcript(db, doc["_id"], doc.get("user_id"), transcript)
+
+    moved = 0
+    ops: list[UpdateOne] = []
+    async for doc in db["interviews"].find(EMBEDDED, {"transcript": 1, "user_id": 1}):
+        summary = await save_transcript(db, doc["_id"], doc.get("user_id"), doc["transcript"])
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"transcript_summary": summary}, "$unset": {"transcript": ""}}))
+        if len(ops) >= batch_size:
+            moved += (await db["interviews"].bulk_write(ops, ordered=False)).modified_count
+            ops = []
+    if ops:
+        moved += (await db["interviews"].bulk_write(ops, ordered=False)).modified_count
+
+    # Never transcribed
+    await db["interviews"].update_many(
+        {"transcript": {"$exists": True, "$eq": None}},
+        {"$set": {"transcript_summary": None}, "$unset": {"transcript": ""}},
+    )
+    return moved
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    if not settings.MONGODB_URL:
+        print(" MONGODB_URL not set in .env")
+        return
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        moved = await migrate(client[settings.MONGODB_DB_NAME], args.batch_size)
+        print(f"\n Done — {moved} transcripts moved to the {COLLECTION} collection.")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,14 +5,63 @@ db = db.getSiblingDB("hr_interviews");
 
 db.createCollection("interviews");
 db.interviews.createIndex({ user_id: 1, created_at: -1 });
-db.interviews.createIndex({ status: 1 });
+db.interviews.createIndex({ status: 1, updated_at: 1 });
 db.interviews.createIndex({ deepgram_job_id: 1 }, { sparse: true });
+// Only string hashes: uploads that weren't hashed store content_hash: null
+db.interviews.createIndex(
+  { content_hash: 1 },
+  { partialFilterExpression: { content_hash: { $type: "string" } } },
+);
+db.interviews.createIndex({ storage_key: 1 });
+db.interviews.createIndex({ audio_storage_key: 1 }, { sparse: true });
+db.interviews.createIndex({ "audio_segments.storage_key": 1 }, { sparse: true });
 db.interviews.createIndex({ "ai_analysis.keywords.term": 1 }, { sparse: true });
 db.interviews.createIndex({ tags: 1 }, { sparse: true });
 db.interviews.createIndex(
-  { "transcript.text": "text", title: "text", original_name: "text" },
-  { name: "interviews_fulltext", weights: { title: 10, "transcript.text": 5 } },
+  { title: "text", original_name: "text" },
+  { name: "interviews_fulltext", weights: { title: 10 } },
+);
+
+db.createCollection("transcripts");
+// _id is the interview's _id. word_blocks.text is the transcript text; text is
+// only stored when the words can't reproduce it
+db.transcripts.createIndex(
+  { "word_blocks.text": "text", text: "text" },
+  { name: "transcripts_fulltext" },
 );
+db.transcripts.createIndex({ user_id: 1 });
+
+db.createCollection("transcript_segments");
+// Results of chunked transcription segments until they are stitched; _id is "<interview _id>:<index>".
+// Ones left behind by a deleted interview expire
+db.transcript_segments.createIndex({ interview_id: 1 });
+db.transcript_segments.createIndex({ received_at: 1 }, { expireAfterSeconds: 7 * 24 * 3600 });
+
+db.createCollection("waveforms");
+
+db.createCollection("storage_holds");
+// _id is an interview about to reuse storage_key; stale holds expire
+db.storage_holds.createIndex({ storage_key: 1 });
+db.storage_holds.createIndex({ held_at: 1 }, { expireAfterSeconds: 3600 });
+
+db.createCollection("metrics_snapshots");
+// _id is "<host>:<pid>"; snapshots of processes that stopped expire
+db.metrics_snapshots.createIndex({ updated_at: 1 }, { expireAfterSeconds: 24 * 3600 });
+
+db.createCollection("webhook_events");
+// _id is Deepgram's request_id; raw payloads are kept a week for debugging
+db.webhook_events.createIndex({ received_at: 1 }, { expireAfterSeconds: 7 * 24 * 3600 });
+// Bodies too large for the document are in storage under payload_key (storage GC looks them up)
+db.webhook_events.createIndex({ payload_key: 1 }, { sparse: true });
+
+db.createCollection("jobs");
+db.jobs.createIndex({ kind: 1, status: 1, run_at: 1 });
+db.jobs.createIndex({ active_key: 1 }, { unique: true, sparse: true });
+
+db.createCollection("upload_sessions");
+db.upload_sessions.createIndex({ user_id: 1 });
+db.upload_sessions.createIndex({ expires_at: 1 });
+db.upload_sessions.createIndex({ storage_key: 1 });
 
 db.createCollection("interview_templates");
 db.interview_templates.createIndex({ user_id: 1 });
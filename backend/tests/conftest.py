@@ -14,6 +14,13 @@ def override_settings(monkeypatch):
     monkeypatch.setattr(settings, "AUTH_SECRET", "test-secret")
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Rate limit counters are in-memory and would otherwise leak between tests."""
+    from app.core.limiter import limiter
+    limiter.reset()
+
+
 # Mock database 
 
 @pytest.fixture(autouse=True)
@@ -35,6 +42,11 @@ def mock_db(monkeypatch):
     mock_collection.insert_one = AsyncMock(
         return_value=MagicMock(inserted_id="mock-inserted-id")
     )
+    mock_collection.insert_many = AsyncMock(
+        side_effect=lambda docs, **kwargs: MagicMock(
+            inserted_ids=[f"mock-inserted-id-{i}" for i in range(len(docs))]
+        )
+    )
     mock_collection.find_one = AsyncMock(return_value=None)
     mock_collection.find = MagicMock(return_value=make_cursor())
     mock_collection.aggregate = MagicMock(return_value=make_cursor())
@@ -44,6 +56,7 @@ def mock_db(monkeypatch):
     mock_collection.delete_one = AsyncMock(
         return_value=MagicMock(deleted_count=1)
     )
+    mock_collection.find_one_and_delete = AsyncMock(return_value=None)
     mock_collection.count_documents = AsyncMock(return_value=0)
 
     mock_database = MagicMock()
@@ -54,6 +67,19 @@ def mock_db(monkeypatch):
     return mock_database
 
 
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """
+    In-memory MongoDB (mongomock) for tests that need real query semantics —
+    multi-request flows, atomic updates, sorting. Overrides mock_db.
+    """
+    from mongomock_motor import AsyncMongoMockClient
+
+    database = AsyncMongoMockClient()["test_db"]
+    monkeypatch.setattr("app.core.database._db", database)
+    return database
+
+
 # HTTP client 
 
 @pytest.fixture
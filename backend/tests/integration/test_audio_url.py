@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from bson import ObjectId
+
+from app.services.url_cache import presigned_url_cache
+
+MOCK_ID = str(ObjectId())
+
+
+@pytest.fixture(autouse=True)
+def empty_url_cache():
+    presigned_url_cache.clear()
+    yield
+    presigned_url_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_audio_url_repeat_request_skips_signing(client, auth_headers, mock_db):
+    mock_db["interviews"].find_one = AsyncMock(
+        return_value={"_id": ObjectId(MOCK_ID), "storage_key": "interviews/a.mp3", "file_type": "audio/mpeg"}
+    )
+
+    with patch("app.api.v1.interviews.get_storage_backend") as mock_storage:
+        storage_instance = AsyncMock()
+        storage_instance.presigned_url.return_value = "https://signed/interviews/a.mp3"
+        mock_storage.return_value = storage_instance
+
+        first = await client.get(f"/api/v1/interviews/{MOCK_ID}/audio-url", headers=auth_headers)
+        second = await client.get(f"/api/v1/interviews/{MOCK_ID}/audio-url", headers=auth_headers)
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert second.json()["data"]["url"] == "https://signed/interviews/a.mp3"
+    assert second.json()["data"]["expires_in"] <= first.json()["data"]["expires_in"]
+    mock_db["interviews"].find_one.assert_awaited_once()
+    storage_instance.presigned_url.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cached_audio_url_is_only_served_to_its_owner(client, auth_headers, make_token, mock_db):
+    mock_db["interviews"].find_one = AsyncMock(
+        return_value={"_id": ObjectId(MOCK_ID), "storage_key": "interviews/a.mp3", "file_type": "audio/mpeg"}
+    )
+
+    with patch("app.api.v1.interviews.get_storage_backend") as mock_storage:
+        storage_instance = AsyncMock()
+        storage_instance.presigned_url.return_value = "https://signed/interviews/a.mp3"
+        mock_storage.return_value = storage_instance
+
+        await client.get(f"/api/v1/interviews/{MOCK_ID}/audio-url", headers=auth_headers)
+        mock_db["interviews"].find_one = AsyncMock(return_value=None)
+        response = await client.get(
+            f"/api/v1/interviews/{MOCK_ID}/audio-url",
+            headers={"Authorization": f"Bearer {make_token(user_id='other-user-id')}"},
+        )
+
+    assert response.status_code == 404
+    assert mock_db["interviews"].find_one.await_args.args[0] == {"_id": ObjectId(MOCK_ID), "user_id": "other-user-id"}
+
+
+@pytest.mark.asyncio
+async def test_delete_invalidates_cached_audio_url(client, auth_headers, mock_db):
+    mock_db["interviews"].find_one = AsyncMock(
+        return_value={"_id": ObjectId(MOCK_ID), "storage_key": "interviews/a.mp3", "file_type": "audio/mpeg"}
+    )
+
+    with patch("app.api.v1.interviews.get_storage_backend") as mock_storage:
+        storage_instance = AsyncMock()
+        storage_instance.presigned_url.return_value = "https://signed/interviews/a.mp3"
+        mock_storage.return_value = storage_instance
+
+        await client.get(f"/api/v1/interviews/{MOCK_ID}/audio-url", headers=auth_headers)
+        mock_db["interviews"].find_one_and_delete = AsyncMock(
+            return_value={"_id": ObjectId(MOCK_ID), "storage_key": "interviews/a.mp3"}
+        )
+        response = await client.delete(f"/api/v1/interviews/{MOCK_ID}", headers=auth_headers)
+
+    assert response.status_code == 204
+    assert presigned_url_cache.lookup("test-user-id", MOCK_ID) is None
@@ -1,6 +1,8 @@
 import pytest
 from jose import jwt
 
+from app.core.config import settings
+
 
 # Health check is public
 
@@ -42,6 +44,20 @@ async def test_metrics_requires_auth(client):
     assert response.status_code == 401
 
 
+@pytest.mark.asyncio
+async def test_health_metrics_take_the_metrics_token_only(client, auth_headers, monkeypatch):
+    disabled = await client.get("/api/v1/health/metrics", headers=auth_headers)
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-me")
+    anonymous = await client.get("/api/v1/health/metrics")
+    user = await client.get("/api/v1/health/metrics", headers=auth_headers)
+    scraper = await client.get("/api/v1/health/metrics", headers={"Authorization": "Bearer scrape-me"})
+
+    assert disabled.status_code == 404
+    assert anonymous.status_code == 401 and user.status_code == 401
+    assert scraper.status_code == 200
+    assert set(scraper.json()) == {"timings", "gauges", "counters", "processes"}
+
+
 # Valid token grants access
 
 @pytest.mark.asyncio
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from io import BytesIO
+from unittest.mock import patch
+
+
+def make_batch(count: int, content_type: str = "audio/mpeg") -> list:
+    return [
+        ("files", (f"interview-{i}.mp3", BytesIO(b"ID3" + b"\x00" * 1024), content_type))
+        for i in range(count)
+    ]
+
+
+class SlowStorage:
+    """Records how many uploads run at once; optionally fails one filename."""
+
+    def __init__(self, fail_on: str | None = None):
+        self.fail_on = fail_on
+        self.active = 0
+        self.peak = 0
+
+    async def upload_stream(self, chunks, filename, content_type):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            async for _ in chunks:
+                pass
+            await asyncio.sleep(0.05)
+            if filename == self.fail_on:
+                raise RuntimeError("storage down")
+            return f"interviews/{filename}"
+        finally:
+            self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_batch_upload_runs_files_concurrently_with_limit(client, auth_headers, mock_db, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "BATCH_UPLOAD_CONCURRENCY", 3)
+    storage = SlowStorage()
+
+    with patch("app.api.v1.interviews.get_storage_backend", return_value=storage):
+        response = await client.post(
+            "/api/v1/interviews/batch-upload",
+            files=make_batch(6),
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 201
+    body = response.json()["data"]
+    assert body["total_created"] == 6
+    assert storage.peak == 3
+    mock_db["interviews"].insert_many.assert_awaited_once()
+    assert len(mock_db["interviews"].insert_many.call_args[0][0]) == 6
+
+
+@pytest.mark.asyncio
+async def test_batch_upload_isolates_failures(client, auth_headers, mock_db):
+    storage = SlowStorage(fail_on="interview-1.mp3")
+
+    with patch("app.api.v1.interviews.get_storage_backend", return_value=storage):
+        response = await client.post(
+            "/api/v1/interviews/batch-upload",
+            files=make_batch(3),
+            headers=auth_headers,
+        )
+
+    body = response.json()["data"]
+    assert body["total_created"] == 2
+    assert body["failed"] == [{"filename": "interview-1.mp3", "error": "Storage upload failed."}]
+    assert [c["filename"] for c in body["created"]] == ["interview-0.mp3", "interview-2.mp3"]
+
+
+@pytest.mark.asyncio
+async def test_batch_upload_keeps_the_documents_a_partial_insert_saved(client, auth_headers, mock_db):
+    from unittest.mock import AsyncMock
+    from bson import ObjectId
+    from pymongo.errors import BulkWriteError
+
+    def insert_many(documents, ordered):
+        for document in documents:
+            document["_id"] = ObjectId()
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}]})
+
+    mock_db["interviews"].insert_many = AsyncMock(side_effect=insert_many)
+
+    with patch("app.api.v1.interviews.get_storage_backend", return_value=SlowStorage()), \
+         patch("app.api.v1.interviews.release_storage_object", new=AsyncMock()) as release:
+        response = await client.post(
+            "/api/v1/interviews/batch-upload",
+            files=make_batch(3),
+            headers=auth_headers,
+        )
+
+    body = response.json()["data"]
+    assert [c["filename"] for c in body["created"]] == ["interview-0.mp3", "interview-2.mp3"]
+    assert body["failed"] == [{"filename": "interview-1.mp3", "error": "Failed to save interview."}]
+    release.assert_awaited_once()
+    assert release.await_args.args[2] == "interviews/interview-1.mp3"
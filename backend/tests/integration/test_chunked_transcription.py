@@ -0,0 +1,166 @@
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.services import chunking
+from app.services.chunking import COLLECTION as SEGMENTS
+from app.services.jobs import COLLECTION as JOBS, Deferred
+from app.services.pipeline import process_transcription_result, submit_transcription
+from app.services.transcription import DeepgramService, MockTranscriptionService
+from app.services.transcripts import COLLECTION as TRANSCRIPTS, load_transcript
+from app.services.webhook_events import COLLECTION as EVENTS
+
+INTERVIEW_ID = str(ObjectId())
+
+# Two segments split at 10s, each reaching 2s into the other
+AUDIO_SEGMENTS = [
+    {"storage_key": "interviews/panel-0.ogg", "offset_map": None,                         "start_ms": 0,      "end_ms": 10_000},
+    {"storage_key": "interviews/panel-1.ogg", "offset_map": [[0, 8000], [12_000, 20_000]], "start_ms": 10_000, "end_ms": 20_000},
+]
+
+
+def segment_body(request_id: str, words: list[tuple[str, float, int]]) -> bytes:
+    """A Deepgram callback for one segment: (word, start in the segment, Deepgram's speaker number)."""
+    dg_words = [
+        {"word": text, "punctuated_word": text, "start": start, "end": start + 0.5, "confidence": 0.9, "speaker": speaker}
+        for text, start, speaker in words
+    ]
+    utterances = [
+        {"speaker": speaker, "transcript": text, "start": start, "end": start + 0.5}
+        for text, start, speaker in words
+    ]
+    return json.dumps({
+        "metadata": {"request_id": request_id, "duration": 12.0},
+        "results":  {
+            "channels":   [{"alternatives": [{"transcript": "", "confidence": 0.9, "words": dg_words}]}],
+            "utterances": utterances,
+        },
+    }).encode()
+
+
+# "there" and "yes" fall in the overlap; the second segment numbers the speakers the other way round
+# Request ids are the job ids MockTranscriptionService hands out for each segment
+FIRST = segment_body(f"mock-job-{INTERVIEW_ID}-0", [("Hello", 1.0, 0), ("there.", 9.0, 0), ("Yes", 11.0, 1)])
+SECOND = segment_body(f"mock-job-{INTERVIEW_ID}-1", [("there.", 1.0, 1), ("Yes", 3.0, 0), ("great.", 7.0, 0)])
+
+
+@pytest.fixture(autouse=True)
+def no_webhook_secret(monkeypatch):
+    monkeypatch.setattr(settings, "DEEPGRAM_WEBHOOK_SECRET", "")
+
+
+@pytest.fixture
+async def deepgram():
+    service = DeepgramService()
+    with patch("app.services.pipeline.get_transcription_service", return_value=service):
+        yield service
+    await service.close()
+
+
+async def submit() -> None:
+    with patch("app.services.pipeline.get_transcription_service", return_value=MockTranscriptionService()):
+        await submit_transcription({"interview_id": INTERVIEW_ID})
+
+
+async def deliver(client, db, segment: int, body: bytes) -> None:
+    response = await client.post(
+        f"/api/v1/webhooks/deepgram?interview_id={INTERVIEW_ID}&segment={segment}",
+        content=body,
+        headers={"content-type": "application/json"},
+    )
+    assert response.status_code == 200
+    job = await db[JOBS].find_one({"kind": "webhook", "payload.segment": segment})
+    await process_transcription_result(job["payload"])
+
+
+@pytest.mark.asyncio
+async def test_segments_are_submitted_together_and_stitched_when_all_are_in(client, mongo_db, deepgram):
+    oid = ObjectId(INTERVIEW_ID)
+    await mongo_db["interviews"].insert_one({
+        "_id": oid, "user_id": "test-user-id", "status": "queued", "storage_key": "interviews/panel.mp4",
+        "audio_storage_key": "interviews/panel.ogg", "audio_segments": AUDIO_SEGMENTS,
+    })
+
+    await submit()
+    doc = await mongo_db["interviews"].find_one({"_id": oid})
+    assert doc["status"] == "transcribing"
+    assert doc["deepgram_job_id"] == f"mock-job-{INTERVIEW_ID}-0,mock-job-{INTERVIEW_ID}-1"
+
+    await deliver(client, mongo_db, 1, SECOND)
+    assert (await mongo_db["interviews"].find_one({"_id": oid}))["status"] == "transcribing"
+    assert await mongo_db[SEGMENTS].count_documents({}) == 1
+
+    # A resubmission only sends the segment still missing
+    await mongo_db["interviews"].update_one({"_id": oid}, {"$set": {"status": "queued"}})
+    await submit()
+    assert (await mongo_db["interviews"].find_one({"_id": oid}))["deepgram_job_id"] == f"mock-job-{INTERVIEW_ID}-0"
+
+    await deliver(client, mongo_db, 0, FIRST)
+
+    doc = await mongo_db["interviews"].find_one({"_id": oid})
+    assert doc["status"] == "analysing"
+    assert doc["transcript_summary"]["word_count"] == 4
+    assert doc["duration_seconds"] == 20.0
+    transcript = await load_transcript(mongo_db, oid)
+    assert [(w["text"], w["start_ms"], w["speaker"]) for w in transcript["words"]] == [
+        ("Hello", 1000, "A"), ("there.", 9000, "A"), ("Yes", 11_000, "B"), ("great.", 15_000, "B"),
+    ]
+    assert transcript["text"] == "Hello there. Yes great."
+    assert await mongo_db[SEGMENTS].count_documents({}) == 0
+    assert await mongo_db[JOBS].count_documents({"kind": "analyse"}) == 1
+
+
+@pytest.mark.asyncio
+async def test_only_one_job_stitches_the_last_segments(client, mongo_db, deepgram):
+    oid = ObjectId(INTERVIEW_ID)
+    await mongo_db["interviews"].insert_one({
+        "_id": oid, "user_id": "test-user-id", "status": "transcribing", "audio_segments": AUDIO_SEGMENTS,
+        "deepgram_job_id": f"mock-job-{INTERVIEW_ID}-0,mock-job-{INTERVIEW_ID}-1",
+    })
+    await deliver(client, mongo_db, 1, SECOND)
+    # The job for the other last result claimed the stitch a moment ago
+    await mongo_db["interviews"].update_one({"_id": oid}, {"$set": {"stitching_at": datetime.now(timezone.utc)}})
+
+    with pytest.raises(Deferred):
+        await deliver(client, mongo_db, 0, FIRST)
+    assert (await mongo_db["interviews"].find_one({"_id": oid}))["status"] == "transcribing"
+    assert await mongo_db[JOBS].count_documents({"kind": "analyse"}) == 0
+
+    # That job died; once its claim lapses this one stitches
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+    await mongo_db["interviews"].update_one({"_id": oid}, {"$set": {"stitching_at": stale}})
+    job = await mongo_db[JOBS].find_one({"kind": "webhook", "payload.segment": 0})
+    await process_transcription_result(job["payload"])
+
+    doc = await mongo_db["interviews"].find_one({"_id": oid})
+    assert doc["status"] == "analysing"
+    assert "stitching_at" not in doc
+    assert await mongo_db[JOBS].count_documents({"kind": "analyse"}) == 1
+
+
+@pytest.mark.asyncio
+async def test_results_cleared_after_the_claim_are_not_stitched(client, mongo_db, deepgram):
+    oid = ObjectId(INTERVIEW_ID)
+    await mongo_db["interviews"].insert_one({
+        "_id": oid, "user_id": "test-user-id", "status": "transcribing", "audio_segments": AUDIO_SEGMENTS,
+        "deepgram_job_id": f"mock-job-{INTERVIEW_ID}-0,mock-job-{INTERVIEW_ID}-1",
+    })
+    await deliver(client, mongo_db, 1, SECOND)
+
+    async def cleared_by_a_retranscribe(db, interview_id, segments):
+        await chunking.clear_segment_results(db, interview_id)
+        return await chunking.collect_segments(db, interview_id, segments)
+
+    with patch("app.services.pipeline.collect_segments", cleared_by_a_retranscribe):
+        await deliver(client, mongo_db, 0, FIRST)
+
+    doc = await mongo_db["interviews"].find_one({"_id": oid})
+    assert doc["status"] == "transcribing"
+    assert "stitching_at" not in doc
+    assert await mongo_db[TRANSCRIPTS].count_documents({}) == 0
+    assert (await mongo_db[EVENTS].find_one({"_id": f"mock-job-{INTERVIEW_ID}-0"}))["processed_at"] is not None
+    assert await mongo_db[JOBS].count_documents({"kind": "analyse"}) == 0
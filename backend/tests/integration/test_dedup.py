@@ -0,0 +1,115 @@
+import hashlib
+import pytest
+from bson import ObjectId
+from io import BytesIO
+from unittest.mock import AsyncMock, patch
+
+from app.services.transcripts import load_transcript, save_transcript
+
+AUDIO = b"ID3" + b"\x00" * 2048
+
+
+class KeyedStorage:
+    """Issues a new key per upload and records deletes."""
+
+    def __init__(self):
+        self.uploads = 0
+        self.delete = AsyncMock()
+
+    async def upload_stream(self, chunks, filename, content_type):
+        async for _ in chunks:
+            pass
+        self.uploads += 1
+        return f"interviews/upload-{self.uploads}.mp3"
+
+
+@pytest.fixture
+def storage():
+    backend = KeyedStorage()
+    with patch("app.api.v1.interviews.get_storage_backend", return_value=backend):
+        yield backend
+
+
+async def upload(client, headers, data=AUDIO):
+    response = await client.post(
+        "/api/v1/interviews/upload",
+        files={"file": ("interview.mp3", BytesIO(data), "audio/mpeg")},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    return response.json()["data"]
+
+
+@pytest.mark.asyncio
+async def test_upload_records_content_hash(client, auth_headers, mongo_db, storage):
+    doc = await upload(client, auth_headers)
+    assert doc["content_hash"] == hashlib.sha256(AUDIO).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_duplicate_upload_reuses_storage_object(client, auth_headers, mongo_db, storage):
+    first = await upload(client, auth_headers)
+    second = await upload(client, auth_headers)
+
+    assert second["storage_key"] == first["storage_key"]
+    storage.delete.assert_awaited_once_with("interviews/upload-2.mp3")
+
+    different = await upload(client, auth_headers, data=AUDIO[:10] + b"\x01" * 2048)
+    assert different["storage_key"] == "interviews/upload-3.mp3"
+
+
+@pytest.mark.asyncio
+async def test_duplicate_upload_copies_transcript_and_skips_deepgram(client, auth_headers, mongo_db, storage):
+    first = await upload(client, auth_headers)
+    summary = await save_transcript(
+        mongo_db, ObjectId(first["_id"]), "test-user-id", {"text": "Hello there", "words": [], "utterances": []},
+    )
+    await mongo_db["interviews"].update_one(
+        {"_id": ObjectId(first["_id"])},
+        {"$set": {"transcript_summary": summary, "duration_seconds": 12.5}},
+    )
+
+    second = await upload(client, auth_headers)
+    assert second["transcript_summary"] == summary
+    # A copy of its own, so deleting the first interview doesn't take it away
+    await client.delete(f"/api/v1/interviews/{first['_id']}", headers=auth_headers)
+    assert (await load_transcript(mongo_db, ObjectId(second["_id"])))["text"] == "Hello there"
+
+    response = await client.post(f"/api/v1/interviews/{second['_id']}/transcribe", headers=auth_headers)
+
+    assert response.json()["data"]["status"] == "analysing"
+    # Straight to analysis — no transcription job for Deepgram
+    assert [job["kind"] async for job in mongo_db["jobs"].find({})] == ["analyse"]
+
+
+@pytest.mark.asyncio
+async def test_shared_object_is_deleted_only_with_last_reference(client, auth_headers, mongo_db, storage):
+    first = await upload(client, auth_headers)
+    second = await upload(client, auth_headers)
+    storage.delete.reset_mock()
+
+    await client.delete(f"/api/v1/interviews/{first['_id']}", headers=auth_headers)
+    storage.delete.assert_not_awaited()
+
+    await client.delete(f"/api/v1/interviews/{second['_id']}", headers=auth_headers)
+    storage.delete.assert_awaited_once_with(first["storage_key"])
+
+
+@pytest.mark.asyncio
+async def test_object_held_for_a_pending_reuse_is_not_released(client, auth_headers, mongo_db, storage):
+    from app.models.interview import new_interview_document
+    from app.services.dedup import reuse_existing_upload
+
+    first = await upload(client, auth_headers)
+    # A second upload of the same file has been deduplicated but not inserted yet
+    pending = new_interview_document(
+        "test-user-id", "Again", "interview.mp3", "interviews/upload-9.mp3", len(AUDIO), "audio/mpeg",
+        content_hash=first["content_hash"],
+    )
+    pending = await reuse_existing_upload(mongo_db, storage, pending)
+    storage.delete.reset_mock()
+
+    await client.delete(f"/api/v1/interviews/{first['_id']}", headers=auth_headers)
+
+    assert pending["storage_key"] == first["storage_key"]
+    storage.delete.assert_not_awaited()
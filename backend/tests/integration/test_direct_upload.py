@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+MP3_HEADER = b"ID3\x04\x00\x00\x00\x00\x00\x00"
+SIZE = 4096
+
+
+@pytest.fixture
+def storage():
+    backend = AsyncMock()
+    backend.presigned_upload.return_value = {
+        "storage_key": "interviews/direct.mp3",
+        "method":      "PUT",
+        "url":         "https://bucket.test/interviews/direct.mp3?X-Amz-Signature=abc",
+        "fields":      {},
+        "headers":     {"Content-Type": "audio/mpeg"},
+    }
+    backend.head.return_value = {"size": SIZE, "content_type": "audio/mpeg", "etag": '"abc"'}
+    backend.read_range.side_effect = lambda key, start, length: (MP3_HEADER + b"\x00" * SIZE)[start:start + length]
+    with patch("app.services.upload_sessions.get_storage_backend", return_value=backend), \
+         patch("app.api.v1.uploads.get_storage_backend", return_value=backend):
+        yield backend
+
+
+async def start_direct(client, headers, total_size=SIZE):
+    response = await client.post(
+        "/api/v1/interviews/uploads/direct",
+        json={"filename": "call.mp3", "content_type": "audio/mpeg", "total_size": total_size, "title": "Call"},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    return response.json()["data"]
+
+
+@pytest.mark.asyncio
+async def test_direct_upload_full_flow(client, auth_headers, mongo_db, storage):
+    session = await start_direct(client, auth_headers)
+    assert session["kind"] == "direct"
+    assert session["method"] == "PUT"
+    assert session["url"].startswith("https://bucket.test/")
+    storage.presigned_upload.assert_awaited_once()
+    assert storage.presigned_upload.await_args.args == ("call.mp3", "audio/mpeg", SIZE)
+
+    finalize_url = f"/api/v1/interviews/uploads/{session['upload_id']}/finalize"
+    response = await client.post(finalize_url, headers=auth_headers)
+
+    assert response.status_code == 201
+    interview = response.json()["data"]
+    assert interview["storage_key"] == "interviews/direct.mp3"
+    assert interview["file_size"] == SIZE
+    assert interview["title"] == "Call"
+    assert interview["media"]["container"] == "mp3"
+    assert await mongo_db["interviews"].count_documents({}) == 1
+
+    again = await client.post(finalize_url, headers=auth_headers)
+    assert again.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_finalize_before_upload_keeps_session_open(client, auth_headers, mongo_db, storage):
+    session = await start_direct(client, auth_headers)
+    storage.head.return_value = None
+
+    finalize_url = f"/api/v1/interviews/uploads/{session['upload_id']}/finalize"
+    response = await client.post(finalize_url, headers=auth_headers)
+    assert response.status_code == 400
+
+    storage.head.return_value = {"size": SIZE, "content_type": "audio/mpeg", "etag": '"abc"'}
+    assert (await client.post(finalize_url, headers=auth_headers)).status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_finalize_rejects_size_mismatch(client, auth_headers, mongo_db, storage):
+    session = await start_direct(client, auth_headers)
+    storage.head.return_value = {"size": SIZE + 1, "content_type": "audio/mpeg", "etag": '"abc"'}
+
+    response = await client.post(f"/api/v1/interviews/uploads/{session['upload_id']}/finalize", headers=auth_headers)
+
+    assert response.status_code == 400
+    storage.delete.assert_awaited_once_with("interviews/direct.mp3")
+    assert await mongo_db["interviews"].count_documents({}) == 0
+
+
+@pytest.mark.asyncio
+async def test_finalize_rejects_content_not_matching_type(client, auth_headers, mongo_db, storage):
+    session = await start_direct(client, auth_headers)
+    storage.read_range.side_effect = lambda key, start, length: b"<html>" + b"\x00" * (length - 6)
+
+    response = await client.post(f"/api/v1/interviews/uploads/{session['upload_id']}/finalize", headers=auth_headers)
+
+    assert response.status_code == 415
+    storage.delete.assert_awaited_once_with("interviews/direct.mp3")
+    assert await mongo_db["interviews"].count_documents({}) == 0
+
+
+@pytest.mark.asyncio
+async def test_direct_session_does_not_take_chunks(client, auth_headers, mongo_db, storage):
+    session = await start_direct(client, auth_headers)
+
+    response = await client.put(
+        f"/api/v1/interviews/uploads/{session['upload_id']}/chunks/0",
+        content=MP3_HEADER,
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 400
+    storage.upload_part.assert_not_called()
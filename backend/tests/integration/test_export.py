@@ -8,22 +8,26 @@ MOCK_INTERVIEW_WITH_TRANSCRIPT = {
     "_id": ObjectId(MOCK_ID),
     "user_id": "test-user-id",
     "title": "Test Interview",
-    "transcript": {
-        "text": "Interviewer: Tell me about yourself. Candidate: I have five years of experience.",
-        "utterances": [
-            {"speaker": "A", "text": "Tell me about yourself.", "start_ms": 0, "end_ms": 2000},
-            {"speaker": "B", "text": "I have five years of experience.", "start_ms": 2500, "end_ms": 5000},
-        ],
-    },
+    "transcript_summary": {"language_code": "en", "confidence": 0.9, "word_count": 0, "utterance_count": 2},
     "ai_analysis": None,
     "status": "completed",
 }
 
+# The transcripts collection document
+MOCK_TRANSCRIPT = {
+    "_id": ObjectId(MOCK_ID),
+    "text": "Interviewer: Tell me about yourself. Candidate: I have five years of experience.",
+    "utterances": [
+        {"speaker": "A", "text": "Tell me about yourself.", "start_ms": 0, "end_ms": 2000},
+        {"speaker": "B", "text": "I have five years of experience.", "start_ms": 2500, "end_ms": 5000},
+    ],
+}
+
 MOCK_INTERVIEW_NO_TRANSCRIPT = {
     "_id": ObjectId(MOCK_ID),
     "user_id": "test-user-id",
     "title": "Test Interview",
-    "transcript": None,
+    "transcript_summary": None,
     "status": "uploaded",
 }
 
@@ -47,7 +51,7 @@ async def test_export_returns_404_for_unknown_interview(client, auth_headers, mo
 @pytest.mark.asyncio
 async def test_export_returns_400_when_no_transcript(client, auth_headers, mock_db):
     mock_db["interviews"].find_one = AsyncMock(
-        return_value=MOCK_INTERVIEW_NO_TRANSCRIPT
+        side_effect=[MOCK_INTERVIEW_NO_TRANSCRIPT, None]
     )
     response = await client.get(
         f"/api/v1/interviews/{MOCK_ID}/export",
@@ -59,7 +63,7 @@ async def test_export_returns_400_when_no_transcript(client, auth_headers, mock_
 @pytest.mark.asyncio
 async def test_export_txt_returns_plain_text(client, auth_headers, mock_db):
     mock_db["interviews"].find_one = AsyncMock(
-        return_value=MOCK_INTERVIEW_WITH_TRANSCRIPT
+        side_effect=[MOCK_INTERVIEW_WITH_TRANSCRIPT, dict(MOCK_TRANSCRIPT)]
     )
     response = await client.get(
         f"/api/v1/interviews/{MOCK_ID}/export?format=txt",
@@ -74,7 +78,7 @@ async def test_export_txt_returns_plain_text(client, auth_headers, mock_db):
 @pytest.mark.asyncio
 async def test_export_pdf_returns_pdf_bytes(client, auth_headers, mock_db):
     mock_db["interviews"].find_one = AsyncMock(
-        return_value=MOCK_INTERVIEW_WITH_TRANSCRIPT
+        side_effect=[MOCK_INTERVIEW_WITH_TRANSCRIPT, dict(MOCK_TRANSCRIPT)]
     )
     response = await client.get(
         f"/api/v1/interviews/{MOCK_ID}/export?format=pdf",
@@ -88,7 +92,7 @@ async def test_export_pdf_returns_pdf_bytes(client, auth_headers, mock_db):
 @pytest.mark.asyncio
 async def test_export_docx_returns_docx_bytes(client, auth_headers, mock_db):
     mock_db["interviews"].find_one = AsyncMock(
-        return_value=MOCK_INTERVIEW_WITH_TRANSCRIPT
+        side_effect=[MOCK_INTERVIEW_WITH_TRANSCRIPT, dict(MOCK_TRANSCRIPT)]
     )
     response = await client.get(
         f"/api/v1/interviews/{MOCK_ID}/export?format=docx",
@@ -103,7 +107,7 @@ async def test_export_docx_returns_docx_bytes(client, auth_headers, mock_db):
 @pytest.mark.asyncio
 async def test_export_returns_400_for_invalid_format(client, auth_headers, mock_db):
     mock_db["interviews"].find_one = AsyncMock(
-        return_value=MOCK_INTERVIEW_WITH_TRANSCRIPT
+        side_effect=[MOCK_INTERVIEW_WITH_TRANSCRIPT, dict(MOCK_TRANSCRIPT)]
     )
     response = await client.get(
         f"/api/v1/interviews/{MOCK_ID}/export?format=xlsx",
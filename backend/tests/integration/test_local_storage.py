@@ -0,0 +1,188 @@
+import threading
+from pathlib import Path
+
+import pytest
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+from app.services import storage as storage_module
+from app.services.storage import LocalStorageBackend, sign_local_url
+
+DATA = bytes(range(256)) * 64  # 16KB
+
+
+async def chunks(data: bytes, size: int = 4096):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "local")
+    monkeypatch.setattr(settings, "LOCAL_STORAGE_PATH", str(tmp_path))
+    backend = LocalStorageBackend()
+    monkeypatch.setattr(storage_module, "_storage", backend)
+    return backend
+
+
+async def signed_path(backend: LocalStorageBackend, key: str) -> str:
+    url = urlsplit(await backend.presigned_url(key, expires_in=600))
+    return f"{url.path}?{url.query}"
+
+
+@pytest.mark.asyncio
+async def test_stream_upload_writes_file(local_storage):
+    key = await local_storage.upload_stream(chunks(DATA), "interview.mp3", "audio/mpeg")
+
+    assert local_storage.path_for(key).read_bytes() == DATA
+    assert not list(local_storage.path_for(key).parent.glob(".*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_multipart_upload_assembles_parts_in_order(local_storage):
+    key, upload_id = await local_storage.create_multipart("panel.mp4", "video/mp4")
+    etag_2 = await local_storage.upload_part(key, upload_id, 2, b"world")
+    etag_1 = await local_storage.upload_part(key, upload_id, 1, b"hello ")
+
+    await local_storage.complete_multipart(
+        key, upload_id, [{"PartNumber": 1, "ETag": etag_1}, {"PartNumber": 2, "ETag": etag_2}]
+    )
+
+    assert local_storage.path_for(key).read_bytes() == b"hello world"
+
+
+@pytest.mark.asyncio
+async def test_signed_url_serves_whole_file(client, local_storage):
+    key = await local_storage.upload_stream(chunks(DATA), "interview.mp3", "audio/mpeg")
+
+    response = await client.get(await signed_path(local_storage, key))
+
+    assert response.status_code == 200
+    assert response.content == DATA
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-type"] == "audio/mpeg"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("range_header,start,end", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=1000-", 1000, len(DATA) - 1),
+    ("bytes=-256", len(DATA) - 256, len(DATA) - 1),
+    ("bytes=16000-99999", 16000, len(DATA) - 1),
+])
+async def test_range_requests_return_partial_content(client, local_storage, range_header, start, end):
+    key = await local_storage.upload_stream(chunks(DATA), "interview.mp3", "audio/mpeg")
+
+    response = await client.get(await signed_path(local_storage, key), headers={"Range": range_header})
+
+    assert response.status_code == 206
+    assert response.content == DATA[start:end + 1]
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(DATA)}"
+
+
+@pytest.mark.asyncio
+async def test_unsatisfiable_range_returns_416(client, local_storage):
+    key = await local_storage.upload_stream(chunks(DATA), "interview.mp3", "audio/mpeg")
+
+    response = await client.get(await signed_path(local_storage, key), headers={"Range": "bytes=99999-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+
+
+@pytest.mark.asyncio
+async def test_tampered_or_expired_urls_are_rejected(client, local_storage):
+    key = await local_storage.upload_stream(chunks(DATA), "interview.mp3", "audio/mpeg")
+    path = await signed_path(local_storage, key)
+
+    tampered = await client.get(path.replace("signature=", "signature=0"))
+    expired = await client.get(f"/api/v1/files/{key}?expires=1&signature={sign_local_url(key, 1)}")
+
+    assert tampered.status_code == 403
+    assert expired.status_code == 403
+
+
+def test_storage_keys_cannot_escape_root(local_storage):
+    with pytest.raises(ValueError):
+        local_storage.path_for("../outside.txt")
+
+
+@pytest.mark.asyncio
+async def test_zero_copy_send_used_when_server_supports_it(tmp_path):
+    from app.api.v1.files import RangeFileResponse
+
+    path = tmp_path / "audio.mp3"
+    path.write_bytes(DATA)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    response = RangeFileResponse(str(path), 100, 50, 206, {}, "audio/mpeg")
+    await response({"type": "http", "extensions": {"http.response.zerocopysend": {}}}, None, send)
+
+    zerocopy = messages[1]
+    assert zerocopy["type"] == "http.response.zerocopysend"
+    assert (zerocopy["offset"], zerocopy["count"]) == (100, 50)
+
+
+@pytest.mark.asyncio
+async def test_presigned_put_accepts_exact_upload_only(client, local_storage):
+    upload = await local_storage.presigned_upload("interview.mp3", "audio/mpeg", len(DATA), expires_in=600)
+    url = urlsplit(upload["url"])
+    path = f"{url.path}?{url.query}"
+
+    wrong_type = await client.put(path, content=DATA, headers={"content-type": "video/mp4"})
+    too_short = await client.put(path, content=DATA[:100], headers=upload["headers"])
+    assert wrong_type.status_code == 403
+    assert too_short.status_code == 400
+    assert await local_storage.head(upload["storage_key"]) is None
+
+    response = await client.put(path, content=DATA, headers=upload["headers"])
+
+    assert response.status_code == 200
+    head = await local_storage.head(upload["storage_key"])
+    assert head["size"] == len(DATA)
+    assert head["content_type"] == "audio/mpeg"
+    assert await local_storage.read_range(upload["storage_key"], 10, 5) == DATA[10:15]
+
+
+@pytest.mark.asyncio
+async def test_listing_skips_in_flight_files_and_bulk_delete(local_storage):
+    key = await local_storage.upload_stream(chunks(DATA), "interview.mp3", "audio/mpeg")
+    await local_storage.create_multipart("panel.mp4", "video/mp4")
+    (local_storage.path_for(key).parent / ".partial.mp3.tmp").write_bytes(b"x")
+
+    pages = [page async for page in local_storage.list_objects("interviews/")]
+
+    assert [(obj["key"], obj["size"]) for page in pages for obj in page] == [(key, len(DATA))]
+    assert await local_storage.delete_many([key]) == [key]
+    assert not local_storage.path_for(key).exists()
+
+
+@pytest.mark.asyncio
+async def test_deletes_unlink_off_the_event_loop(local_storage, monkeypatch):
+    first = await local_storage.upload_stream(chunks(DATA), "a.mp3", "audio/mpeg")
+    second = await local_storage.upload_stream(chunks(DATA), "b.mp3", "audio/mpeg")
+    threads = []
+    unlink = Path.unlink
+
+    def recording_unlink(path, missing_ok=False):
+        threads.append(threading.current_thread())
+        unlink(path, missing_ok=missing_ok)
+
+    monkeypatch.setattr(Path, "unlink", recording_unlink)
+    await local_storage.delete(first)
+    await local_storage.delete_many([second])
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+def test_refuses_to_start_without_a_signing_secret(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LOCAL_STORAGE_PATH", str(tmp_path))
+    monkeypatch.setattr(settings, "LOCAL_STORAGE_SIGNING_SECRET", "")
+    monkeypatch.setattr(settings, "AUTH_SECRET", "")
+
+    with pytest.raises(ValueError):
+        LocalStorageBackend()
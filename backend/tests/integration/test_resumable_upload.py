@@ -0,0 +1,142 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+from app.core.config import settings
+from app.services.upload_sessions import purge_expired_upload_sessions
+
+CHUNK = 1024
+MP4_HEADER = b"\x00\x00\x00\x18ftypmp42"
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "RESUMABLE_CHUNK_SIZE_MB", 1)
+    monkeypatch.setattr(type(settings), "RESUMABLE_CHUNK_SIZE_BYTES", property(lambda self: CHUNK))
+
+
+@pytest.fixture
+def storage():
+    backend = AsyncMock()
+    backend.create_multipart.return_value = ("interviews/resumable.mp4", "upload-123")
+    backend.upload_part.side_effect = lambda key, upload_id, part, data: f'"etag-{part}"'
+    with patch("app.services.upload_sessions.get_storage_backend", return_value=backend), \
+         patch("app.api.v1.uploads.get_storage_backend", return_value=backend):
+        yield backend
+
+
+async def start_session(client, headers, total_size=2 * CHUNK + 100):
+    response = await client.post(
+        "/api/v1/interviews/uploads",
+        json={"filename": "panel.mp4", "content_type": "video/mp4", "total_size": total_size},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    return response.json()["data"]
+
+
+@pytest.mark.asyncio
+async def test_resumable_upload_full_flow(client, auth_headers, mongo_db, storage):
+    session = await start_session(client, auth_headers)
+    assert session["total_chunks"] == 3
+    upload_url = f"/api/v1/interviews/uploads/{session['upload_id']}"
+
+    # Chunks can arrive out of order; the session reports what is still missing
+    await client.put(f"{upload_url}/chunks/2", content=b"c" * 100, headers=auth_headers)
+    await client.put(f"{upload_url}/chunks/0", content=MP4_HEADER.ljust(CHUNK, b"a"), headers=auth_headers)
+
+    status = (await client.get(upload_url, headers=auth_headers)).json()["data"]
+    assert status["missing"] == [1]
+    assert [r["offset"] for r in status["received"]] == [0, 2 * CHUNK]
+
+    early = await client.post(f"{upload_url}/complete", headers=auth_headers)
+    assert early.status_code == 400
+
+    await client.put(f"{upload_url}/chunks/1", content=b"b" * CHUNK, headers=auth_headers)
+    response = await client.post(f"{upload_url}/complete", headers=auth_headers)
+
+    assert response.status_code == 201
+    interview = response.json()["data"]
+    assert interview["storage_key"] == "interviews/resumable.mp4"
+    assert interview["file_size"] == 2 * CHUNK + 100
+    assert interview["status"] == "uploaded"
+    storage.complete_multipart.assert_awaited_once_with(
+        "interviews/resumable.mp4",
+        "upload-123",
+        [{"PartNumber": 1, "ETag": '"etag-1"'}, {"PartNumber": 2, "ETag": '"etag-2"'}, {"PartNumber": 3, "ETag": '"etag-3"'}],
+    )
+    assert await mongo_db["interviews"].count_documents({}) == 1
+
+    again = await client.post(f"{upload_url}/complete", headers=auth_headers)
+    assert again.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_failed_save_reopens_session_without_reassembling(client, auth_headers, mongo_db, storage):
+    session = await start_session(client, auth_headers, total_size=100)
+    upload_url = f"/api/v1/interviews/uploads/{session['upload_id']}"
+    await client.put(f"{upload_url}/chunks/0", content=MP4_HEADER.ljust(100, b"a"), headers=auth_headers)
+
+    with patch("app.api.v1.uploads.new_interview_document", side_effect=RuntimeError("db down")), \
+         pytest.raises(RuntimeError):
+        await client.post(f"{upload_url}/complete", headers=auth_headers)
+
+    stored = await mongo_db["upload_sessions"].find_one({})
+    assert stored["status"] == "active"
+    assert stored["assembled"] is True
+
+    response = await client.post(f"{upload_url}/complete", headers=auth_headers)
+    assert response.status_code == 201
+    storage.complete_multipart.assert_awaited_once()
+    assert await mongo_db["interviews"].count_documents({}) == 1
+
+
+@pytest.mark.asyncio
+async def test_chunk_with_wrong_size_is_rejected(client, auth_headers, mongo_db, storage):
+    session = await start_session(client, auth_headers)
+    response = await client.put(
+        f"/api/v1/interviews/uploads/{session['upload_id']}/chunks/0",
+        content=b"a" * 10,
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+    storage.upload_part.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_session_is_private_to_its_owner(client, auth_headers, make_token, mongo_db, storage):
+    session = await start_session(client, auth_headers)
+    other = {"Authorization": f"Bearer {make_token(user_id='someone-else')}"}
+    response = await client.get(f"/api/v1/interviews/uploads/{session['upload_id']}", headers=other)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_expired_sessions_are_aborted_and_removed(mongo_db, storage):
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    await mongo_db["upload_sessions"].insert_many([
+        {"storage_key": "interviews/old.mp4", "upload_id": "u-old", "status": "active", "expires_at": past},
+        {"storage_key": "interviews/done.mp4", "upload_id": "u-done", "status": "completed", "expires_at": past},
+        {"storage_key": "interviews/whole.mp4", "upload_id": "u-whole", "status": "active", "assembled": True, "expires_at": past},
+        {"storage_key": "interviews/live.mp4", "upload_id": "u-live", "status": "active",
+         "expires_at": datetime.now(timezone.utc) + timedelta(hours=1)},
+    ])
+
+    purged = await purge_expired_upload_sessions()
+
+    assert purged == 3
+    storage.abort_multipart.assert_awaited_once_with("interviews/old.mp4", "u-old")
+    storage.delete.assert_awaited_once_with("interviews/whole.mp4")
+    assert await mongo_db["upload_sessions"].count_documents({}) == 1
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_must_match_declared_type(client, auth_headers, mongo_db, storage):
+    session = await start_session(client, auth_headers)
+    response = await client.put(
+        f"/api/v1/interviews/uploads/{session['upload_id']}/chunks/0",
+        content=b"ID3".ljust(CHUNK, b"a"),
+        headers=auth_headers,
+    )
+    assert response.status_code == 415
+    storage.upload_part.assert_not_awaited()
@@ -80,71 +80,81 @@ async def test_transcribe_is_idempotent_when_completed(client, auth_headers, moc
     assert "Already" in body["data"]["message"]
 
 
-# Successful submission
+# Queued for the worker
 
 @pytest.mark.asyncio
-async def test_transcribe_submits_job_and_returns_queued(client, auth_headers, mock_db):
-    mock_db["interviews"].find_one = AsyncMock(
-        return_value=make_interview(status="uploaded")
-    )
-    mock_db["interviews"].update_one = AsyncMock()
-
-    with patch("app.api.v1.interviews.get_transcription_service") as mock_svc:
-        service = AsyncMock()
-        service.submit = AsyncMock(return_value="mock-job-id-123")
-        mock_svc.return_value = service
+async def test_transcribe_enqueues_job_and_returns_queued(client, auth_headers, mongo_db):
+    interview = make_interview(status="uploaded")
+    await mongo_db["interviews"].insert_one(interview)
 
+    with patch("app.services.pipeline.get_transcription_service") as mock_svc:
         response = await client.post(
             f"/api/v1/interviews/{MOCK_INTERVIEW_ID}/transcribe",
             headers=auth_headers,
         )
+        mock_svc.return_value.submit.assert_not_called()
 
     assert response.status_code == 200
     body = response.json()
     assert body["data"]["status"] == "queued"
-    assert body["data"]["job_id"] == "mock-job-id-123"
+    job = await mongo_db["jobs"].find_one({})
+    assert body["data"]["job_id"] == str(job["_id"])
+    assert job["kind"] == "transcribe"
+    assert job["payload"] == {"interview_id": MOCK_INTERVIEW_ID}
+    assert (await mongo_db["interviews"].find_one({}))["status"] == "queued"
 
 
 @pytest.mark.asyncio
-async def test_transcribe_updates_status_to_queued_in_db(client, auth_headers, mock_db):
-    mock_db["interviews"].find_one = AsyncMock(
-        return_value=make_interview(status="uploaded")
-    )
-    mock_db["interviews"].update_one = AsyncMock()
+async def test_transcribe_twice_enqueues_one_job(client, auth_headers, mongo_db):
+    await mongo_db["interviews"].insert_one(make_interview(status="uploaded"))
 
-    with patch("app.api.v1.interviews.get_transcription_service") as mock_svc:
-        service = AsyncMock()
-        service.submit = AsyncMock(return_value="mock-job-id-456")
-        mock_svc.return_value = service
+    for _ in range(2):
+        response = await client.post(f"/api/v1/interviews/{MOCK_INTERVIEW_ID}/transcribe", headers=auth_headers)
+        assert response.status_code == 200
 
-        await client.post(
-            f"/api/v1/interviews/{MOCK_INTERVIEW_ID}/transcribe",
-            headers=auth_headers,
-        )
+    assert await mongo_db["jobs"].count_documents({}) == 1
+
+
+# Worker stage
+
+@pytest.mark.asyncio
+async def test_transcription_stage_submits_and_marks_transcribing(mongo_db):
+    from app.services.pipeline import submit_transcription
+    await mongo_db["interviews"].insert_one(make_interview(status="queued"))
 
-    mock_db["interviews"].update_one.assert_called_once()
-    call_args = mock_db["interviews"].update_one.call_args
-    set_data = call_args[0][1]["$set"]
-    assert set_data["status"] == "queued"
-    assert set_data["deepgram_job_id"] == "mock-job-id-456"
+    with patch("app.services.pipeline.get_transcription_service") as mock_svc:
+        mock_svc.return_value.submit = AsyncMock(return_value="mock-job-id-456")
+        await submit_transcription({"interview_id": MOCK_INTERVIEW_ID})
 
+    doc = await mongo_db["interviews"].find_one({})
+    assert doc["status"] == "transcribing"
+    assert doc["deepgram_job_id"] == "mock-job-id-456"
+    assert doc["transcription_source_key"] == "interviews/test.mp3"
 
-# Service failure
 
 @pytest.mark.asyncio
-async def test_transcribe_returns_500_when_service_fails(client, auth_headers, mock_db):
-    mock_db["interviews"].find_one = AsyncMock(
-        return_value=make_interview(status="uploaded")
-    )
+async def test_transcription_stage_raises_when_service_fails(mongo_db):
+    from app.services.pipeline import submit_transcription
+    await mongo_db["interviews"].insert_one(make_interview(status="queued"))
 
-    with patch("app.api.v1.interviews.get_transcription_service") as mock_svc:
-        service = AsyncMock()
-        service.submit = AsyncMock(side_effect=Exception("Deepgram unreachable"))
-        mock_svc.return_value = service
+    with patch("app.services.pipeline.get_transcription_service") as mock_svc:
+        mock_svc.return_value.submit = AsyncMock(side_effect=Exception("Deepgram unreachable"))
+        with pytest.raises(Exception, match="unreachable"):
+            await submit_transcription({"interview_id": MOCK_INTERVIEW_ID})
 
-        response = await client.post(
-            f"/api/v1/interviews/{MOCK_INTERVIEW_ID}/transcribe",
-            headers=auth_headers,
-        )
+    # Left queued for the job queue to retry
+    assert (await mongo_db["interviews"].find_one({}))["status"] == "queued"
+
+
+@pytest.mark.asyncio
+async def test_transcription_stage_submits_compacted_audio_when_available(mongo_db):
+    from app.services.pipeline import submit_transcription
+    interview = make_interview(status="queued")
+    interview["audio_storage_key"] = "interviews/test-audio.ogg"
+    await mongo_db["interviews"].insert_one(interview)
+
+    with patch("app.services.pipeline.get_transcription_service") as mock_service:
+        mock_service.return_value.submit = AsyncMock(return_value="job-123")
+        await submit_transcription({"interview_id": MOCK_INTERVIEW_ID})
 
-    assert response.status_code == 500
+    assert mock_service.return_value.submit.await_args.kwargs["storage_key"] == "interviews/test-audio.ogg"
@@ -0,0 +1,118 @@
+from functools import partial
+
+import pytest
+from bson import ObjectId
+
+from app.models.interview import encode_words, new_interview_document
+from app.services import transcripts
+from app.services.transcripts import save_transcript
+
+# Ten utterances of three words, starting every 10s and lasting 2.8s
+WORDS = [
+    {"text": f"w{i}.{j}", "start_ms": i * 10_000 + j * 1000, "end_ms": i * 10_000 + j * 1000 + 800, "confidence": 1.0, "speaker": "AB"[i % 2]}
+    for i in range(10) for j in range(3)
+]
+UTTERANCES = [
+    {"speaker": "AB"[i % 2], "text": f"w{i}.0 w{i}.1 w{i}.2", "start_ms": i * 10_000, "end_ms": i * 10_000 + 2800}
+    for i in range(10)
+]
+
+
+async def insert_transcribed(db, user_id="test-user-id") -> str:
+    document = new_interview_document(user_id, "Call", "call.mp3", "interviews/call.mp3", 1000, "audio/mpeg")
+    oid = (await db["interviews"].insert_one(document)).inserted_id
+    transcript = {"text": " ".join(w["text"] for w in WORDS), "words": WORDS, "utterances": UTTERANCES}
+    summary = await save_transcript(db, oid, user_id, transcript)
+    await db["interviews"].update_one({"_id": oid}, {"$set": {"transcript_summary": summary}})
+    return str(oid)
+
+
+@pytest.mark.asyncio
+async def test_pages_by_offset(client, auth_headers, mongo_db):
+    interview_id = await insert_transcribed(mongo_db)
+
+    first = await client.get(f"/api/v1/interviews/{interview_id}/transcript?limit=4", headers=auth_headers)
+    last = await client.get(f"/api/v1/interviews/{interview_id}/transcript?offset=8&limit=4", headers=auth_headers)
+
+    assert first.status_code == 200
+    data = first.json()["data"]
+    assert data["total"] == 10
+    assert data["utterances"] == UTTERANCES[:4]
+    assert data["next_offset"] == 4
+    assert "words" not in data
+    assert last.json()["data"]["utterances"] == UTTERANCES[8:]
+    assert last.json()["data"]["next_offset"] is None
+
+
+@pytest.mark.asyncio
+async def test_window_by_time(client, auth_headers, mongo_db):
+    interview_id = await insert_transcribed(mongo_db)
+
+    # 21s is inside utterance 2; 45s starts nothing
+    inside = await client.get(f"/api/v1/interviews/{interview_id}/transcript?from_ms=21000&to_ms=45000", headers=auth_headers)
+    # 35s is in the silence after utterance 3
+    gap = await client.get(f"/api/v1/interviews/{interview_id}/transcript?from_ms=35000&limit=2", headers=auth_headers)
+
+    data = inside.json()["data"]
+    assert data["offset"] == 2
+    assert data["utterances"] == UTTERANCES[2:5]
+    data = gap.json()["data"]
+    assert data["offset"] == 4
+    assert data["utterances"] == UTTERANCES[4:6]
+    assert data["next_offset"] == 6
+
+
+@pytest.mark.asyncio
+async def test_window_includes_only_its_words(client, auth_headers, mongo_db):
+    interview_id = await insert_transcribed(mongo_db)
+
+    response = await client.get(
+        f"/api/v1/interviews/{interview_id}/transcript?offset=3&limit=2&include_words=true", headers=auth_headers,
+    )
+
+    words = response.json()["data"]["words"]
+    assert [w["text"] for w in words] == [w["text"] for w in WORDS[9:15]]
+    assert [w["start_ms"] for w in words] == [w["start_ms"] for w in WORDS[9:15]]
+
+
+@pytest.mark.asyncio
+async def test_window_reads_only_the_blocks_it_spans(client, auth_headers, mongo_db, monkeypatch):
+    monkeypatch.setattr(transcripts, "encode_words", partial(encode_words, block_size=4))
+    interview_id = await insert_transcribed(mongo_db)
+    collection = type(mongo_db[transcripts.COLLECTION])
+    projections = []
+
+    async def find_one(self, query, projection=None, *args, **kwargs):
+        if self.name == transcripts.COLLECTION:
+            projections.append(projection)
+        return await original(self, query, projection, *args, **kwargs)
+    original = collection.find_one
+    monkeypatch.setattr(collection, "find_one", find_one)
+
+    response = await client.get(
+        f"/api/v1/interviews/{interview_id}/transcript?offset=3&limit=2&include_words=true", headers=auth_headers,
+    )
+
+    data = response.json()["data"]
+    assert data["utterances"] == UTTERANCES[3:5]
+    assert [w["text"] for w in data["words"]] == [w["text"] for w in WORDS[9:15]]
+    # Words 9-14 are in blocks 2 and 3 of 8; nothing reads all of the words or utterances
+    assert projections[-1]["word_blocks"] == {"$slice": [2, 2]}
+    for projection in projections:
+        assert not {"words", "words.text", "words.blocks", "word_blocks.text"} & projection.keys()
+        assert projection.get("word_blocks") != 1 and projection.get("utterances") != 1
+
+
+@pytest.mark.asyncio
+async def test_window_errors(client, auth_headers, mongo_db):
+    interview_id = await insert_transcribed(mongo_db)
+    document = new_interview_document("test-user-id", "Call", "call.mp3", "interviews/call.mp3", 1000, "audio/mpeg")
+    untranscribed = str((await mongo_db["interviews"].insert_one(document)).inserted_id)
+
+    backwards = await client.get(f"/api/v1/interviews/{interview_id}/transcript?from_ms=5000&to_ms=1000", headers=auth_headers)
+    missing = await client.get(f"/api/v1/interviews/{ObjectId()}/transcript", headers=auth_headers)
+    pending = await client.get(f"/api/v1/interviews/{untranscribed}/transcript", headers=auth_headers)
+
+    assert backwards.status_code == 400
+    assert missing.status_code == 404
+    assert pending.status_code == 400
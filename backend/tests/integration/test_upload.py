@@ -1,3 +1,4 @@
+import struct
 import pytest
 from unittest.mock import AsyncMock, patch
 from io import BytesIO
@@ -5,16 +6,20 @@ from io import BytesIO
 
 # Helpers
 
+MP3_HEADER = b"ID3\x04\x00\x00\x00\x00\x00\x00"
+MP4_HEADER = b"\x00\x00\x00\x18ftypmp42"
+
+
 def make_audio_file(filename: str = "interview.mp3", size: int = 1024) -> dict:
     """Return a files dict suitable for httpx multipart upload."""
     return {
-        "file": (filename, BytesIO(b"0" * size), "audio/mpeg")
+        "file": (filename, BytesIO(MP3_HEADER.ljust(size, b"0")), "audio/mpeg")
     }
 
 
 def make_video_file(filename: str = "interview.mp4", size: int = 1024) -> dict:
     return {
-        "file": (filename, BytesIO(b"0" * size), "video/mp4")
+        "file": (filename, BytesIO(MP4_HEADER.ljust(size, b"0")), "video/mp4")
     }
 
 
@@ -55,7 +60,7 @@ async def test_upload_accepts_mp3(client, auth_headers):
          patch("app.api.v1.interviews.DBDep") as mock_db:
 
         storage_instance = AsyncMock()
-        storage_instance.upload.return_value = "interviews/test.mp3"
+        storage_instance.upload_stream.return_value = "interviews/test.mp3"
         mock_storage.return_value = storage_instance
 
         response = await client.post(
@@ -70,7 +75,7 @@ async def test_upload_accepts_mp3(client, auth_headers):
 async def test_upload_accepts_mp4(client, auth_headers):
     with patch("app.api.v1.interviews.get_storage_backend") as mock_storage:
         storage_instance = AsyncMock()
-        storage_instance.upload.return_value = "interviews/test.mp4"
+        storage_instance.upload_stream.return_value = "interviews/test.mp4"
         mock_storage.return_value = storage_instance
 
         response = await client.post(
@@ -111,7 +116,7 @@ async def test_upload_returns_interview_document(client, auth_headers):
          patch("app.api.v1.interviews.DBDep"):
 
         storage_instance = AsyncMock()
-        storage_instance.upload.return_value = "interviews/test-uuid.mp3"
+        storage_instance.upload_stream.return_value = "interviews/test-uuid.mp3"
         mock_storage.return_value = storage_instance
 
         response = await client.post(
@@ -132,7 +137,7 @@ async def test_upload_returns_interview_document(client, auth_headers):
 async def test_upload_uses_filename_as_default_title(client, auth_headers):
     with patch("app.api.v1.interviews.get_storage_backend") as mock_storage:
         storage_instance = AsyncMock()
-        storage_instance.upload.return_value = "interviews/test.mp3"
+        storage_instance.upload_stream.return_value = "interviews/test.mp3"
         mock_storage.return_value = storage_instance
 
         response = await client.post(
@@ -150,7 +155,7 @@ async def test_upload_uses_filename_as_default_title(client, auth_headers):
 async def test_upload_uses_custom_title_when_provided(client, auth_headers):
     with patch("app.api.v1.interviews.get_storage_backend") as mock_storage:
         storage_instance = AsyncMock()
-        storage_instance.upload.return_value = "interviews/test.mp3"
+        storage_instance.upload_stream.return_value = "interviews/test.mp3"
         mock_storage.return_value = storage_instance
 
         response = await client.post(
@@ -163,3 +168,60 @@ async def test_upload_uses_custom_title_when_provided(client, auth_headers):
         if response.status_code == 201:
             body = response.json()
             assert body["data"]["title"] == "John Doe — Senior Engineer"
+
+
+# Content sniffing and metadata probe
+
+class DrainingStorage:
+    """Consumes the upload stream the way a real backend would."""
+
+    def __init__(self):
+        self.received = 0
+
+    async def upload_stream(self, chunks, filename, content_type):
+        async for chunk in chunks:
+            self.received += len(chunk)
+        return "interviews/test.wav"
+
+
+def make_wav(seconds: int = 2, sample_rate: int = 16000) -> bytes:
+    data_size = seconds * sample_rate * 2
+    return (
+        b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+        + b"data" + struct.pack("<I", data_size) + b"\x00" * data_size
+    )
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_content_that_does_not_match_type(client, auth_headers, mongo_db):
+    storage = DrainingStorage()
+    with patch("app.api.v1.interviews.get_storage_backend", return_value=storage):
+        response = await client.post(
+            "/api/v1/interviews/upload",
+            files={"file": ("renamed.mp3", BytesIO(b"%PDF-1.7" + b"0" * 1024), "audio/mpeg")},
+            headers=auth_headers,
+        )
+    assert response.status_code == 415
+    assert storage.received == 0
+    assert await mongo_db["interviews"].count_documents({}) == 0
+
+
+@pytest.mark.asyncio
+async def test_upload_records_media_metadata(client, auth_headers, mongo_db):
+    with patch("app.api.v1.interviews.get_storage_backend", return_value=DrainingStorage()):
+        response = await client.post(
+            "/api/v1/interviews/upload",
+            files={"file": ("call.wav", BytesIO(make_wav()), "audio/wav")},
+            headers=auth_headers,
+        )
+    assert response.status_code == 201
+    data = response.json()["data"]
+    assert data["duration_seconds"] == 2.0
+    assert data["media"] == {
+        "container":        "wav",
+        "codec":            "pcm_s16le",
+        "duration_seconds": 2.0,
+        "sample_rate":      16000,
+        "channels":         1,
+    }
@@ -0,0 +1,46 @@
+import pytest
+
+from app.models.interview import new_interview_document
+from app.services.waveform import save_waveform
+
+
+async def insert_interview(db, user_id="test-user-id") -> str:
+    document = new_interview_document(user_id, "Call", "call.mp3", "interviews/call.mp3", 1000, "audio/mpeg")
+    result = await db["interviews"].insert_one(document)
+    return str(result.inserted_id)
+
+
+@pytest.mark.asyncio
+async def test_waveform_served_as_immutable_binary(client, auth_headers, mongo_db):
+    interview_id = await insert_interview(mongo_db)
+    await save_waveform(mongo_db, "interviews/call.mp3", 16000, 4000, [(256, b"\x00\x10" * 250), (1024, b"\xf0\x10" * 63)])
+
+    response = await client.get(f"/api/v1/interviews/{interview_id}/waveform?resolution=1000", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.content == b"\xf0\x10" * 63
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["cache-control"] == "private, max-age=31536000, immutable"
+    assert response.headers["x-waveform-samples-per-peak"] == "1024"
+    assert response.headers["x-waveform-levels"] == "256,1024"
+
+    cached = await client.get(
+        f"/api/v1/interviews/{interview_id}/waveform?resolution=1000",
+        headers={**auth_headers, "If-None-Match": response.headers["etag"]},
+    )
+    assert cached.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_waveform_404_until_computed(client, auth_headers, mongo_db):
+    interview_id = await insert_interview(mongo_db)
+    response = await client.get(f"/api/v1/interviews/{interview_id}/waveform", headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_waveform_is_private_to_owner(client, auth_headers, mongo_db):
+    interview_id = await insert_interview(mongo_db, user_id="someone-else")
+    await save_waveform(mongo_db, "interviews/call.mp3", 16000, 4000, [(256, b"\x00\x10")])
+    response = await client.get(f"/api/v1/interviews/{interview_id}/waveform", headers=auth_headers)
+    assert response.status_code == 404
@@ -0,0 +1,210 @@
+import hashlib
+import hmac
+import json
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.services import storage as storage_module, webhook_events
+from app.services.jobs import COLLECTION as JOBS
+from app.services.pipeline import process_transcription_result
+from app.services.storage import LocalStorageBackend
+from app.services.transcripts import COLLECTION as TRANSCRIPTS, load_transcript
+from app.services.webhook_events import COLLECTION as EVENTS, extract_request_id
+
+INTERVIEW_ID = str(ObjectId())
+
+PAYLOAD = {
+    "metadata": {"request_id": "dg-req-1", "duration": 6.0},
+    "results": {
+        "channels": [{"alternatives": [{
+            "transcript": "Tell me about yourself.",
+            "confidence": 0.98,
+            "words": [{"word": "tell", "punctuated_word": "Tell", "start": 0.5, "end": 0.8, "confidence": 0.99, "speaker": 0}],
+        }]}],
+        "utterances": [{"speaker": 0, "transcript": "Tell me about yourself.", "start": 0.5, "end": 2.0}],
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def deepgram_mock(monkeypatch):
+    monkeypatch.setattr(settings, "TRANSCRIPTION_BACKEND", "deepgram")
+    monkeypatch.setattr(settings, "DEEPGRAM_WEBHOOK_SECRET", "")
+
+
+async def post_webhook(client, body: bytes, headers=None):
+    return await client.post(
+        f"/api/v1/webhooks/deepgram?interview_id={INTERVIEW_ID}",
+        content=body,
+        headers={"content-type": "application/json", **(headers or {})},
+    )
+
+
+@pytest.mark.asyncio
+async def test_webhook_stores_event_and_acks_without_processing(client, mongo_db):
+    await mongo_db["interviews"].insert_one({"_id": ObjectId(INTERVIEW_ID), "user_id": "u1", "status": "transcribing"})
+
+    response = await post_webhook(client, json.dumps(PAYLOAD).encode())
+
+    assert response.status_code == 200
+    event = await mongo_db[EVENTS].find_one({"_id": "dg-req-1"})
+    assert event["interview_id"] == INTERVIEW_ID
+    assert json.loads(event["payload"]) == PAYLOAD
+    job = await mongo_db[JOBS].find_one({})
+    assert job["kind"] == "webhook"
+    assert job["payload"] == {"interview_id": INTERVIEW_ID, "event_id": "dg-req-1"}
+    # Nothing parsed or saved yet
+    assert (await mongo_db["interviews"].find_one({}))["status"] == "transcribing"
+
+
+@pytest.mark.asyncio
+async def test_large_webhook_body_is_kept_in_storage(client, mongo_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LOCAL_STORAGE_PATH", str(tmp_path))
+    monkeypatch.setattr(storage_module, "_storage", LocalStorageBackend())
+    monkeypatch.setattr(webhook_events, "INLINE_PAYLOAD_BYTES", 100)
+    await mongo_db["interviews"].insert_one(
+        {"_id": ObjectId(INTERVIEW_ID), "user_id": "u1", "status": "transcribing", "deepgram_job_id": "dg-req-1"}
+    )
+    body = json.dumps(PAYLOAD).encode()
+
+    for _ in range(2):
+        assert (await post_webhook(client, body)).status_code == 200
+
+    event = await mongo_db[EVENTS].find_one({"_id": "dg-req-1"})
+    assert "payload" not in event
+    assert event["payload_size"] == len(body)
+    assert event["payload_sha256"] == hashlib.sha256(body).hexdigest()
+    # The retry's copy was removed
+    assert [p.name for p in tmp_path.rglob("*.json")] == [event["payload_key"].rsplit("/", 1)[-1]]
+
+    await process_transcription_result({"interview_id": INTERVIEW_ID, "event_id": "dg-req-1"})
+
+    assert (await mongo_db["interviews"].find_one({}))["status"] == "analysing"
+
+
+@pytest.mark.asyncio
+async def test_retried_webhook_is_dropped(client, mongo_db):
+    body = json.dumps(PAYLOAD).encode()
+
+    for _ in range(3):
+        assert (await post_webhook(client, body)).status_code == 200
+
+    assert await mongo_db[EVENTS].count_documents({}) == 1
+    assert await mongo_db[JOBS].count_documents({}) == 1
+
+
+@pytest.mark.asyncio
+async def test_webhook_rejects_bad_signature(client, mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "DEEPGRAM_WEBHOOK_SECRET", "s3cret")
+    body = json.dumps(PAYLOAD).encode()
+
+    bad = await post_webhook(client, body, {"x-dg-signature": "0" * 64})
+    good = await post_webhook(
+        client, body, {"x-dg-signature": hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()}
+    )
+
+    assert bad.status_code == 401
+    assert good.status_code == 200
+    assert await mongo_db[EVENTS].count_documents({}) == 1
+
+
+@pytest.mark.asyncio
+async def test_processing_saves_transcript_and_queues_analysis(client, mongo_db):
+    await mongo_db["interviews"].insert_one(
+        {"_id": ObjectId(INTERVIEW_ID), "user_id": "u1", "status": "transcribing", "deepgram_job_id": "dg-req-1"}
+    )
+    await post_webhook(client, json.dumps(PAYLOAD).encode())
+
+    await process_transcription_result({"interview_id": INTERVIEW_ID, "event_id": "dg-req-1"})
+    # A second run (e.g. after a lost lease) is a no-op
+    await process_transcription_result({"interview_id": INTERVIEW_ID, "event_id": "dg-req-1"})
+
+    doc = await mongo_db["interviews"].find_one({})
+    assert doc["status"] == "analysing"
+    assert doc["transcript_summary"] == {"language_code": "en", "confidence": 0.98, "word_count": 1, "utterance_count": 1}
+    assert doc["duration_seconds"] == 6.0
+    stored = await mongo_db[TRANSCRIPTS].find_one({"_id": ObjectId(INTERVIEW_ID)})
+    assert stored["text"] == "Tell me about yourself."
+    assert stored["words"]["format"] == "columnar-v3"
+    assert (await load_transcript(mongo_db, ObjectId(INTERVIEW_ID), ["words"]))["words"][0]["start_ms"] == 500
+    assert (await mongo_db[EVENTS].find_one({}))["processed_at"] is not None
+    assert [job["kind"] async for job in mongo_db[JOBS].find({"kind": "analyse"})] == ["analyse"]
+
+
+@pytest.mark.asyncio
+async def test_processing_marks_unparseable_payload_failed(client, mongo_db):
+    await mongo_db["interviews"].insert_one(
+        {"_id": ObjectId(INTERVIEW_ID), "user_id": "u1", "status": "transcribing", "deepgram_job_id": "dg-bad"}
+    )
+    await post_webhook(client, b'{"metadata": {"request_id": "dg-bad"}, "results": {"channels": "nope"}}')
+
+    await process_transcription_result({"interview_id": INTERVIEW_ID, "event_id": "dg-bad"})
+
+    doc = await mongo_db["interviews"].find_one({})
+    assert doc["status"] == "failed"
+    assert doc["error_message"] == "Failed to parse transcription result."
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("interview", [
+    # Resubmitted by the sweeper: the callback is for the abandoned job
+    {"status": "transcribing", "deepgram_job_id": "dg-req-2", "superseded_job_ids": ["dg-req-1"]},
+    # Already transcribed from another callback; a second analysis must not be queued
+    {"status": "completed", "deepgram_job_id": "dg-req-1"},
+])
+async def test_late_callback_is_dropped(client, mongo_db, interview):
+    await mongo_db["interviews"].insert_one({"_id": ObjectId(INTERVIEW_ID), "user_id": "u1", **interview})
+    await post_webhook(client, json.dumps(PAYLOAD).encode())
+
+    await process_transcription_result({"interview_id": INTERVIEW_ID, "event_id": "dg-req-1"})
+
+    assert (await mongo_db["interviews"].find_one({}))["status"] == interview["status"]
+    assert await mongo_db[TRANSCRIPTS].count_documents({}) == 0
+    assert await mongo_db[JOBS].count_documents({"kind": "analyse"}) == 0
+    assert (await mongo_db[EVENTS].find_one({}))["processed_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_callback_ahead_of_its_job_id_waits(client, mongo_db):
+    from app.services.jobs import Deferred
+
+    # Deepgram answered before submit_transcription stored the id
+    await mongo_db["interviews"].insert_one({"_id": ObjectId(INTERVIEW_ID), "user_id": "u1", "status": "queued"})
+    await post_webhook(client, json.dumps(PAYLOAD).encode())
+
+    with pytest.raises(Deferred):
+        await process_transcription_result({"interview_id": INTERVIEW_ID, "event_id": "dg-req-1"})
+
+    await mongo_db["interviews"].update_one({}, {"$set": {"status": "transcribing", "deepgram_job_id": "dg-req-1"}})
+    await process_transcription_result({"interview_id": INTERVIEW_ID, "event_id": "dg-req-1"})
+    assert (await mongo_db["interviews"].find_one({}))["status"] == "analysing"
+
+
+def test_request_id_found_without_parsing_the_transcript():
+    body = b'{"metadata": {"request_id": "abc-123"}, "results": ' + b"[" * 100_000
+    assert extract_request_id(body) == "abc-123"
+
+    nested_late = json.dumps({"results": {"x": "y" * 5000}, "metadata": {"request_id": "late"}}).encode()
+    assert extract_request_id(nested_late) == "late"
+
+    assert extract_request_id(b"{}").startswith("sha256:")
+
+
+@pytest.mark.asyncio
+async def test_interview_response_expands_stored_words(client, mongo_db, auth_headers):
+    await mongo_db["interviews"].insert_one(
+        {"_id": ObjectId(INTERVIEW_ID), "user_id": "test-user-id", "status": "transcribing", "deepgram_job_id": "dg-req-1"}
+    )
+    await post_webhook(client, json.dumps(PAYLOAD).encode())
+    await process_transcription_result({"interview_id": INTERVIEW_ID, "event_id": "dg-req-1"})
+
+    summary = await client.get(f"/api/v1/interviews/{INTERVIEW_ID}", headers=auth_headers)
+    response = await client.get(f"/api/v1/interviews/{INTERVIEW_ID}?include=transcript", headers=auth_headers)
+
+    assert "transcript" not in summary.json()["data"]
+    assert summary.json()["data"]["transcript_summary"]["word_count"] == 1
+    assert response.json()["data"]["transcript"]["words"] == [
+        {"text": "Tell", "start_ms": 500, "end_ms": 800, "confidence": 0.988, "speaker": "A"},
+    ]
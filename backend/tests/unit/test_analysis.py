@@ -10,15 +10,20 @@ def make_mock_interview(has_transcript=True, has_analysis=False, template_id=Non
         "user_id": "test-user-id",
         "status": "analysing",
         "template_id": template_id,
-        "transcript": {
-            "text": "Interviewer: Tell me about yourself. Candidate: I have five years of Python experience.",
-            "words": [],
-            "utterances": [],
-        } if has_transcript else None,
+        "transcript_summary": {"language_code": "en", "confidence": 0.9, "word_count": 0, "utterance_count": 0}
+        if has_transcript else None,
         "ai_analysis": {"summary": "existing"} if has_analysis else None,
     }
 
 
+def make_mock_transcript():
+    """The interview's document in the transcripts collection."""
+    return {
+        "_id": "mock-interview-id",
+        "text": "Interviewer: Tell me about yourself. Candidate: I have five years of Python experience.",
+    }
+
+
 def make_mock_openai_response(content: dict):
     mock_response = MagicMock()
     mock_response.choices = [MagicMock()]
@@ -63,7 +68,7 @@ async def test_run_analysis_completes_successfully():
     mock_db.__getitem__ = MagicMock(return_value=MagicMock(
         find_one=AsyncMock(side_effect=[
             make_mock_interview(),
-            None,
+            make_mock_transcript(),
         ]),
         update_one=AsyncMock(),
     ))
@@ -144,7 +149,7 @@ async def test_run_analysis_marks_failed_on_openai_error():
          patch("app.services.analysis.manager") as mock_manager:
 
         mock_db = MagicMock()
-        mock_db["interviews"].find_one = AsyncMock(return_value=make_mock_interview())
+        mock_db["interviews"].find_one = AsyncMock(side_effect=[make_mock_interview(), make_mock_transcript()])
         mock_db["interviews"].update_one = AsyncMock()
         mock_get_db.return_value = mock_db
 
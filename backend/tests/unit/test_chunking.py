@@ -0,0 +1,125 @@
+import pytest
+
+from app.services.chunking import plan_segments, stitch_segments
+from app.services.transcription import DeepgramService
+
+VOCABULARY = ["so", "I", "think", "the", "team", "shipped", "it"]
+
+
+def conversation(n_words: int, gap: tuple[int, int] | None = None) -> list[dict]:
+    """A word a second from 0.5s, speakers taking turns every 8 words. No words start within gap."""
+    words = []
+    for i in range(n_words):
+        start = 500 + i * 1000
+        if gap and gap[0] <= start < gap[1]:
+            continue
+        words.append({"text": VOCABULARY[i % len(VOCABULARY)], "start_ms": start, "end_ms": start + 700, "speaker": (i // 8) % 2})
+    return words
+
+
+def segment_payload(words: list[dict], first_ms: int, last_ms: int, swap: bool, jitter_ms: int = 0) -> dict:
+    """What Deepgram would send for the audio between first_ms and last_ms, with its own speaker numbering."""
+    dg_words = [
+        {
+            "word":            w["text"],
+            "punctuated_word": w["text"],
+            "start":           (w["start_ms"] - first_ms + jitter_ms) / 1000,
+            "end":             (w["end_ms"] - first_ms + jitter_ms) / 1000,
+            "confidence":      0.9,
+            "speaker":         1 - w["speaker"] if swap else w["speaker"],
+        }
+        for w in words if first_ms <= w["start_ms"] < last_ms
+    ]
+    utterances = []
+    for w in dg_words:
+        # Deepgram starts a new utterance after a pause too
+        if utterances and utterances[-1]["speaker"] == w["speaker"] and w["start"] - utterances[-1]["end"] < 1:
+            utterances[-1]["transcript"] += f" {w['punctuated_word']}"
+            utterances[-1]["end"] = w["end"]
+        else:
+            utterances.append({"speaker": w["speaker"], "transcript": w["punctuated_word"], "start": w["start"], "end": w["end"]})
+    return {
+        "metadata": {"duration": (last_ms - first_ms) / 1000},
+        "results":  {
+            "channels":   [{"alternatives": [{"transcript": "", "confidence": 0.9, "words": dg_words}]}],
+            "utterances": utterances,
+        },
+    }
+
+
+async def transcribe_in_segments(words: list[dict], points: list[int], total_ms: int, overlap_ms: int = 3000) -> dict:
+    # One "sample" per millisecond keeps the arithmetic readable
+    plan = plan_segments(points, [(0, total_ms)], total_ms, 1000, overlap_ms)
+    service = DeepgramService()
+    try:
+        results = []
+        for n, segment in enumerate(plan):
+            first, last = segment["spans"][0][0], segment["spans"][-1][1]
+            payload = segment_payload(words, first, last, swap=n % 2 == 1, jitter_ms=40 * n)
+            parsed = await service.parse_webhook(payload, offset_map=segment["offset_map"])
+            results.append({**segment, **parsed})
+    finally:
+        await service.close()
+    return stitch_segments(results)
+
+
+def test_plan_overlaps_segments_and_maps_them_back():
+    plan = plan_segments([20_000, 40_000], [(0, 60_000)], 60_000, 1000, overlap_ms=3000)
+
+    assert [(s["start_ms"], s["end_ms"]) for s in plan] == [(0, 20_000), (20_000, 40_000), (40_000, 60_000)]
+    assert [s["spans"] for s in plan] == [[(0, 23_000)], [(17_000, 43_000)], [(37_000, 60_000)]]
+    assert plan[0]["offset_map"] is None
+    assert plan[1]["offset_map"] == [[0, 17_000], [26_000, 43_000]]
+
+
+def test_plan_keeps_only_the_trimmed_audio():
+    # Silence trimming cut 25-35s; the middle segment is encoded from the two spans around it
+    plan = plan_segments([20_000, 40_000], [(0, 25_000), (35_000, 60_000)], 60_000, 1000, overlap_ms=3000)
+
+    assert plan[1]["spans"] == [(17_000, 25_000), (35_000, 43_000)]
+    assert plan[1]["offset_map"] == [[0, 17_000], [8000, 35_000], [16_000, 43_000]]
+
+
+@pytest.mark.asyncio
+async def test_stitched_segments_match_the_whole_recording():
+    words = conversation(60)
+
+    stitched = (await transcribe_in_segments(words, [20_000, 40_000], 60_000))["transcript"]
+
+    # Each overlap kept once, on the recording's timeline
+    assert [w["text"] for w in stitched["words"]] == [w["text"] for w in words]
+    assert [w["start_ms"] for w in stitched["words"]] == pytest.approx([w["start_ms"] for w in words], abs=100)
+    # The middle segment numbered its speakers the other way round
+    assert [w["speaker"] for w in stitched["words"]] == ["AB"[w["speaker"]] for w in words]
+    assert [u["speaker"] for u in stitched["utterances"]] == list("ABABABAB")
+    assert " ".join(u["text"] for u in stitched["utterances"]) == stitched["text"]
+    assert stitched["text"] == " ".join(w["text"] for w in words)
+
+
+@pytest.mark.asyncio
+async def test_speaker_continues_across_a_split_in_silence():
+    # Speaker B (words 8-15) pauses from 11s to 14s, and the split and its overlap fall in the pause
+    words = conversation(32, gap=(11_000, 14_000))
+
+    stitched = (await transcribe_in_segments(words, [12_500], 32_000, overlap_ms=1000))["transcript"]
+
+    assert [w["text"] for w in stitched["words"]] == [w["text"] for w in words]
+    assert [w["speaker"] for w in stitched["words"]] == ["AB"[w["speaker"]] for w in words]
+    assert [u["speaker"] for u in stitched["utterances"]] == list("ABBAB")
+
+
+def test_single_segment_is_unchanged():
+    transcript = {
+        "text":          "Tell me",
+        "words":         [
+            {"text": "Tell", "start_ms": 0,   "end_ms": 300, "confidence": 0.9, "speaker": "A"},
+            {"text": "me",   "start_ms": 300, "end_ms": 500, "confidence": 0.9, "speaker": "A"},
+        ],
+        "utterances":    [{"speaker": "A", "text": "Tell me", "start_ms": 0, "end_ms": 500, "sentiment": None}],
+        "language_code": "en",
+        "confidence":    0.9,
+    }
+
+    stitched = stitch_segments([{"start_ms": 0, "end_ms": 500, "transcript": transcript, "duration_seconds": 0.5}])
+
+    assert stitched == {"transcript": transcript, "duration_seconds": 0.5}
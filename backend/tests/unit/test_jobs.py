@@ -0,0 +1,194 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from unittest.mock import AsyncMock
+
+from app.core.config import settings
+from app.services import jobs
+from app.services.jobs import JobWorker, enqueue, lease
+from app.services.pipeline import mark_job_failed
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 10.0)
+
+
+async def make_due(db) -> None:
+    # Skip the backoff wait
+    await db[jobs.COLLECTION].update_many({}, {"$set": {"run_at": datetime.now(timezone.utc)}})
+
+
+@pytest.mark.asyncio
+async def test_keyed_jobs_are_enqueued_once_until_finished(mongo_db):
+    first = await enqueue(mongo_db, "analyse", {"interview_id": "a"}, key="analyse:a")
+    assert first is not None
+    assert await enqueue(mongo_db, "analyse", {"interview_id": "a"}, key="analyse:a") is None
+
+    job = await lease(mongo_db, ["analyse"])
+    await jobs.complete(mongo_db, job)
+
+    assert await enqueue(mongo_db, "analyse", {"interview_id": "a"}, key="analyse:a") is not None
+
+
+@pytest.mark.asyncio
+async def test_lease_is_exclusive_until_it_expires(mongo_db):
+    await enqueue(mongo_db, "analyse", {"interview_id": "a"})
+
+    job = await lease(mongo_db, ["analyse"])
+    assert job["status"] == "running" and job["attempts"] == 1
+    assert await lease(mongo_db, ["analyse"]) is None
+    assert await lease(mongo_db, ["transcribe"]) is None
+
+    # The worker holding it died — once the lease runs out another worker takes over
+    await mongo_db[jobs.COLLECTION].update_one(
+        {"_id": job["_id"]},
+        {"$set": {"lease_expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}},
+    )
+    retaken = await lease(mongo_db, ["analyse"])
+    assert retaken["attempts"] == 2
+    assert retaken["lease_id"] != job["lease_id"]
+
+    # The old holder can no longer finish it
+    await jobs.complete(mongo_db, job)
+    assert await mongo_db[jobs.COLLECTION].count_documents({}) == 1
+
+
+def test_retry_delay_backs_off_exponentially(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_MAX_SECONDS", 60.0)
+    assert [jobs.retry_delay(n) for n in range(1, 6)] == [10.0, 20.0, 40.0, 60.0, 60.0]
+
+
+@pytest.mark.asyncio
+async def test_failing_job_is_retried_then_dead_lettered(mongo_db):
+    await enqueue(mongo_db, "analyse", {"interview_id": "a"}, key="analyse:a")
+    handler = AsyncMock(side_effect=RuntimeError("model overloaded"))
+    on_dead = AsyncMock()
+    worker = JobWorker({"analyse": handler}, {"analyse": 1}, on_dead=on_dead)
+
+    job = await lease(mongo_db, ["analyse"])
+    before = datetime.now(timezone.utc)
+    await worker.run_job(mongo_db, job)
+
+    stored = await mongo_db[jobs.COLLECTION].find_one({})
+    assert stored["status"] == "pending"
+    assert stored["last_error"] == "model overloaded"
+    assert stored["run_at"].replace(tzinfo=timezone.utc) >= before + timedelta(seconds=9)
+    assert await lease(mongo_db, ["analyse"]) is None  # not due yet
+
+    for _ in range(2):
+        await make_due(mongo_db)
+        await worker.run_job(mongo_db, await lease(mongo_db, ["analyse"]))
+
+    stored = await mongo_db[jobs.COLLECTION].find_one({})
+    assert stored["status"] == "dead"
+    assert "active_key" not in stored
+    assert handler.await_count == 3
+    on_dead.assert_awaited_once()
+    assert on_dead.await_args.args[0]["last_error"] == "model overloaded"
+
+
+@pytest.mark.asyncio
+async def test_deferred_job_waits_without_using_an_attempt(mongo_db):
+    await enqueue(mongo_db, "transcribe", {"interview_id": "a"}, key="transcribe:a")
+    worker = JobWorker({"transcribe": AsyncMock(side_effect=jobs.Deferred(30))}, {"transcribe": 1})
+
+    before = datetime.now(timezone.utc)
+    await worker.run_job(mongo_db, await lease(mongo_db, ["transcribe"]))
+
+    stored = await mongo_db[jobs.COLLECTION].find_one({})
+    assert stored["status"] == "pending"
+    assert stored["attempts"] == 0
+    assert stored["run_at"].replace(tzinfo=timezone.utc) >= before + timedelta(seconds=29)
+    assert await lease(mongo_db, ["transcribe"]) is None
+
+    await jobs.run_now(mongo_db, "transcribe:a")
+    assert await lease(mongo_db, ["transcribe"]) is not None
+
+
+@pytest.mark.asyncio
+async def test_worker_drains_queue_with_bounded_concurrency(mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_POLL_INTERVAL_SECONDS", 0.01)
+    for i in range(6):
+        await enqueue(mongo_db, "analyse", {"interview_id": str(i)})
+    active = peak = 0
+    done = []
+
+    async def handler(payload):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        done.append(payload["interview_id"])
+
+    worker = JobWorker({"analyse": handler}, {"analyse": 2})
+    worker.start()
+    while len(done) < 6:
+        await asyncio.sleep(0.01)
+    await worker.stop(grace=1)
+
+    assert sorted(done) == [str(i) for i in range(6)]
+    assert peak == 2
+    assert await mongo_db[jobs.COLLECTION].count_documents({}) == 0
+
+
+@pytest.mark.asyncio
+async def test_each_kind_has_its_own_slots(mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_POLL_INTERVAL_SECONDS", 0.01)
+    for i in range(3):
+        await enqueue(mongo_db, "analyse", {"interview_id": str(i)})
+    await enqueue(mongo_db, "transcribe", {"interview_id": "t"})
+    release_analysis = asyncio.Event()
+    transcribed = asyncio.Event()
+
+    async def slow_analysis(payload):
+        await release_analysis.wait()
+
+    async def transcribe(payload):
+        transcribed.set()
+
+    worker = JobWorker({"analyse": slow_analysis, "transcribe": transcribe}, {"analyse": 1, "transcribe": 1})
+    worker.start()
+    # The analysis backlog doesn't hold up transcription
+    await asyncio.wait_for(transcribed.wait(), 1)
+    release_analysis.set()
+    await worker.stop(grace=1)
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_running_jobs_then_releases_stragglers(mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_POLL_INTERVAL_SECONDS", 0.01)
+    await enqueue(mongo_db, "analyse", {"interview_id": "quick"})
+    await enqueue(mongo_db, "analyse", {"interview_id": "stuck"})
+    started = []
+
+    async def handler(payload):
+        started.append(payload["interview_id"])
+        await asyncio.sleep(0.05 if payload["interview_id"] == "quick" else 60)
+
+    worker = JobWorker({"analyse": handler}, {"analyse": 2})
+    worker.start()
+    while len(started) < 2:
+        await asyncio.sleep(0.01)
+    await worker.stop(grace=0.2)
+
+    # The quick job finished within the grace period; the stuck one went back to the queue, attempt uncounted
+    remaining = await mongo_db[jobs.COLLECTION].find({}).to_list(None)
+    assert [(j["payload"]["interview_id"], j["status"], j["attempts"]) for j in remaining] == [("stuck", "pending", 0)]
+    assert (await lease(mongo_db, ["analyse"]))["payload"]["interview_id"] == "stuck"
+
+
+@pytest.mark.asyncio
+async def test_dead_letter_hook_marks_interview_failed(mongo_db):
+    oid = ObjectId()
+    await mongo_db["interviews"].insert_one({"_id": oid, "user_id": "user-1", "status": "analysing"})
+
+    await mark_job_failed({"kind": "analyse", "payload": {"interview_id": str(oid)}, "last_error": "timeout"})
+
+    doc = await mongo_db["interviews"].find_one({"_id": oid})
+    assert doc["status"] == "failed"
+    assert doc["error_message"] == "AI analysis failed: timeout"
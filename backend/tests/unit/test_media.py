@@ -0,0 +1,156 @@
+import struct
+
+import pytest
+
+from app.services.media import MediaTypeMismatchError, check_content_type, probe, sniff_container
+
+MP3_FRAME = b"\xff\xfb\x90\x00"  # MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo
+ID3_HEADER = b"ID3\x04\x00\x00\x00\x00\x00\x00"
+
+
+def box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", 8 + len(payload)) + box_type + payload
+
+
+def ebml(element_id: bytes, payload: bytes) -> bytes:
+    return element_id + bytes([0x80 | len(payload)]) + payload
+
+
+def ogg_page(granule: int, packet: bytes) -> bytes:
+    return b"OggS" + struct.pack("<BBqIIIB", 0, 0, granule, 1, 0, 0, 1) + bytes([len(packet)]) + packet
+
+
+# Sniffing
+
+@pytest.mark.parametrize("head,container", [
+    (ID3_HEADER, "mp3"),
+    (MP3_FRAME, "mp3"),
+    (b"RIFF\x00\x00\x00\x00WAVE", "wav"),
+    (b"\x00\x00\x00\x18ftypisom", "mp4"),
+    (b"\x00\x00\x00\x08wide\x00\x00\x10\x00mdat", "mp4"),
+    (b"\x00\x00\x10\x00mdat", "mp4"),
+    (b"\x00\x00\x00\x6cmoov", "mp4"),
+    (b"\x00\x00\x00\x08free", "mp4"),
+    (b"OggS\x00\x02", "ogg"),
+    (b"\x1a\x45\xdf\xa3\x9f", "webm"),
+    (b"%PDF-1.7", None),
+])
+def test_sniff_container(head, container):
+    assert sniff_container(head) == container
+
+
+def test_sniff_mp3_past_leading_padding():
+    # Two whole 417-byte frames after junk that holds a lone sync word
+    frames = (MP3_FRAME + b"\x00" * 413) * 2
+    padded = b"\x00" * 700 + b"\xff\xfb\x90\x00" + b"\x00" * 300 + frames
+
+    assert sniff_container(padded) == "mp3"
+    assert probe(padded, padded[-128:], len(padded))["sample_rate"] == 44100
+    # A frame header that no second one follows is not enough
+    assert sniff_container(b"\x00" * 700 + MP3_FRAME + b"\x00" * 2000) is None
+
+
+def test_check_content_type_accepts_matching_family():
+    assert check_content_type(b"\x00\x00\x00\x18ftypqt  ", "video/quicktime") == "mp4"
+    # Upload chunks arrive as a bytearray
+    assert check_content_type(bytearray(b"\x00\x00\x00\x08wide"), "video/quicktime") == "mp4"
+    assert check_content_type(b"RIFF\x00\x00\x00\x00WAVE", "audio/x-wav") == "wav"
+
+
+def test_check_content_type_rejects_mislabelled_file():
+    with pytest.raises(MediaTypeMismatchError):
+        check_content_type(b"OggS\x00\x02", "audio/mpeg")
+    with pytest.raises(MediaTypeMismatchError):
+        check_content_type(b"%PDF-1.7", "audio/mpeg")
+
+
+# Probing
+
+def test_probe_mp3_vbr_uses_xing_frame_count():
+    xing = b"Xing" + struct.pack(">II", 0x1, 1000)
+    head = ID3_HEADER + MP3_FRAME + b"\x00" * 32 + xing + b"\x00" * 400
+    info = probe(head, head[-128:], 5_000_000)
+    assert info["codec"] == "mp3"
+    assert info["sample_rate"] == 44100
+    assert info["channels"] == 2
+    assert info["duration_seconds"] == round(1000 * 1152 / 44100, 3)
+
+
+def test_probe_mp3_cbr_estimates_from_size_and_skips_id3v1():
+    size = 4 + 160_000 + 128
+    head = MP3_FRAME + b"\x00" * 1000
+    tail = b"\x00" * 200 + b"TAG" + b"\x00" * 125
+    assert probe(head, tail, size)["duration_seconds"] == 10.0
+
+
+def mp4_moov(duration_ms: int) -> bytes:
+    mvhd = box(b"mvhd", struct.pack(">IIIII", 0, 0, 0, 1000, duration_ms) + b"\x00" * 80)
+    hdlr = box(b"hdlr", struct.pack(">II4s", 0, 0, b"soun") + b"\x00" * 12)
+    mp4a = box(b"mp4a", b"\x00" * 6 + struct.pack(">H", 1) + b"\x00" * 8 + struct.pack(">HHHHI", 1, 16, 0, 0, 16000 << 16))
+    stsd = box(b"stsd", struct.pack(">II", 0, 1) + mp4a)
+    trak = box(b"trak", box(b"mdia", hdlr + box(b"minf", box(b"stbl", stsd))))
+    return box(b"moov", mvhd + trak)
+
+
+def test_probe_mp4_reads_moov_from_tail():
+    moov = mp4_moov(93_500)
+
+    # ftyp, then 10MB of mdat, then moov
+    head = box(b"ftyp", b"M4A \x00\x00\x00\x00") + struct.pack(">I4s", 10_000_000 - 16, b"mdat") + b"\x00" * 100
+    info = probe(head, b"\x00" * 300 + moov, 10_000_000 + len(moov))
+    assert info == {
+        "container":        "mp4",
+        "codec":            "aac",
+        "duration_seconds": 93.5,
+        "sample_rate":      16000,
+        "channels":         1,
+    }
+
+
+def test_probe_mp4_follows_box_sizes_past_moov_bytes_in_media_data():
+    moov = mp4_moov(61_000)
+    # A QuickTime file without ftyp whose media data happens to contain "moov"
+    head = box(b"wide", b"") + struct.pack(">I4s", 1_000_000 - 8, b"mdat") + mp4_moov(5) + b"\x00" * 200
+    tail = b"\x00" * 50 + moov
+
+    info = probe(head, tail, 1_000_000 + len(moov))
+
+    assert info["container"] == "mp4"
+    assert info["duration_seconds"] == 61.0
+    assert info["codec"] == "aac"
+
+
+def test_probe_ogg_opus_uses_last_granule_minus_pre_skip():
+    opus_head = b"OpusHead" + struct.pack("<BBHIhB", 1, 2, 312, 48000, 0, 0)
+    head = ogg_page(0, opus_head)
+    tail = b"\x00" * 50 + ogg_page(48000 * 5 + 312, b"\x00" * 10)
+    info = probe(head, tail, 80_000)
+    assert info["codec"] == "opus"
+    assert info["channels"] == 2
+    assert info["duration_seconds"] == 5.0
+
+
+def test_probe_webm_reads_info_and_audio_track():
+    header = ebml(b"\x1a\x45\xdf\xa3", ebml(b"\x42\x82", b"webm"))
+    info_el = ebml(b"\x15\x49\xa9\x66",
+        ebml(b"\x2a\xd7\xb1", (1_000_000).to_bytes(3, "big"))
+        + ebml(b"\x44\x89", struct.pack(">d", 12_345.0))
+    )
+    audio = ebml(b"\xe1", ebml(b"\xb5", struct.pack(">d", 48000.0)) + ebml(b"\x9f", b"\x01"))
+    track = ebml(b"\xae", ebml(b"\x83", b"\x02") + ebml(b"\x86", b"A_OPUS") + audio)
+    tracks = ebml(b"\x16\x54\xae\x6b", track)
+    # Live recordings write the Segment with an unknown size
+    segment = b"\x18\x53\x80\x67" + b"\x01" + b"\xff" * 7 + info_el + tracks + b"\x1f\x43\xb6\x75\x81\x00"
+
+    info = probe(header + segment, b"", 100_000)
+    assert info["duration_seconds"] == 12.345
+    assert info["codec"] == "opus"
+    assert info["sample_rate"] == 48000
+    assert info["channels"] == 1
+
+
+def test_probe_tolerates_truncated_headers():
+    info = probe(b"RIFF\x00\x00\x00\x00WAVEfmt \x10\x00", b"", 1000)
+    assert info["container"] == "wav"
+    assert info["duration_seconds"] is None
+    assert probe(b"%PDF-1.7", b"", 1000) is None
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.metrics_snapshots import COLLECTION, PROCESS_ID, publish_metrics, recent_snapshots
+
+
+@pytest.mark.asyncio
+async def test_published_metrics_are_listed_per_process(mongo_db):
+    metrics.reset()
+    metrics.observe("deepgram.submit", 0.25)
+    metrics.set_gauge("pipeline.stuck.queued", 3)
+    metrics.incr("storage_gc.bytes_reclaimed", 4096)
+    await publish_metrics("worker")
+    # A process that stopped publishing an hour ago
+    await mongo_db[COLLECTION].insert_one({
+        "_id": "old-host:1", "role": "worker", "timings": [], "gauges": [], "counters": [],
+        "updated_at": datetime.now(timezone.utc) - timedelta(hours=1),
+    })
+
+    snapshots = await recent_snapshots(mongo_db)
+
+    assert [(s["process"], s["role"]) for s in snapshots] == [(PROCESS_ID, "worker")]
+    assert snapshots[0]["timings"]["deepgram.submit"]["count"] == 1
+    assert snapshots[0]["timings"]["deepgram.submit"]["max_ms"] == 250.0
+    assert snapshots[0]["gauges"] == {"pipeline.stuck.queued": 3}
+    assert snapshots[0]["counters"] == {"storage_gc.bytes_reclaimed": 4096}
+    metrics.reset()
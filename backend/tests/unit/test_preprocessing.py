@@ -0,0 +1,237 @@
+import os
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core.config import settings
+from app.models.interview import new_interview_document
+from app.services import preprocessing
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIO_PREPROCESS_ENABLED", True)
+
+
+class RecordingStorage:
+    def __init__(self):
+        self.uploaded = {}
+        self.delete = AsyncMock()
+
+    async def presigned_url(self, storage_key, expires_in=3600):
+        return f"https://storage.test/{storage_key}"
+
+    async def upload_stream(self, chunks, filename, content_type):
+        data = b"".join([chunk async for chunk in chunks])
+        key = f"interviews/compact-{len(self.uploaded) + 1}.ogg"
+        self.uploaded[key] = (data, content_type)
+        return key
+
+
+@pytest.fixture
+def storage():
+    backend = RecordingStorage()
+    with patch("app.services.preprocessing.get_storage_backend", return_value=backend):
+        yield backend
+
+
+async def fake_process_audio(source, workdir, encode, waveform):
+    if encode:
+        with open(os.path.join(workdir, preprocessing.COMPACT_FILENAME), "wb") as f:
+            f.write(b"OggS" + b"\x00" * 96)
+    return {
+        "size":        100 if encode else None,
+        "offset_map":  None,
+        "duration_ms": 4000,
+        "waveform":    [(256, b"\x00\x01" * 250), (1024, b"\x00\x01" * 63)] if waveform else None,
+        "segments":    None,
+    }
+
+
+async def insert_video(db, storage_key="interviews/panel.mp4") -> str:
+    document = new_interview_document("user-1", "Panel", "panel.mp4", storage_key, 50_000_000, "video/mp4")
+    result = await db["interviews"].insert_one(document)
+    return str(result.inserted_id)
+
+
+def test_ffmpeg_command_extracts_mono_16khz_opus():
+    command = preprocessing.ffmpeg_command("https://storage.test/a.mp4", "/tmp/out.ogg")
+    assert command[command.index("-i") + 1] == "https://storage.test/a.mp4"
+    assert command[command.index("-ac") + 1] == "1"
+    assert command[command.index("-ar") + 1] == "16000"
+    assert command[command.index("-c:a") + 1] == "libopus"
+    assert "-vn" in command
+    assert command[-1] == "/tmp/out.ogg"
+
+
+@pytest.mark.asyncio
+async def test_compaction_stores_audio_copy_under_its_own_key(mongo_db, storage):
+    interview_id = await insert_video(mongo_db)
+
+    with patch("app.services.preprocessing.process_audio", side_effect=fake_process_audio) as process_audio:
+        key = await preprocessing.preprocess_interview(interview_id)
+
+    assert process_audio.call_args.args[0] == "https://storage.test/interviews/panel.mp4"
+    assert storage.uploaded[key] == (b"OggS" + b"\x00" * 96, "audio/ogg")
+    doc = await mongo_db["interviews"].find_one({})
+    assert doc["storage_key"] == "interviews/panel.mp4"
+    assert doc["audio_storage_key"] == key
+    assert doc["audio_file_size"] == 100
+
+
+@pytest.mark.asyncio
+async def test_compaction_reuses_copy_from_duplicate_upload(mongo_db, storage):
+    first = await insert_video(mongo_db)
+    second = await insert_video(mongo_db)
+
+    with patch("app.services.preprocessing.process_audio", side_effect=fake_process_audio) as process_audio:
+        key = await preprocessing.preprocess_interview(first)
+        assert await preprocessing.preprocess_interview(second) == key
+
+    assert process_audio.await_count == 1
+    docs = await mongo_db["interviews"].find({}).to_list(None)
+    assert {d["audio_storage_key"] for d in docs} == {key}
+
+
+@pytest.mark.asyncio
+async def test_compaction_failure_leaves_original(mongo_db, storage):
+    interview_id = await insert_video(mongo_db)
+
+    with patch("app.services.preprocessing.process_audio", side_effect=RuntimeError("no audio stream")):
+        assert await preprocessing.preprocess_interview(interview_id) is None
+
+    doc = await mongo_db["interviews"].find_one({})
+    assert doc["audio_storage_key"] is None
+    assert storage.uploaded == {}
+
+
+@pytest.mark.asyncio
+async def test_compaction_skips_types_not_configured(mongo_db, storage):
+    document = new_interview_document("user-1", "Call", "call.mp3", "interviews/call.mp3", 1000, "audio/mpeg")
+    result = await mongo_db["interviews"].insert_one(document)
+
+    with patch("app.services.preprocessing.process_audio", side_effect=fake_process_audio) as process_audio:
+        assert await preprocessing.preprocess_interview(str(result.inserted_id)) is None
+    process_audio.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_preprocessing_stores_waveform_for_any_type(mongo_db, storage, monkeypatch):
+    monkeypatch.setattr(settings, "WAVEFORM_ENABLED", True)
+    document = new_interview_document("user-1", "Call", "call.mp3", "interviews/call.mp3", 1000, "audio/mpeg")
+    result = await mongo_db["interviews"].insert_one(document)
+
+    with patch("app.services.preprocessing.process_audio", side_effect=fake_process_audio) as process_audio:
+        assert await preprocessing.preprocess_interview(str(result.inserted_id)) is None
+        # Running again finds the stored peaks and skips the decode
+        await preprocessing.preprocess_interview(str(result.inserted_id))
+
+    assert process_audio.await_count == 1
+    assert process_audio.await_args.kwargs == {"encode": False, "waveform": True}
+    waveform = await mongo_db["waveforms"].find_one({"_id": "interviews/call.mp3"})
+    assert waveform["duration_ms"] == 4000
+    assert [level["samples_per_peak"] for level in waveform["levels"]] == [256, 1024]
+
+
+def test_worker_decodes_once_for_waveform(tmp_path, monkeypatch):
+    pcm = (np.arange(16000 * 2) % 200 - 100).astype("<i2")
+    commands = []
+
+    def fake_ffmpeg(command, timeout):
+        commands.append(command)
+        pcm.tofile(command[-1])
+
+    monkeypatch.setattr(preprocessing, "_run_ffmpeg", fake_ffmpeg)
+    result = preprocessing._process(
+        "https://storage.test/call.mp3", str(tmp_path), encode=False, timeout=60,
+        trim_silence=False, min_silence_ms=2000, padding_ms=300, waveform_levels=[256, 1024],
+    )
+
+    assert len(commands) == 1 and "s16le" in commands[0]
+    assert result["duration_ms"] == 2000
+    assert [(spp, len(data)) for spp, data in result["waveform"]] == [(256, 250), (1024, 64)]
+    assert not os.path.exists(tmp_path / "audio.pcm")
+
+
+def test_worker_splits_long_recording_at_a_pause(tmp_path, monkeypatch):
+    t = np.arange(16000) / 16000
+    speech = (8000 * np.sin(2 * np.pi * 220 * t)).astype("<i2")
+    # 1 s of speech, a 0.3 s pause, 1.2 s of speech
+    pcm = np.concatenate([speech, np.zeros(4800, dtype="<i2"), speech, speech[:3200]])
+    encoded = {}
+
+    def fake_encode(pcm_path, spans, output_path, timeout):
+        encoded[os.path.basename(output_path)] = spans
+        open(output_path, "wb").close()
+
+    monkeypatch.setattr(preprocessing, "_run_ffmpeg", lambda command, timeout: pcm.tofile(command[-1]))
+    monkeypatch.setattr(preprocessing, "_encode_segments", fake_encode)
+
+    result = preprocessing._process(
+        "https://storage.test/call.mp3", str(tmp_path), encode=True, timeout=60,
+        trim_silence=False, min_silence_ms=2000, padding_ms=300, waveform_levels=None,
+        chunking=(1000, 200, 400),
+    )
+
+    first, second = result["segments"]
+    assert 1000 <= first["end_ms"] == second["start_ms"] <= 1300
+    assert [first["file"], second["file"]] == ["segment-0.ogg", "segment-1.ogg"]
+    # Each reaches 200 ms into the other
+    split = second["start_ms"] * 16
+    assert encoded["segment-0.ogg"] == [(0, split + 3200)]
+    assert encoded["segment-1.ogg"] == [(split - 3200, len(pcm))]
+    assert second["offset_map"] == [[0, second["start_ms"] - 200], [2500 - second["start_ms"] + 200, 2500]]
+
+
+@pytest.mark.asyncio
+async def test_compaction_uploads_transcription_segments(mongo_db, storage):
+    interview_id = await insert_video(mongo_db)
+
+    async def chunked(source, workdir, encode, waveform):
+        result = await fake_process_audio(source, workdir, encode, waveform)
+        for n in range(2):
+            with open(os.path.join(workdir, f"segment-{n}.ogg"), "wb") as f:
+                f.write(b"OggS" + bytes([n]))
+        result["segments"] = [
+            {"file": "segment-0.ogg", "offset_map": None,                      "start_ms": 0,    "end_ms": 2000},
+            {"file": "segment-1.ogg", "offset_map": [[0, 1800], [2200, 4000]], "start_ms": 2000, "end_ms": 4000},
+        ]
+        return result
+
+    with patch("app.services.preprocessing.process_audio", side_effect=chunked):
+        await preprocessing.preprocess_interview(interview_id)
+
+    segments = (await mongo_db["interviews"].find_one({}))["audio_segments"]
+    assert [storage.uploaded[s["storage_key"]][0] for s in segments] == [b"OggS\x00", b"OggS\x01"]
+    assert segments[1] == {**segments[1], "offset_map": [[0, 1800], [2200, 4000]], "start_ms": 2000, "end_ms": 4000}
+    assert "file" not in segments[0]
+
+
+@pytest.mark.asyncio
+async def test_transcription_waits_for_the_preprocess_job(mongo_db, storage):
+    from app.services import jobs
+    from app.services.pipeline import HANDLERS
+
+    interview_id = await insert_video(mongo_db)
+    await preprocessing.schedule_preprocessing(mongo_db, {"_id": interview_id, "file_type": "video/mp4"})
+    await mongo_db["interviews"].update_one({}, {"$set": {"status": "queued"}})
+    await jobs.enqueue(mongo_db, "transcribe", {"interview_id": interview_id}, key=f"transcribe:{interview_id}")
+    worker = jobs.JobWorker(HANDLERS, {})
+
+    with patch("app.services.preprocessing.process_audio", side_effect=fake_process_audio), \
+         patch("app.services.pipeline.get_transcription_service") as service:
+        service.return_value.submit = AsyncMock(return_value="dg-1")
+
+        # Submitting now would send the 50MB video
+        await worker.run_job(mongo_db, await jobs.lease(mongo_db, ["transcribe"]))
+        service.return_value.submit.assert_not_awaited()
+
+        await worker.run_job(mongo_db, await jobs.lease(mongo_db, ["preprocess"]))
+        # Finishing preprocessing wakes the waiting transcribe job
+        await worker.run_job(mongo_db, await jobs.lease(mongo_db, ["transcribe"]))
+
+    doc = await mongo_db["interviews"].find_one({})
+    service.return_value.submit.assert_awaited_once_with(storage_key=doc["audio_storage_key"], interview_id=interview_id)
+    assert doc["status"] == "transcribing"
+    assert await mongo_db[jobs.COLLECTION].count_documents({}) == 0
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from app.services.silence import (
+    TimelineMapper,
+    build_offset_map,
+    quiet_split_points,
+    remap_transcript,
+    speech_segments,
+)
+
+RATE = 16000
+
+
+def tone(seconds: float, amplitude: int = 8000) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def hiss(seconds: float, amplitude: int = 30) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.integers(-amplitude, amplitude, int(seconds * RATE)).astype(np.int16)
+
+
+def test_long_silences_are_cut_with_padding():
+    # 10 s waiting room, 3 s of speech, 5 s pause, 2 s of speech
+    samples = np.concatenate([hiss(10), tone(3), hiss(5), tone(2)])
+    segments = speech_segments(samples, RATE, min_silence_ms=2000, padding_ms=300)
+
+    assert len(segments) == 2
+    (first_start, first_end), (second_start, second_end) = segments
+    assert first_start / RATE == pytest.approx(9.72, abs=0.05)
+    assert first_end / RATE == pytest.approx(13.3, abs=0.05)
+    assert second_start / RATE == pytest.approx(17.7, abs=0.05)
+    assert second_end == len(samples)
+
+
+def test_short_pauses_are_kept():
+    samples = np.concatenate([tone(2), hiss(1), tone(2)])
+    segments = speech_segments(samples, RATE, min_silence_ms=2000, padding_ms=300)
+    assert segments == [(0, len(samples))]
+    assert build_offset_map(segments, RATE, len(samples)) is None
+
+
+def test_splits_land_in_the_pause_nearest_each_target():
+    # Pauses at 8-9 s and 17.5-18.5 s; splits wanted every 10 s, looking 3 s either side
+    samples = np.concatenate([tone(8), hiss(1), tone(8.5), hiss(1), tone(8)])
+
+    points = quiet_split_points(samples, RATE, every_ms=10_000, search_ms=3000)
+
+    assert len(points) == 2
+    assert 8.0 <= points[0] / RATE <= 9.0
+    assert 17.5 <= points[1] / RATE <= 18.5
+    # A recording shorter than 1.5x the target stays whole
+    assert quiet_split_points(tone(14), RATE, every_ms=10_000, search_ms=3000) == []
+
+
+def test_offset_map_maps_trimmed_time_back_to_original():
+    # Keep 0-2 s and 5-8 s of a 10 s file
+    offset_map = build_offset_map([(0, 2 * RATE), (5 * RATE, 8 * RATE)], RATE, 10 * RATE)
+    assert offset_map == [[0, 0], [2000, 5000], [5000, 10000]]
+
+    to_original = TimelineMapper(offset_map)
+    assert to_original(1500) == 1500
+    assert to_original(2000) == 5000
+    assert to_original(2000, is_end=True) == 2000
+    assert to_original(3000) == 6000
+
+
+def test_remap_transcript_shifts_words_utterances_and_duration():
+    parsed = {
+        "transcript": {
+            "words":      [{"text": "hi", "start_ms": 2100, "end_ms": 2400}],
+            "utterances": [{"text": "hi", "start_ms": 1800, "end_ms": 2400}],
+        },
+        "duration_seconds": 5.0,
+    }
+    remap_transcript(parsed, [[0, 0], [2000, 5000], [5000, 10000]])
+
+    assert parsed["transcript"]["words"][0] == {"text": "hi", "start_ms": 5100, "end_ms": 5400}
+    assert parsed["transcript"]["utterances"][0]["start_ms"] == 1800
+    assert parsed["transcript"]["utterances"][0]["end_ms"] == 5400
+    assert parsed["duration_seconds"] == 10.0
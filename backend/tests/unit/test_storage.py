@@ -0,0 +1,217 @@
+import asyncio
+import time
+
+import boto3
+import httpx
+import pytest
+from moto import mock_aws
+from moto.server import ThreadedMotoServer
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services import storage as storage_module
+from app.services.storage import S3StorageBackend
+from app.services.uploads import FileTooLargeError, UploadStream
+
+BUCKET = "test-interviews"
+
+
+@pytest.fixture
+def s3_backend(monkeypatch):
+    monkeypatch.setattr(settings, "S3_ENDPOINT_URL", None)
+    monkeypatch.setattr(settings, "S3_ACCESS_KEY", "testing")
+    monkeypatch.setattr(settings, "S3_SECRET_KEY", "testing")
+    monkeypatch.setattr(settings, "S3_REGION", "us-east-1")
+    monkeypatch.setattr(settings, "S3_BUCKET_NAME", BUCKET)
+    # Keep parts small so multipart behaviour is exercised with little data
+    monkeypatch.setattr(storage_module, "MULTIPART_PART_SIZE", 5 * 1024 * 1024)
+
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        backend = S3StorageBackend()
+        yield backend
+        backend.close()
+
+
+class FakeUploadFile:
+    """Minimal stand-in for UploadFile.read(size)."""
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            size = len(self._data) - self._pos
+        chunk = self._data[self._pos:self._pos + size]
+        self._pos += len(chunk)
+        return chunk
+
+
+def _get_object(key: str) -> bytes:
+    return boto3.client("s3", region_name="us-east-1").get_object(Bucket=BUCKET, Key=key)["Body"].read()
+
+
+def _open_multipart_uploads() -> list:
+    response = boto3.client("s3", region_name="us-east-1").list_multipart_uploads(Bucket=BUCKET)
+    return response.get("Uploads", [])
+
+
+# Streaming uploads
+
+@pytest.mark.asyncio
+async def test_upload_stream_small_file_uses_single_put(s3_backend):
+    data = b"x" * 1024
+    stream = UploadStream(FakeUploadFile(data), max_bytes=10 * 1024)
+
+    key = await s3_backend.upload_stream(stream, "small.mp3", "audio/mpeg")
+
+    assert key.startswith("interviews/") and key.endswith(".mp3")
+    assert _get_object(key) == data
+    assert stream.size == len(data)
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_large_file_uses_multipart(s3_backend):
+    data = bytes(range(256)) * (12 * 1024 * 1024 // 256)  # 12MB → three parts
+    stream = UploadStream(FakeUploadFile(data), max_bytes=50 * 1024 * 1024)
+
+    key = await s3_backend.upload_stream(stream, "large.mp4", "video/mp4")
+
+    assert _get_object(key) == data
+    assert _open_multipart_uploads() == []
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_aborts_multipart_when_limit_exceeded(s3_backend):
+    data = b"0" * (11 * 1024 * 1024)
+    stream = UploadStream(FakeUploadFile(data), max_bytes=10 * 1024 * 1024)
+
+    with pytest.raises(FileTooLargeError):
+        await s3_backend.upload_stream(stream, "big.mp4", "video/mp4")
+
+    assert _open_multipart_uploads() == []
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_reads_in_bounded_chunks():
+    data = b"a" * 10_000
+    stream = UploadStream(FakeUploadFile(data), max_bytes=20_000, chunk_size=1_000)
+
+    chunks = [chunk async for chunk in stream]
+
+    assert len(chunks) == 10
+    assert max(len(c) for c in chunks) == 1_000
+
+
+# Event loop responsiveness
+
+@pytest.fixture
+def s3_server_backend(monkeypatch):
+    """S3StorageBackend pointed at a real local HTTP S3 stand-in."""
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint = f"http://{host}:{port}"
+
+    monkeypatch.setattr(settings, "S3_ENDPOINT_URL", endpoint)
+    monkeypatch.setattr(settings, "S3_ACCESS_KEY", "testing")
+    monkeypatch.setattr(settings, "S3_SECRET_KEY", "testing")
+    monkeypatch.setattr(settings, "S3_REGION", "us-east-1")
+    monkeypatch.setattr(settings, "S3_BUCKET_NAME", BUCKET)
+    monkeypatch.setattr(storage_module, "MULTIPART_PART_SIZE", 5 * 1024 * 1024)
+
+    boto3.client(
+        "s3", endpoint_url=endpoint, region_name="us-east-1",
+        aws_access_key_id="testing", aws_secret_access_key="testing",
+    ).create_bucket(Bucket=BUCKET)
+    backend = S3StorageBackend()
+    try:
+        yield backend
+    finally:
+        backend.close()
+        server.stop()
+
+
+@pytest.mark.asyncio
+async def test_large_upload_does_not_block_event_loop(s3_server_backend):
+    metrics.reset()
+    data = b"\x00" * (40 * 1024 * 1024)
+    stream = UploadStream(FakeUploadFile(data), max_bytes=len(data))
+
+    gaps: list[float] = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    ticker = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    await s3_server_backend.upload_stream(stream, "long.mp4", "video/mp4")
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticker
+
+    # The loop kept ticking throughout the upload instead of stalling for its duration
+    assert len(gaps) > 5
+    assert max(gaps) < max(0.25, elapsed / 4)
+
+    timings = metrics.snapshot()
+    assert timings["storage.upload_part"]["count"] == 8
+    assert timings["storage.complete_multipart_upload"]["count"] == 1
+
+
+# Direct browser uploads
+
+@pytest.mark.asyncio
+async def test_presigned_put_upload_then_head_and_range(s3_server_backend):
+    data = b"ID3" + bytes(range(256)) * 8
+    upload = await s3_server_backend.presigned_upload("call.mp3", "audio/mpeg", len(data), expires_in=600)
+    assert upload["method"] == "PUT"
+
+    assert await s3_server_backend.head(upload["storage_key"]) is None
+    response = await asyncio.to_thread(
+        httpx.put, upload["url"], content=data, headers={**upload["headers"], "Content-Length": str(len(data))}
+    )
+    assert response.status_code == 200
+
+    head = await s3_server_backend.head(upload["storage_key"])
+    assert head["size"] == len(data)
+    assert head["content_type"] == "audio/mpeg"
+    assert await s3_server_backend.read_range(upload["storage_key"], 0, 3) == b"ID3"
+    assert await s3_server_backend.read_range(upload["storage_key"], len(data) - 4, 100) == data[-4:]
+
+
+@pytest.mark.asyncio
+async def test_presigned_post_upload(s3_server_backend, monkeypatch):
+    monkeypatch.setattr(settings, "DIRECT_UPLOAD_METHOD", "post")
+    data = b"\x00" * 2048
+    upload = await s3_server_backend.presigned_upload("panel.mp4", "video/mp4", len(data), expires_in=600)
+    assert upload["method"] == "POST"
+    assert upload["fields"]["Content-Type"] == "video/mp4"
+
+    response = await asyncio.to_thread(
+        httpx.post, upload["url"], data=upload["fields"], files={"file": ("panel.mp4", data, "video/mp4")}
+    )
+    assert response.status_code in (200, 204)
+    assert (await s3_server_backend.head(upload["storage_key"]))["size"] == len(data)
+
+
+# Process-wide backend
+
+def test_get_storage_backend_reuses_one_instance(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "mock")
+    monkeypatch.setattr(storage_module, "_storage", None)
+
+    storage_module.init_storage_backend()
+    first = storage_module.get_storage_backend()
+
+    assert storage_module.get_storage_backend() is first
+
+    storage_module.close_storage_backend()
+    assert storage_module._storage is None
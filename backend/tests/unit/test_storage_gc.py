@@ -0,0 +1,89 @@
+import boto3
+import pytest
+from moto import mock_aws
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.interview import new_interview_document
+from app.services import storage_gc
+from app.services.storage import S3StorageBackend
+
+BUCKET = "test-interviews"
+
+
+@pytest.fixture
+def s3_backend(monkeypatch):
+    monkeypatch.setattr(settings, "S3_ENDPOINT_URL", None)
+    monkeypatch.setattr(settings, "S3_ACCESS_KEY", "testing")
+    monkeypatch.setattr(settings, "S3_SECRET_KEY", "testing")
+    monkeypatch.setattr(settings, "S3_REGION", "us-east-1")
+    monkeypatch.setattr(settings, "S3_BUCKET_NAME", BUCKET)
+
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        backend = S3StorageBackend()
+        with patch("app.services.storage_gc.get_storage_backend", return_value=backend):
+            yield backend
+        backend.close()
+
+
+def put(key: str, size: int = 100) -> None:
+    boto3.client("s3", region_name="us-east-1").put_object(Bucket=BUCKET, Key=key, Body=b"x" * size)
+
+
+def stored_keys() -> set[str]:
+    response = boto3.client("s3", region_name="us-east-1").list_objects_v2(Bucket=BUCKET)
+    return {obj["Key"] for obj in response.get("Contents", [])}
+
+
+@pytest.mark.asyncio
+async def test_reaper_deletes_only_unreferenced_objects(s3_backend, mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_GC_GRACE_HOURS", 0)
+    for key in ("interviews/live.mp4", "interviews/live.ogg", "interviews/uploading.mp3"):
+        put(key)
+    put("interviews/orphan-1.mp3", 1000)
+    put("interviews/orphan-2.mp3", 2000)
+
+    document = new_interview_document("user-1", "Live", "live.mp4", "interviews/live.mp4", 100, "video/mp4")
+    document["audio_storage_key"] = "interviews/live.ogg"
+    await mongo_db["interviews"].insert_one(document)
+    await mongo_db["upload_sessions"].insert_one({"storage_key": "interviews/uploading.mp3", "status": "active"})
+    await mongo_db["waveforms"].insert_one({"_id": "interviews/orphan-1.mp3", "levels": []})
+    metrics.reset()
+
+    stats = await storage_gc.reap_orphaned_objects()
+
+    assert stats == {"scanned": 5, "deleted": 2, "bytes_reclaimed": 3000}
+    assert metrics.counters() == {
+        "storage_gc.objects_scanned":  5,
+        "storage_gc.objects_deleted":  2,
+        "storage_gc.bytes_reclaimed":  3000,
+    }
+    assert stored_keys() == {"interviews/live.mp4", "interviews/live.ogg", "interviews/uploading.mp3"}
+    assert await mongo_db["waveforms"].count_documents({}) == 0
+
+
+@pytest.mark.asyncio
+async def test_reaper_respects_grace_period(s3_backend, mongo_db):
+    put("interviews/just-uploaded.mp3")
+
+    stats = await storage_gc.reap_orphaned_objects()
+
+    assert stats["deleted"] == 0
+    assert stored_keys() == {"interviews/just-uploaded.mp3"}
+
+
+@pytest.mark.asyncio
+async def test_reaper_deletes_in_batches(s3_backend, mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_GC_GRACE_HOURS", 0)
+    monkeypatch.setattr(storage_gc, "DELETE_BATCH_SIZE", 2)
+    for i in range(5):
+        put(f"interviews/orphan-{i}.mp3")
+
+    with patch.object(s3_backend, "delete_many", wraps=s3_backend.delete_many) as delete_many:
+        stats = await storage_gc.reap_orphaned_objects()
+
+    assert stats["deleted"] == 5
+    assert [len(call.args[0]) for call in delete_many.await_args_list] == [2, 2, 1]
+    assert stored_keys() == set()
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.jobs import COLLECTION as JOBS, enqueue
+from app.services.sweeper import sweep_stuck_interviews
+
+
+async def insert(db, status: str, minutes_ago: int, **fields) -> ObjectId:
+    oid = ObjectId()
+    await db["interviews"].insert_one({
+        "_id":        oid,
+        "user_id":    "user-1",
+        "status":     status,
+        "updated_at": datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+        **fields,
+    })
+    return oid
+
+
+async def job_kinds(db) -> list[tuple[str, str]]:
+    return sorted([(job["kind"], job["payload"]["interview_id"]) async for job in db[JOBS].find({})])
+
+
+@pytest.mark.asyncio
+async def test_lost_webhook_is_resubmitted(mongo_db):
+    oid = await insert(mongo_db, "transcribing", 45, deepgram_job_id="dg-1")
+
+    assert await sweep_stuck_interviews() == {"requeued": 0, "resubmitted": 1, "failed": 0}
+
+    doc = await mongo_db["interviews"].find_one({"_id": oid})
+    assert doc["status"] == "queued"
+    assert "deepgram_job_id" not in doc
+    # A callback that turns up late for the abandoned job is dropped
+    assert doc["superseded_job_ids"] == ["dg-1"]
+    assert doc["recovery_attempts"] == 1
+    assert await job_kinds(mongo_db) == [("transcribe", str(oid))]
+
+
+@pytest.mark.asyncio
+async def test_lost_jobs_are_requeued_but_live_ones_left_alone(mongo_db):
+    lost_analysis = await insert(mongo_db, "analysing", 45)
+    retrying = await insert(mongo_db, "queued", 45)
+    await enqueue(mongo_db, "transcribe", {"interview_id": str(retrying)}, key=f"transcribe:{retrying}")
+    recent = await insert(mongo_db, "queued", 5)
+
+    assert await sweep_stuck_interviews() == {"requeued": 1, "resubmitted": 0, "failed": 0}
+
+    assert await job_kinds(mongo_db) == sorted([("analyse", str(lost_analysis)), ("transcribe", str(retrying))])
+    assert (await mongo_db["interviews"].find_one({"_id": recent}))["status"] == "queued"
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_recoveries(mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "STUCK_MAX_RECOVERIES", 2)
+    oid = await insert(mongo_db, "transcribing", 45, recovery_attempts=2)
+
+    assert (await sweep_stuck_interviews())["failed"] == 1
+
+    doc = await mongo_db["interviews"].find_one({"_id": oid})
+    assert doc["status"] == "failed"
+    assert "transcribing" in doc["error_message"]
+
+
+@pytest.mark.asyncio
+async def test_sweep_is_rate_limited_oldest_first(mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "STUCK_SWEEP_BATCH", 2)
+    oldest = await insert(mongo_db, "analysing", 300)
+    older = await insert(mongo_db, "analysing", 200)
+    await insert(mongo_db, "analysing", 100)
+
+    assert (await sweep_stuck_interviews())["requeued"] == 2
+    assert await job_kinds(mongo_db) == sorted([("analyse", str(oldest)), ("analyse", str(older))])
+
+
+@pytest.mark.asyncio
+async def test_interviews_the_queue_is_working_on_dont_use_up_the_batch(mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "STUCK_SWEEP_BATCH", 1)
+    for minutes_ago in (300, 200):
+        busy = await insert(mongo_db, "analysing", minutes_ago)
+        await enqueue(mongo_db, "analyse", {"interview_id": str(busy)}, key=f"analyse:{busy}")
+    lost = await insert(mongo_db, "analysing", 100)
+
+    assert (await sweep_stuck_interviews())["requeued"] == 1
+    assert ("analyse", str(lost)) in await job_kinds(mongo_db)
+
+
+@pytest.mark.asyncio
+async def test_publishes_stuck_gauges(mongo_db):
+    metrics.reset()
+    await insert(mongo_db, "queued", 90)
+    await insert(mongo_db, "transcribing", 40)
+    await insert(mongo_db, "transcribing", 5)
+    await insert(mongo_db, "completed", 500)
+
+    await sweep_stuck_interviews()
+
+    gauges = metrics.gauges()
+    assert gauges["pipeline.stuck.queued"] == 1
+    assert gauges["pipeline.stuck.transcribing"] == 1
+    assert gauges["pipeline.stuck.analysing"] == 0
+    assert 89 * 60 < gauges["pipeline.stuck.oldest_seconds"] < 91 * 60
@@ -0,0 +1,174 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services import storage as storage_module
+from app.services import transcription as transcription_module
+from app.services.transcription import DeepgramService
+
+
+@pytest.fixture
+def deepgram_requests(monkeypatch):
+    """DeepgramService whose shared client talks to an in-memory transport."""
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "mock")
+    monkeypatch.setattr(storage_module, "_storage", None)
+    monkeypatch.setattr(settings, "BACKEND_URL", "https://api.example.com")
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"request_id": f"dg-{len(seen)}"})
+
+    service = DeepgramService()
+    service._client = httpx.AsyncClient(
+        headers={"Authorization": "Token test-key"},
+        transport=httpx.MockTransport(handler),
+    )
+    return service, seen
+
+
+@pytest.mark.asyncio
+async def test_submit_posts_presigned_url_with_callback(deepgram_requests):
+    service, seen = deepgram_requests
+
+    job_id = await service.submit("interviews/abc.mp3", "interview-1")
+
+    assert job_id == "dg-1"
+    request = seen[0]
+    assert request.headers["Authorization"] == "Token test-key"
+    assert request.url.params["diarize"] == "true"
+    assert request.url.params["callback"] == (
+        "https://api.example.com/api/v1/webhooks/deepgram?interview_id=interview-1"
+    )
+    assert b"http://mock-storage/interviews/abc.mp3" in request.content
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_submit_reuses_shared_client(deepgram_requests):
+    service, seen = deepgram_requests
+    client = service._client
+
+    await service.submit("interviews/a.mp3", "interview-1")
+    await service.submit("interviews/b.mp3", "interview-2")
+
+    assert service._client is client
+    assert len(seen) == 2
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_transcription_service_lifecycle(monkeypatch):
+    monkeypatch.setattr(settings, "TRANSCRIPTION_BACKEND", "mock")
+    monkeypatch.setattr(transcription_module, "_service", None)
+
+    transcription_module.init_transcription_service()
+    service = transcription_module.get_transcription_service()
+    assert transcription_module.get_transcription_service() is service
+
+    await transcription_module.close_transcription_service()
+    assert transcription_module._service is None
+
+
+@pytest.mark.asyncio
+async def test_parse_webhook_applies_silence_offset_map():
+    service = DeepgramService()
+    payload = {
+        "metadata": {"duration": 4.0},
+        "results": {
+            "channels": [{"alternatives": [{
+                "transcript": "Welcome back",
+                "confidence": 0.9,
+                "words": [
+                    {"word": "welcome", "start": 0.5, "end": 0.9, "speaker": 0},
+                    {"word": "back", "start": 2.5, "end": 2.8, "speaker": 0},
+                ],
+            }]}],
+            "utterances": [{"speaker": 0, "transcript": "Welcome back", "start": 0.5, "end": 2.8}],
+        },
+    }
+
+    parsed = await service.parse_webhook(payload, offset_map=[[0, 60000], [2000, 90000], [4000, 95000]])
+
+    words = parsed["transcript"]["words"]
+    assert [(w["start_ms"], w["end_ms"]) for w in words] == [(60500, 60900), (90500, 90800)]
+    assert parsed["transcript"]["utterances"][0]["start_ms"] == 60500
+    assert parsed["duration_seconds"] == 95.0
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_parse_webhook_decodes_raw_body_once():
+    service = DeepgramService()
+    payload = {
+        "metadata": {"duration": 3.0},
+        "results": {
+            "channels": [{"alternatives": [{
+                "transcript": "Hi there. Hello",
+                "confidence": 0.9,
+                "words": [
+                    {"word": "hi", "punctuated_word": "Hi", "start": 0.1, "end": 0.3, "confidence": 0.9, "speaker": 0},
+                    {"word": "there", "punctuated_word": "there.", "start": 0.3, "end": 0.6, "confidence": 0.8, "speaker": 0},
+                    {"word": "hello", "start": 1.2, "end": 1.6, "speaker": 11},
+                ],
+            }]}],
+            "utterances": [{"speaker": 1, "transcript": "Hello", "start": 1.2, "end": 1.6}],
+        },
+    }
+
+    from_body = await service.parse_webhook(orjson.dumps(payload))
+
+    assert from_body == await service.parse_webhook(payload)
+    assert [(w["text"], w["speaker"], w["confidence"]) for w in from_body["transcript"]["words"]] == [
+        ("Hi", "A", 0.9), ("there.", "A", 0.8), ("hello", "11", 0.0),
+    ]
+    assert from_body["transcript"]["utterances"][0]["speaker"] == "B"
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_submit_caps_inflight_requests_and_records_latency(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "mock")
+    monkeypatch.setattr(storage_module, "_storage", None)
+    monkeypatch.setattr(settings, "DEEPGRAM_MAX_INFLIGHT_SUBMITS", 2)
+    metrics.reset()
+    active = peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200, json={"request_id": "dg"})
+
+    service = DeepgramService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    await asyncio.gather(*(service.submit(f"interviews/{i}.mp3", f"interview-{i}") for i in range(6)))
+
+    assert peak == 2
+    assert metrics.snapshot()["deepgram.submit"]["count"] == 6
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_submit_times_out(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "mock")
+    monkeypatch.setattr(storage_module, "_storage", None)
+    monkeypatch.setattr(settings, "DEEPGRAM_SUBMIT_TIMEOUT_SECONDS", 0.05)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={"request_id": "dg"})
+
+    service = DeepgramService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    with pytest.raises(TimeoutError, match="within 0.05s"):
+        await service.submit("interviews/a.mp3", "interview-1")
+    await service.close()
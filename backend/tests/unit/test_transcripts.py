@@ -0,0 +1,100 @@
+import pytest
+from bson import ObjectId
+
+from app.models.interview import encode_words
+from app.services.transcripts import (
+    COLLECTION,
+    compact_transcript,
+    copy_transcript,
+    expand_transcript,
+    load_transcript,
+    save_transcript,
+)
+from scripts.migrate_transcripts import migrate
+
+TRANSCRIPT = {
+    "text":          "Tell me about yourself.",
+    "words":         [
+        {"text": "Tell",      "start_ms": 500,  "end_ms": 800,  "confidence": 1.0, "speaker": "A"},
+        {"text": "me",        "start_ms": 800,  "end_ms": 1000, "confidence": 1.0, "speaker": "A"},
+        {"text": "about",     "start_ms": 1000, "end_ms": 1400, "confidence": 1.0, "speaker": "A"},
+        {"text": "yourself.", "start_ms": 1400, "end_ms": 2000, "confidence": 1.0, "speaker": "A"},
+    ],
+    "utterances":    [{"speaker": "A", "text": "Tell me about yourself.", "start_ms": 500, "end_ms": 2000}],
+    "language_code": "en",
+    "confidence":    0.98,
+}
+
+
+@pytest.mark.asyncio
+async def test_save_load_and_copy(mongo_db):
+    source, target = ObjectId(), ObjectId()
+
+    summary = await save_transcript(mongo_db, source, "user-1", TRANSCRIPT)
+
+    assert summary == {"language_code": "en", "confidence": 0.98, "word_count": 4, "utterance_count": 1}
+    stored = await mongo_db[COLLECTION].find_one({"_id": source})
+    assert stored["words"]["format"] == "columnar-v3"
+    # The text lives only in the words
+    assert [block["text"] for block in stored["word_blocks"]] == ["Tell me about yourself."]
+    assert "blocks" not in stored["words"]
+    assert "text" not in stored and "text" not in stored["utterances"][0]
+    assert await load_transcript(mongo_db, source) == TRANSCRIPT
+    assert await load_transcript(mongo_db, source, ["text"]) == {"text": TRANSCRIPT["text"]}
+
+    assert await copy_transcript(mongo_db, source, target, "user-2") == summary
+    assert (await mongo_db[COLLECTION].find_one({"_id": target}))["user_id"] == "user-2"
+    assert await copy_transcript(mongo_db, ObjectId(), ObjectId(), "user-2") is None
+    assert await load_transcript(mongo_db, ObjectId()) is None
+
+
+@pytest.mark.asyncio
+async def test_migration_moves_embedded_transcripts(mongo_db):
+    embedded, untranscribed = ObjectId(), ObjectId()
+    await mongo_db["interviews"].insert_many([
+        {"_id": embedded,      "user_id": "user-1", "transcript": TRANSCRIPT},
+        {"_id": untranscribed, "user_id": "user-1", "transcript": None},
+    ])
+
+    assert await migrate(mongo_db, batch_size=1) == 1
+    assert await migrate(mongo_db) == 0
+
+    doc = await mongo_db["interviews"].find_one({"_id": embedded})
+    assert "transcript" not in doc
+    assert doc["transcript_summary"]["word_count"] == 4
+    assert await load_transcript(mongo_db, embedded) == TRANSCRIPT
+    doc = await mongo_db["interviews"].find_one({"_id": untranscribed})
+    assert "transcript" not in doc and doc["transcript_summary"] is None
+
+
+def test_text_the_words_cannot_reproduce_is_kept():
+    # The mock transcription service's text doesn't match its words
+    transcript = {**TRANSCRIPT, "text": "Interviewer: Tell me about yourself."}
+
+    stored = compact_transcript(transcript)
+
+    assert stored["text"] == "Interviewer: Tell me about yourself."
+    assert expand_transcript(stored) == transcript
+
+
+@pytest.mark.asyncio
+async def test_migration_rewrites_older_transcript_layouts(mongo_db):
+    oid = ObjectId()
+    encoded = encode_words(TRANSCRIPT["words"])
+    v1_words = {
+        **encoded["blocks"][0],
+        "count":    encoded["count"],
+        "speakers": encoded["speakers"],
+        "format":   "columnar-v1",
+        "text":     "Tell\x1fme\x1fabout\x1fyourself.",
+    }
+    await mongo_db[COLLECTION].insert_one({**TRANSCRIPT, "_id": oid, "user_id": "user-1", "words": v1_words})
+
+    await migrate(mongo_db)
+
+    stored = await mongo_db[COLLECTION].find_one({"_id": oid})
+    assert stored["words"]["format"] == "columnar-v3"
+    assert "text" not in stored["words"]
+    assert "text" not in stored
+    assert bytes(stored["utterance_start_ms"]) == (500).to_bytes(4, "little")
+    assert await load_transcript(mongo_db, oid) == TRANSCRIPT
@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from app.services import url_cache as url_cache_module
+from app.services.url_cache import PresignedUrlCache
+
+
+def make_signer():
+    return AsyncMock(side_effect=lambda key, expires_in: f"https://signed/{key}?ttl={expires_in}")
+
+
+@pytest.mark.asyncio
+async def test_second_request_reuses_signed_url():
+    cache = PresignedUrlCache(max_entries=10, ttl=3600, min_remaining=600)
+    sign = make_signer()
+
+    first = await cache.get_or_sign("interviews/a.mp3", sign)
+    second = await cache.get_or_sign("interviews/a.mp3", sign)
+
+    assert first[0] == second[0]
+    assert second[1] <= 3600
+    sign.assert_awaited_once_with("interviews/a.mp3", 3600)
+
+
+@pytest.mark.asyncio
+async def test_lookup_by_owner_skips_storage_key_resolution():
+    cache = PresignedUrlCache(max_entries=10, ttl=3600, min_remaining=600)
+    await cache.get_or_sign("interviews/a.mp3", make_signer(), owner=("user-1", "iv-1"))
+
+    assert cache.lookup("user-1", "iv-1")[0] == "https://signed/interviews/a.mp3?ttl=3600"
+    assert cache.lookup("user-2", "iv-1") is None
+
+
+@pytest.mark.asyncio
+async def test_url_with_too_little_time_left_is_resigned(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(url_cache_module.time, "monotonic", lambda: clock[0])
+    cache = PresignedUrlCache(max_entries=10, ttl=3600, min_remaining=600)
+    sign = make_signer()
+
+    await cache.get_or_sign("interviews/a.mp3", sign, owner=("user-1", "iv-1"))
+    clock[0] += 2000
+    url, expires_in = cache.lookup("user-1", "iv-1")
+    assert expires_in == 1600
+
+    clock[0] += 1200  # 400s left — below min_remaining
+    assert cache.lookup("user-1", "iv-1") is None
+    _, expires_in = await cache.get_or_sign("interviews/a.mp3", sign)
+    assert expires_in == 3600
+    assert sign.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted():
+    cache = PresignedUrlCache(max_entries=2, ttl=3600, min_remaining=600)
+    sign = make_signer()
+
+    await cache.get_or_sign("a", sign, owner=("u", "1"))
+    await cache.get_or_sign("b", sign, owner=("u", "2"))
+    cache.lookup("u", "1")  # touch "a" so "b" becomes the oldest
+    await cache.get_or_sign("c", sign, owner=("u", "3"))
+
+    assert len(cache) == 2
+    assert cache.lookup("u", "2") is None
+    assert cache.lookup("u", "1") is not None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_interview_keeps_url_shared_with_other_interviews():
+    cache = PresignedUrlCache(max_entries=10, ttl=3600, min_remaining=600)
+    sign = make_signer()
+    await cache.get_or_sign("shared", sign, owner=("u", "1"))
+    await cache.get_or_sign("shared", sign, owner=("u", "2"))
+
+    cache.invalidate_interview("u", "1")
+    assert cache.lookup("u", "1") is None
+    assert cache.lookup("u", "2") is not None
+
+    cache.invalidate_interview("u", "2")
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_zero_size_disables_caching():
+    cache = PresignedUrlCache(max_entries=0, ttl=3600, min_remaining=600)
+    sign = make_signer()
+
+    url, expires_in = await cache.get_or_sign("a", sign, owner=("u", "1"))
+
+    assert url == "https://signed/a?ttl=3600" and expires_in == 3600
+    assert len(cache) == 0
+    assert cache.lookup("u", "1") is None
@@ -0,0 +1,29 @@
+import numpy as np
+
+from app.services.waveform import compute_peaks, pick_level
+
+
+def test_peaks_are_int8_min_max_pairs_per_level():
+    samples = np.zeros(1024 * 3 + 10, dtype=np.int16)
+    samples[100] = 32767
+    samples[2000] = -32768
+    samples[-1] = 256
+
+    levels = dict(compute_peaks(samples, [256, 1024]))
+
+    fine = np.frombuffer(levels[256], dtype=np.int8).reshape(-1, 2)
+    assert len(fine) == 13  # 12 full peaks plus the partial tail
+    assert tuple(fine[0]) == (0, 127)
+    assert tuple(fine[7]) == (-128, 0)
+    assert tuple(fine[-1]) == (0, 1)
+
+    coarse = np.frombuffer(levels[1024], dtype=np.int8).reshape(-1, 2)
+    assert len(coarse) == 4
+    assert coarse.tolist() == [[0, 127], [-128, 0], [0, 0], [0, 1]]
+
+
+def test_pick_level_returns_closest_or_coarsest():
+    waveform = {"levels": [{"samples_per_peak": 256}, {"samples_per_peak": 1024}, {"samples_per_peak": 4096}]}
+    assert pick_level(waveform, 900)["samples_per_peak"] == 1024
+    assert pick_level(waveform, 10)["samples_per_peak"] == 256
+    assert pick_level(waveform, None)["samples_per_peak"] == 4096
@@ -0,0 +1,128 @@
+import pytest
+
+from app.models.interview import (
+    Transcript,
+    decode_utterances,
+    decode_words,
+    encode_utterances,
+    encode_words,
+    word_texts,
+    words_text,
+)
+
+WORDS = [
+    {"text": "Tell",     "start_ms": 500,     "end_ms": 800,     "confidence": 0.99, "speaker": "A"},
+    {"text": "me,",      "start_ms": 820,     "end_ms": 950,     "confidence": 0.5,  "speaker": "A"},
+    {"text": "Sure.",    "start_ms": 3_600_000, "end_ms": 3_600_400, "confidence": 1.0,  "speaker": "B"},
+    {"text": "",         "start_ms": 3_600_500, "end_ms": 3_600_500, "confidence": 0.0,  "speaker": None},
+]
+
+
+def test_words_round_trip_through_columns():
+    encoded = encode_words(WORDS)
+
+    assert encoded["count"] == 4
+    assert encoded["speakers"] == ["A", "B", None]
+    assert len(encoded["blocks"][0]["start_ms"]) == 16 and len(encoded["blocks"][0]["confidence"]) == 4
+    decoded = decode_words(encoded)
+    assert [{k: w[k] for k in ("text", "start_ms", "end_ms", "speaker")} for w in decoded] == [
+        {k: w[k] for k in ("text", "start_ms", "end_ms", "speaker")} for w in WORDS
+    ]
+    # Confidence is quantised to 1/255
+    assert [w["confidence"] for w in decoded] == pytest.approx([0.99, 0.5, 1.0, 0.0], abs=0.003)
+
+
+def test_words_decode_a_slice():
+    encoded = encode_words(WORDS)
+
+    assert decode_words(encoded, 1, 3) == decode_words(encoded)[1:3]
+    assert decode_words(encoded, 2) == decode_words(encoded)[2:]
+    assert decode_words(WORDS, 1, 3) == WORDS[1:3]
+
+
+def test_legacy_and_empty_words_decode():
+    assert decode_words(WORDS) is WORDS
+    assert decode_words(None) == []
+    assert decode_words(encode_words([])) == []
+    model = Transcript(text="Tell me", words=encode_words(WORDS[:2]))
+    assert [w.text for w in model.words] == ["Tell", "me,"]
+
+
+def test_utterances_point_at_their_words():
+    utterances = [
+        {"speaker": "A", "text": "Tell me,",    "start_ms": 500,       "end_ms": 950,       "sentiment": None},
+        {"speaker": "B", "text": "Sure. ",      "start_ms": 3_600_000, "end_ms": 3_600_500, "sentiment": "positive"},
+    ]
+
+    encoded = encode_utterances(utterances, WORDS)
+
+    assert encoded[0] == {"speaker": "A", "start_ms": 500, "end_ms": 950, "sentiment": None, "word_range": [0, 2]}
+    # "Sure. " isn't what the words join to — kept verbatim
+    assert encoded[1]["word_range"] == [2, 3] and encoded[1]["text"] == "Sure. "
+    assert decode_utterances(encoded, word_texts(encode_words(WORDS))) == utterances
+
+
+def test_words_decode_across_blocks():
+    encoded = encode_words(WORDS, block_size=3)
+
+    assert [len(block["start_ms"]) // 4 for block in encoded["blocks"]] == [3, 1]
+    assert decode_words(encoded) == decode_words(encode_words(WORDS))
+    assert decode_words(encoded, 2, 4) == decode_words(encoded)[2:4]
+    assert decode_words(encoded, 3) == decode_words(encoded)[3:]
+    assert word_texts(encoded) == [w["text"] for w in WORDS]
+    assert words_text(encoded) == " ".join(w["text"] for w in WORDS)
+
+
+def test_v1_and_v2_words_still_decode():
+    encoded = encode_words(WORDS[:2])
+    columns = {**encoded["blocks"][0], "count": 2, "speakers": encoded["speakers"]}
+    v1 = {**columns, "format": "columnar-v1", "text": "Tell\x1fme,"}
+    v2 = {**columns, "format": "columnar-v2", "text": "Tell me,"}
+    for stored in (v1, v2):
+        assert word_texts(stored) == ["Tell", "me,"]
+        assert words_text(stored) == "Tell me,"
+        assert [w["text"] for w in decode_words(stored)] == ["Tell", "me,"]
+        assert decode_words(stored, 1) == decode_words(encoded, 1)
+
+
+def test_space_inside_a_word_round_trips():
+    words = [
+        {"text": "Moved to", "start_ms": 0,   "end_ms": 300, "confidence": 1.0, "speaker": "A"},
+        {"text": "New York", "start_ms": 300, "end_ms": 900, "confidence": 1.0, "speaker": "A"},
+    ]
+    utterances = [{"speaker": "A", "text": "Moved to New York", "start_ms": 0, "end_ms": 900}]
+    encoded = encode_words(words)
+
+    assert encoded["count"] == 2
+    assert [w["text"] for w in decode_words(encoded)] == ["Moved to", "New York"]
+    assert word_texts(encoded) == ["Moved to", "New York"]
+    assert words_text(encoded) == "Moved to New York"
+    compact = encode_utterances(utterances, words)
+    assert "text" not in compact[0]
+    assert decode_utterances(compact, word_texts(encoded)) == utterances
+
+
+def test_no_break_space_and_escape_in_words_round_trip():
+    words = [
+        {"text": "10\u00a0km",     "start_ms": 0,   "end_ms": 300, "confidence": 1.0, "speaker": "A"},
+        {"text": "\x1b\u00a0 \x1b", "start_ms": 300, "end_ms": 600, "confidence": 1.0, "speaker": "A"},
+        {"text": "New York",       "start_ms": 600, "end_ms": 900, "confidence": 1.0, "speaker": "A"},
+    ]
+    encoded = encode_words(words)
+
+    assert word_texts(encoded) == [w["text"] for w in words]
+    assert words_text(encoded) == " ".join(w["text"] for w in words)
+    assert [w["text"] for w in decode_words(encoded, 1)] == [w["text"] for w in words[1:]]
+
+
+def test_more_than_256_speakers_round_trip():
+    words = [
+        {"text": f"w{i}", "start_ms": i * 10, "end_ms": i * 10 + 5, "confidence": 1.0, "speaker": f"S{i}"}
+        for i in range(300)
+    ]
+    encoded = encode_words(words)
+
+    assert len(encoded["blocks"][0]["speaker"]) == 600
+    assert [w["speaker"] for w in decode_words(encoded)] == [f"S{i}" for i in range(300)]
+    assert [w["speaker"] for w in decode_words(encoded, 255, 260)] == [f"S{i}" for i in range(255, 260)]
+    assert len(encode_words(words[:256])["blocks"][0]["speaker"]) == 256
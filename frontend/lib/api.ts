@@ -28,7 +28,7 @@ async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
 export const api = {
   interviews: {
     list:       (params = "") => request<any>(`/interviews${params}`),
-    get:        (id: string) => request<any>(`/interviews/${id}`),
+    get:        (id: string) => request<any>(`/interviews/${id}?include=transcript`),
     update:     (id: string, body: any) =>
       request<any>(`/interviews/${id}`, { method: "PATCH", body: JSON.stringify(body) }),
     delete:     (id: string) =>